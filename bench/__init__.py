@@ -0,0 +1,3 @@
+"""
+ベンチマーク用パッケージ - モックEdgeX取引所とエンドツーエンド計測
+"""
@@ -0,0 +1,153 @@
+"""
+起動時間プロファイル - python -X importtime で main 起動時の読み込み時間をパッケージ別に集計
+
+1. import: `import main` の各モジュールの読み込み時間（トップレベルのパッケージ単位で合計）
+2. 起動: プロセス開始 → 設定読み込み → CaptainGridBot生成 → SharedServices.start()完了までの時間
+   （run()が最初の価格取得に進めるまで。署名ワーカーは裏で起動するので、準備完了までは別に表示）
+
+使い方:
+    python -m bench.import_profile
+    python -m bench.import_profile --top 15 --json import-profile.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# 子プロセスで計測（親で読み込み済みのモジュールはキャッシュされて測れないため）
+BOOT_SCRIPT = """
+import time
+started = time.perf_counter()
+import asyncio
+import sys
+import main
+imported = time.perf_counter()
+from utils.config import load_config
+load_config()
+configured = time.perf_counter()
+from core.grid_bot import CaptainGridBot
+bot = CaptainGridBot()
+constructed = time.perf_counter()
+sys.stderr.write("%s\\n" % MARKER)
+sys.stderr.flush()
+
+async def boot():
+    await bot.shared.start()
+    services = time.perf_counter()
+    await bot.shared.signer.start()
+    signer = time.perf_counter()
+    await bot.shared.close()
+    return services, signer
+
+services, signer = asyncio.run(boot())
+print("BOOT", imported - started, configured - imported, constructed - configured,
+      services - constructed, signer - constructed)
+"""
+
+# これより後のimport（署名ワーカーのプロセス・edgex_sdkの裏読み込み）は起動時のimportに数えない
+MARKER = "-- services start --"
+
+# 起動時に読み込まれてはいけない重い依存（遅延importのはず）
+LAZY = ("web3", "eth_account", "edgex_sdk", "requests")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+    """
+    -X importtime の出力を解析
+
+    Args:
+        stderr: 子プロセスの標準エラー
+
+    Returns:
+        List[(モジュール名, 単体ミリ秒, 累積ミリ秒)]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if line == MARKER:
+            break
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+        except ValueError:
+            continue
+    return rows
+
+
+def by_package(rows: List[Tuple[str, float, float]]) -> Dict[str, float]:
+    """単体時間をトップレベルのパッケージごとに合計（ミリ秒、降順）"""
+    totals: Dict[str, float] = defaultdict(float)
+    for name, self_ms, _ in rows:
+        totals[name.split(".")[0]] += self_ms
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def profile(python: str) -> Dict:
+    """
+    子プロセスで起動を1回計測
+
+    Args:
+        python: 使うインタプリタ
+
+    Returns:
+        dict: パッケージ別の読み込み時間・起動の各段階・読み込まれた遅延対象
+    """
+    # 価格フィードはRESTにして取引所へは接続しない（計るのは接続前までの起動）
+    env = dict(os.environ, TICK_DIR="", STATE_DIR="", METRICS_PORT="0", LOOP_MONITOR="off", MARKET_DATA_MODE="rest")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"MARKER = {MARKER!r}\n" + BOOT_SCRIPT],
+        cwd=root, env=env, capture_output=True, text=True, timeout=120
+    )
+    boot = [line for line in proc.stdout.splitlines() if line.startswith("BOOT ")]
+    if proc.returncode != 0 or not boot:
+        raise RuntimeError(f"boot failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+
+    rows = parse_importtime(proc.stderr)
+    import_s, config_s, construct_s, start_s, signer_s = (float(v) for v in boot[-1].split()[1:])
+    packages = by_package(rows)
+    return {
+        "boot_ms": {
+            "import": import_s * 1000,
+            "config": config_s * 1000,
+            "construct": construct_s * 1000,
+            "start": start_s * 1000,
+            "total": (import_s + config_s + construct_s + start_s) * 1000,
+            "signer_ready": signer_s * 1000,  # 生成完了から署名ワーカーの準備完了まで（裏で並行）
+        },
+        "modules": len(rows),
+        "packages_ms": packages,
+        "eager_heavy": [name for name in LAZY if name in packages],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CaptainGridBot import-time profile")
+    parser.add_argument("--top", type=int, default=10, help="表示するパッケージ数")
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--json", help="結果をJSONで保存")
+    args = parser.parse_args(argv)
+
+    result = profile(args.python)
+    boot = result["boot_ms"]
+    print(f"boot: import {boot['import']:.0f}ms + config {boot['config']:.1f}ms "
+          f"+ bot {boot['construct']:.1f}ms + start {boot['start']:.1f}ms = {boot['total']:.0f}ms "
+          f"({result['modules']} modules)")
+    print(f"signer workers ready {boot['signer_ready']:.0f}ms after bot constructed (in background)")
+    for name, ms in list(result["packages_ms"].items())[:args.top]:
+        print(f"  {name:<24}{ms:8.1f}ms")
+    if result["eager_heavy"]:
+        print(f"⚠️ eagerly imported: {', '.join(result['eager_heavy'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    return 1 if result["eager_heavy"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
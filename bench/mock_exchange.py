@@ -0,0 +1,258 @@
+"""
+モックEdgeX取引所 - aiohttpのTestServerで動くインプロセス版（ネットワーク・実資金不要）
+ボットが使うREST（価格・メタデータ・注文・約定・残高）と公開WebSocket（ticker）を再現
+遅延・エラー率・約定の有無は設定で変更可能
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+CONTRACT_ID = "10000001"
+
+
+def _ok(data) -> web.Response:
+    return web.json_response({"code": "SUCCESS", "data": data, "msg": None})
+
+
+class MockEdgeX:
+    """EdgeX REST / WebSocketのモック（価格はset_priceで外から動かす）"""
+
+    def __init__(
+        self,
+        price: float = 100000.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        fill_on_cross: bool = True,
+        balance: float = 195.0,
+        tick_size: str = "0.1",
+        step_size: str = "0.001",
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            price: 初期価格
+            latency: RESTの応答遅延（秒）
+            jitter: 遅延のばらつき（秒、0〜jitterを一様に加算）
+            error_rate: 注文・キャンセルがHTTP 500で失敗する確率
+            fill_on_cross: 価格が指値を跨いだら全量約定させる
+            balance: USDT残高
+            tick_size: 価格刻み
+            step_size: 数量刻み
+            seed: 乱数シード
+        """
+        self.price = price
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fill_on_cross = fill_on_cross
+        self.balance = balance
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self._rng = random.Random(seed)
+
+        self.orders: Dict[str, Dict] = {}  # アクティブ注文
+        self.fills: List[Dict] = []
+        self._order_ids = itertools.count(1)
+        self._fill_ids = itertools.count(1)
+        self._ws_clients: Set[web.WebSocketResponse] = set()
+
+        # ベンチマーク用の記録
+        self.last_tick_at = time.perf_counter()
+        self.order_log: List[Dict] = []   # createOrder受信（受信時刻と直前tickからの経過）
+        self.cancel_log: List[Dict] = []
+        self.request_counts: Dict[str, int] = {}
+
+        self.server: Optional[TestServer] = None
+
+    # ---- 起動・停止 ----
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/v1/public/funding/getLatestFundingRate", self._funding_rate)
+        app.router.add_get("/api/v1/public/quote/getTicker", self._ticker)
+        app.router.add_get("/api/v1/public/meta/getServerTime", self._server_time)
+        app.router.add_get("/api/v1/public/meta/getMetaData", self._metadata)
+        app.router.add_get("/api/v1/public/ws", self._ws)
+        app.router.add_post("/api/v1/private/order/createOrder", self._create_order)
+        app.router.add_post("/api/v1/private/order/cancelOrderById", self._cancel_orders)
+        app.router.add_get("/api/v1/private/order/getActiveOrderPage", self._active_orders)
+        app.router.add_get("/api/v1/private/order/getHistoryOrderFillTransactionPage", self._fill_page)
+        app.router.add_get("/api/v1/private/account/getAccountAsset", self._account_asset)
+        app.router.add_get("/api/v3/ticker/price", self._binance_price)  # BINANCE_BASE_URLの差し替え先
+        return app
+
+    async def start(self) -> str:
+        """サーバーを起動してベースURL（http://127.0.0.1:port）を返す"""
+        self.server = TestServer(self.build_app())
+        await self.server.start_server()
+        return str(self.server.make_url("")).rstrip("/")
+
+    @property
+    def ws_url(self) -> str:
+        return str(self.server.make_url("/api/v1/public/ws")).replace("http://", "ws://")
+
+    async def close(self):
+        for ws in list(self._ws_clients):
+            await ws.close()
+        if self.server is not None:
+            await self.server.close()
+
+    # ---- 価格の駆動 ----
+
+    async def set_price(self, price: float):
+        """価格を更新して約定判定・WebSocket配信"""
+        self.price = price
+        self.last_tick_at = time.perf_counter()
+        if self.fill_on_cross:
+            self._match(price)
+        message = json.dumps({
+            "type": "quote-event",
+            "channel": f"ticker.{CONTRACT_ID}",
+            "content": {"data": [{"contractId": CONTRACT_ID, "oraclePrice": str(price), "lastPrice": str(price)}]},
+        })
+        for ws in list(self._ws_clients):
+            try:
+                await ws.send_str(message)
+            except ConnectionResetError:
+                self._ws_clients.discard(ws)
+
+    def _match(self, price: float):
+        now_ms = int(time.time() * 1000)
+        for order_id, order in list(self.orders.items()):
+            limit = float(order["price"])
+            crossed = price <= limit if order["side"] == "BUY" else price >= limit
+            if not crossed:
+                continue
+            size = float(order["size"]) - float(order["cumFillSize"])
+            order["cumFillSize"] = order["size"]
+            del self.orders[order_id]
+            self.fills.append({
+                "id": str(next(self._fill_ids)),
+                "orderId": order_id,
+                "contractId": CONTRACT_ID,
+                "orderSide": order["side"],
+                "fillSize": str(size),
+                "fillPrice": order["price"],
+                "fillFee": str(round(size * limit * 0.0002, 6)),
+                "createdTime": str(now_ms),
+            })
+
+    # ---- 共通処理 ----
+
+    async def _delay(self, name: str):
+        self.request_counts[name] = self.request_counts.get(name, 0) + 1
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _fail(self) -> bool:
+        return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    # ---- 公開API ----
+
+    async def _funding_rate(self, request: web.Request) -> web.Response:
+        await self._delay("funding_rate")
+        return _ok([{"contractId": CONTRACT_ID, "oraclePrice": str(self.price), "fundingRate": "0.0001"}])
+
+    async def _ticker(self, request: web.Request) -> web.Response:
+        await self._delay("ticker")
+        return _ok([{"contractId": CONTRACT_ID, "lastPrice": str(self.price), "oraclePrice": str(self.price)}])
+
+    async def _binance_price(self, request: web.Request) -> web.Response:
+        await self._delay("binance")
+        return web.json_response({"symbol": request.query.get("symbol", "BTCUSDT"), "price": str(self.price)})
+
+    async def _server_time(self, request: web.Request) -> web.Response:
+        await self._delay("server_time")
+        return _ok({"timeMillis": str(int(time.time() * 1000))})
+
+    async def _metadata(self, request: web.Request) -> web.Response:
+        await self._delay("metadata")
+        return _ok({
+            "global": {"starkExCollateralCoin": {"coinId": "1000", "coinName": "USDT", "starkExAssetId": "0x2ce625e94458d39dd0bf3b45a843544dd4a14b8169045a3a3d15aa564b936c5"}},
+            "contractList": [{
+                "contractId": CONTRACT_ID,
+                "contractName": "BTCUSDT",
+                "tickSize": self.tick_size,
+                "stepSize": self.step_size,
+                "minOrderSize": self.step_size,
+                "defaultMakerFeeRate": "0.0002",
+                "defaultTakerFeeRate": "0.00055",
+                "starkExSyntheticAssetId": "0x4254432d3130000000000000000000",
+                "starkExResolution": "0x2540be400",
+            }],
+        })
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=20)
+        await ws.prepare(request)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if data.get("type") == "subscribe":
+                    self._ws_clients.add(ws)
+        finally:
+            self._ws_clients.discard(ws)
+        return ws
+
+    # ---- 認証API（署名は検証しない） ----
+
+    async def _create_order(self, request: web.Request) -> web.Response:
+        received = time.perf_counter()
+        body = await request.json()
+        await self._delay("create_order")
+        if self._fail():
+            return web.json_response({"code": "SERVER_ERROR", "msg": "mock failure"}, status=500)
+        order_id = str(next(self._order_ids))
+        self.orders[order_id] = {
+            "id": order_id,
+            "contractId": body.get("contractId"),
+            "side": body.get("side"),
+            "price": body.get("price"),
+            "size": body.get("size"),
+            "cumFillSize": "0",
+            "status": "OPEN",
+            "clientOrderId": body.get("clientOrderId"),
+        }
+        self.order_log.append({"at": received, "since_tick": received - self.last_tick_at, "id": order_id})
+        return _ok({"orderId": order_id, "clientOrderId": body.get("clientOrderId")})
+
+    async def _cancel_orders(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        await self._delay("cancel")
+        if self._fail():
+            return web.json_response({"code": "SERVER_ERROR", "msg": "mock failure"}, status=500)
+        canceled = {}
+        for order_id in body.get("orderIdList", []):
+            canceled[order_id] = "SUCCESS" if self.orders.pop(str(order_id), None) else "ORDER_NOT_FOUND"
+        self.cancel_log.append({"at": time.perf_counter(), "count": len(canceled)})
+        return _ok({"cancelResultMap": canceled})
+
+    async def _active_orders(self, request: web.Request) -> web.Response:
+        await self._delay("active_orders")
+        return _ok({"dataList": list(self.orders.values()), "nextPageOffsetData": ""})
+
+    async def _fill_page(self, request: web.Request) -> web.Response:
+        await self._delay("fills")
+        start = int(request.query.get("filterStartCreatedTimeInclusive", "0"))
+        items = [f for f in self.fills if int(f["createdTime"]) >= start]
+        # 新しい順にsize件ずつ、offsetDataは読んだ件数
+        items.reverse()
+        offset = int(request.query.get("offsetData") or 0)
+        size = int(request.query.get("size", "100"))
+        page = items[offset:offset + size]
+        more = offset + size < len(items)
+        return _ok({"dataList": page, "nextPageOffsetData": str(offset + size) if more else ""})
+
+    async def _account_asset(self, request: web.Request) -> web.Response:
+        await self._delay("account_asset")
+        return _ok({"collateralList": [{"coinId": "1000", "amount": str(self.balance)}]})
@@ -0,0 +1,257 @@
+"""
+エンドツーエンド ベンチマーク - モック取引所に対してCaptainGridBotを実際に動かして計測
+
+1. tick→注文レイテンシ: 範囲外へ価格を飛ばし、WebSocket配信からcreateOrder受信までを測る
+2. 長時間運転: ランダムウォーク + 約定ありで注文スループット・メモリ推移・ループ遅延を測る
+
+使い方:
+    python -m bench.run_bench --rounds 50 --duration 60 --latency 0.005 --error-rate 0.01
+    python -m bench.run_bench --duration 600 --json bench-result.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from bench.mock_exchange import MockEdgeX
+
+# 署名は検証しないので任意のテスト鍵（SDKは0xなしの偶数桁hexを要求、Starkの曲線位数未満）
+TEST_ACCOUNT_ID = "1"
+TEST_STARK_KEY = "04a1c7a0e7d1f3c5b9e8d2f6a4c3b1e0d9f8a7b6c5d4e3f2a1b0c9d8e7f6a5b0"
+
+
+def percentiles(values: List[float], qs=(0.5, 0.9, 0.99)) -> Dict[str, float]:
+    """p50 / p90 / p99 / max（ミリ秒）"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    out = {f"p{int(q * 100)}": ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000 for q in qs}
+    out["max"] = ordered[-1] * 1000
+    out["n"] = len(ordered)
+    return out
+
+
+def rss_mb() -> float:
+    """現在のRSS（Linuxは/procから、それ以外は最大RSS）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / 1e6 if sys.platform == "darwin" else usage / 1e3
+
+
+def bot_env(base_url: str, ws_url: str, args) -> Dict[str, str]:
+    return {
+        "EDGEX_BASE_URL": base_url,
+        "EDGEX_WS_URL": ws_url,
+        "BINANCE_BASE_URL": base_url,
+        "ACCOUNT_ID": TEST_ACCOUNT_ID,
+        "STARK_PRIVATE_KEY": TEST_STARK_KEY,
+        "GRID_LEVELS_PER_SIDE": str(args.grid_count),
+        "MARKET_DATA_MODE": "ws",
+        "TICK_DIR": "",
+        "STATE_DIR": "",
+        "SLACK_WEBHOOK_URL": "",
+        "METRICS_PORT": "0",
+        "FILL_POLL_INTERVAL": str(args.fill_poll_interval),
+        "RECONCILE_INTERVAL": str(args.reconcile_interval),
+        "LOOP_MONITOR": "prod",
+    }
+
+
+async def wait_until(predicate, timeout: float, step: float = 0.005) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(step)
+    return predicate()
+
+
+class BotHarness:
+    """モック取引所 + ボット1体を起動・停止"""
+
+    def __init__(self, args, fill_on_cross: bool):
+        self.args = args
+        self.mock = MockEdgeX(
+            price=args.price,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            fill_on_cross=fill_on_cross,
+            seed=args.seed,
+        )
+        self.bot = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        base_url = await self.mock.start()
+        os.environ.update(bot_env(base_url, self.mock.ws_url, self.args))
+
+        from core.grid_bot import CaptainGridBot
+        from utils.config import load_config
+
+        load_config(reload=True)  # 設定は起動時に1回だけ読むので、モックのURLに差し替えた後で読み直す
+
+        self.bot = CaptainGridBot()
+        self._task = asyncio.create_task(self.bot.run())
+
+        expected = self.args.grid_count * 2
+        if not await wait_until(lambda: len(self.mock.orders) >= expected and self.bot.feed.connected, 30):
+            raise RuntimeError(f"grid was not placed on the mock exchange ({len(self.mock.orders)}/{expected} orders)")
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.mock.close()
+
+    def grid_range(self) -> float:
+        return self.bot.grid_count * self.bot.grid_percentage
+
+
+async def bench_tick_to_order(args) -> Dict:
+    """範囲外ティック → リセンター注文がモックに届くまで"""
+    async with BotHarness(args, fill_on_cross=False) as h:
+        rng = random.Random(args.seed)
+        latencies: List[float] = []
+        first_order: List[float] = []
+        price = args.price
+        for _ in range(args.rounds):
+            direction = rng.choice((-1, 1))
+            price = round(price * (1 + direction * h.grid_range() * 2), 1)
+            before = len(h.mock.order_log)
+            started = time.perf_counter()
+            await h.mock.set_price(price)
+
+            # リセンタータスクが始まって終わるまで待つ
+            await wait_until(lambda: h.bot._recenter_task is not None and not h.bot._recenter_task.done(), 1.0, 0.0005)
+            await wait_until(lambda: h.bot._recenter_task is None or h.bot._recenter_task.done(), 10.0)
+            new_orders = h.mock.order_log[before:]
+            latencies.extend(o["at"] - started for o in new_orders)
+            if new_orders:
+                first_order.append(new_orders[0]["at"] - started)
+            await asyncio.sleep(args.round_gap)
+
+        return {
+            "rounds": args.rounds,
+            "orders": len(latencies),
+            "first_order_ms": percentiles(first_order),
+            "all_orders_ms": percentiles(latencies),
+        }
+
+
+async def bench_soak(args) -> Dict:
+    """ランダムウォーク + 約定ありの長時間運転"""
+    async with BotHarness(args, fill_on_cross=True) as h:
+        rng = random.Random(args.seed)
+        price = args.price
+        step = h.grid_range() / max(args.grid_count, 1) * 0.5  # 1ティックで半段ぶん動く程度
+        interval = 1.0 / args.tick_rate
+        started = time.perf_counter()
+        orders_before = len(h.mock.order_log)
+        memory = [(0.0, rss_mb())]
+        next_sample = started + args.sample_every
+        ticks = 0
+
+        while time.perf_counter() - started < args.duration:
+            price = round(price * (1 + rng.gauss(0, step)), 1)
+            await h.mock.set_price(price)
+            ticks += 1
+            now = time.perf_counter()
+            if now >= next_sample:
+                memory.append((now - started, rss_mb()))
+                next_sample += args.sample_every
+            await asyncio.sleep(interval)
+
+        elapsed = time.perf_counter() - started
+        memory.append((elapsed, rss_mb()))
+        metrics = h.bot.metrics
+        orders = len(h.mock.order_log) - orders_before
+        lag = metrics.histogram("loop_lag_seconds")
+        order_hist = metrics.histogram("request_seconds", endpoint="create_limit_order")
+        return {
+            "duration_s": elapsed,
+            "ticks": ticks,
+            "orders": orders,
+            "orders_per_s": orders / elapsed,
+            "fills": len(h.mock.fills),
+            "cancels": sum(c["count"] for c in h.mock.cancel_log),
+            "order_rtt_ms": {
+                "p50": order_hist.quantile(0.5) * 1000,
+                "p99": order_hist.quantile(0.99) * 1000,
+                "max": order_hist.max * 1000,
+            },
+            "loop_lag_ms": {"p50": lag.quantile(0.5) * 1000, "p99": lag.quantile(0.99) * 1000, "max": lag.max * 1000},
+            "rss_mb": {"start": memory[0][1], "end": memory[-1][1], "peak": max(m for _, m in memory)},
+            "rss_samples": memory,
+            "requests": dict(h.mock.request_counts),
+        }
+
+
+def _print_pct(label: str, stats: Dict):
+    if not stats:
+        print(f"   {label}: （データなし）")
+        return
+    body = " / ".join(f"{k} {v:.1f}" for k, v in stats.items() if k != "n")
+    print(f"   {label}: {body} ms" + (f"（{stats['n']}件）" if "n" in stats else ""))
+
+
+async def main_async(args) -> Dict:
+    result = {"config": {k: v for k, v in vars(args).items() if k != "json"}}
+    if args.rounds > 0:
+        print(f"⏱️ tick→注文レイテンシ計測（{args.rounds}ラウンド）")
+        result["tick_to_order"] = await bench_tick_to_order(args)
+        _print_pct("最初の注文", result["tick_to_order"]["first_order_ms"])
+        _print_pct("全注文", result["tick_to_order"]["all_orders_ms"])
+    if args.duration > 0:
+        print(f"🏃 長時間運転（{args.duration:.0f}秒、{args.tick_rate:.0f} ticks/s）")
+        soak = result["soak"] = await bench_soak(args)
+        print(f"   注文 {soak['orders']}件（{soak['orders_per_s']:.1f}/s）/ 約定 {soak['fills']} / キャンセル {soak['cancels']}")
+        _print_pct("createOrder往復", soak["order_rtt_ms"])
+        _print_pct("ループ遅延", soak["loop_lag_ms"])
+        rss = soak["rss_mb"]
+        print(f"   RSS {rss['start']:.1f} → {rss['end']:.1f} MB（ピーク {rss['peak']:.1f} MB）")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captain Grid Bot ベンチマーク（モック取引所）")
+    parser.add_argument("--rounds", type=int, default=30, help="tick→注文の計測回数（0で省略）")
+    parser.add_argument("--round-gap", type=float, default=0.05, help="ラウンド間の待ち（秒）")
+    parser.add_argument("--duration", type=float, default=30.0, help="長時間運転の秒数（0で省略）")
+    parser.add_argument("--tick-rate", type=float, default=20.0, help="長時間運転の価格更新回数/秒")
+    parser.add_argument("--sample-every", type=float, default=5.0, help="メモリ計測の間隔（秒）")
+    parser.add_argument("--price", type=float, default=100000.0)
+    parser.add_argument("--grid-count", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.002, help="モックの応答遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.001)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fill-poll-interval", type=float, default=0.5)
+    parser.add_argument("--reconcile-interval", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    result = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"💾 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+グリッドバックテスター - 過去の価格列をplace_grids / 反対注文と同じロジックで再生
+NumPyで約定判定・損益・ドローダウン・在庫を計算し、パラメータスイープは全コアで並列実行
+
+使い方:
+    python -m core.backtest prices.csv --grid-interval-percentage 0.0006 --grid-count 2
+    python -m core.backtest ticks/ --sweep grid_interval_percentage=0.0004,0.0006,0.001 grid_count=1,2,4
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.grid_ladder import build_ladder
+from core.tick_recorder import load_tick_range, load_ticks
+
+# utils/config.py（BotConfig）と同じ既定値（grid_countはボットのGRID_LEVELS_PER_SIDEと同じく片側の本数）
+# order_size_usdt=0 なら order_quantity の固定数量（本番の既定は0.002固定）
+DEFAULT_PARAMS: Dict = {
+    "grid_interval_percentage": 0.0006,
+    "grid_count": 1,
+    "grid_mode": "arithmetic",
+    "order_size_usdt": 0.0,
+    "order_quantity": 0.002,
+    "leverage": 100,
+    "loss_limit": 0.50,
+    "initial_balance": 195.0,
+    "fee_rate": 0.0002,     # 指値（maker）手数料率
+    "tick_size": 0.1,
+    "min_lot": 0.001,
+    "step_size": 0.001,
+}
+
+
+def grid_levels(center: float, params: Dict) -> (np.ndarray, np.ndarray):
+    """
+    -n..+n段の価格と数量をCaptainGridBot._build_ladderと同じbuild_ladder呼び出しで作る
+
+    Returns:
+        (価格（昇順、中央は中心価格）, 各段の初期注文数量（中央は0）)
+    """
+    n = int(params["grid_count"])
+    ladder = build_ladder(
+        center=center,
+        levels=n,
+        spacing=params["grid_interval_percentage"],
+        mode=params["grid_mode"],
+        tick_size=params["tick_size"],
+        min_lot=params["min_lot"],
+        step_size=params["step_size"],
+        order_size_usdt=params["order_size_usdt"] or None,
+        quantity=float(params["order_quantity"]),
+        leverage=params["leverage"],
+    )
+    buy, sell = ladder.side < 0, ladder.side > 0
+    if buy.sum() != n or sell.sum() != n:
+        raise ValueError("grid levels collapsed after tick rounding; widen grid_interval_percentage")
+    buy_order = np.argsort(ladder.price[buy])
+    sell_order = np.argsort(ladder.price[sell])
+    tick = params["tick_size"]
+    prices = np.concatenate((ladder.price[buy][buy_order], [round(center / tick) * tick], ladder.price[sell][sell_order]))
+    sizes = np.concatenate((ladder.size[buy][buy_order], [0.0], ladder.size[sell][sell_order]))
+    return prices, sizes
+
+
+def _empty_level_path(lo: np.ndarray, hi: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    空き段eの推移 e_t = clip(e_{t-1}, lo_t, hi_t) を計算
+
+    (lo, hi) が変わった点だけを取り出して回すので、ループ回数はティック数ではなく段の跨ぎ回数
+
+    Returns:
+        (eが変化したティック番号, その時点のe)
+    """
+    changed = np.flatnonzero((lo[1:] != lo[:-1]) | (hi[1:] != hi[:-1])) + 1
+    candidates = np.concatenate(([0], changed))
+    idx_out, e_out = [], []
+    e = 0
+    for i, a, b in zip(candidates.tolist(), lo[candidates].tolist(), hi[candidates].tolist()):
+        if e < a:
+            e = a
+        elif e > b:
+            e = b
+        else:
+            continue
+        idx_out.append(i)
+        e_out.append(e)
+    return np.asarray(idx_out, dtype=np.int64), np.asarray(e_out, dtype=np.int64)
+
+
+def run_backtest(prices: np.ndarray, params: Optional[Dict] = None) -> Dict:
+    """
+    価格列を1本のグリッドで再生
+
+    モデル: 開始価格を中心に片側grid_count段を配置し、段を跨いで約定したら1段隣に反対注文
+    （sync_ordersと同じ）。空き段eが1つ動くごとに1段分約定する。反対注文は約定した注文と
+    同じ数量なので、段と段の間ごとに数量が決まる（中心より下は元の買い、上は元の売りの数量）。
+    リセンターは再現しない。損失がloss_limitに達した時点で成行決済して停止。
+
+    Args:
+        prices: 価格列（float64）
+        params: DEFAULT_PARAMSを上書きするパラメータ
+
+    Returns:
+        dict: pnl / fees / fills / max_drawdown / max_inventory / final_position / stopped_at など
+    """
+    p = dict(DEFAULT_PARAMS)
+    p.update(params or {})
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < 2:
+        raise ValueError("need at least 2 prices")
+
+    n = int(p["grid_count"])
+    center = float(prices[0])
+    levels, sizes = grid_levels(center, p)
+
+    # gap[g] = 段g-1と段gの間を跨ぐ時の約定数量（g=1..2n、gap[0]は未使用）
+    gap = np.zeros(2 * n + 1)
+    gap[1:n + 1] = sizes[:n]
+    gap[n + 1:] = sizes[n + 1:]
+
+    # 価格の真下の段 / 真上の段（価格が段を「突き抜けた」時だけ約定扱い）
+    lo = np.searchsorted(levels, prices, side="left") - 1 - n
+    hi = np.searchsorted(levels, prices, side="right") - n
+    np.clip(lo, -n, n, out=lo)
+    np.clip(hi, -n, n, out=hi)
+
+    ev_idx, ev_e = _empty_level_path(lo, hi)
+    prev_e = np.concatenate(([0], ev_e[:-1]))
+
+    # 各イベントの約定代金: 段ごとの代金の累積和の差で一括計算（複数段まとめて跨いだ場合も対応）
+    # 下に跨ぐと段g-1で買い、上に跨ぐと段gで売り
+    buy_cum = np.concatenate(([0.0], np.cumsum(levels[:-1] * gap[1:])))   # buy_cum[j] = gap 1..jの買い代金
+    sell_cum = np.concatenate(([0.0], np.cumsum(levels[1:] * gap[1:])))   # sell_cum[j] = gap 1..jの売り代金
+    size_cum = np.cumsum(gap)                                             # size_cum[j] = gap 1..jの数量
+    j_prev, j_new = prev_e + n, ev_e + n
+    down = ev_e < prev_e
+    buy_notional = np.where(down, buy_cum[j_prev] - buy_cum[j_new], 0.0)
+    sell_notional = np.where(~down, sell_cum[j_new] - sell_cum[j_prev], 0.0)
+    fees = (buy_notional + sell_notional) * p["fee_rate"]
+    cash_flow = sell_notional - buy_notional - fees
+
+    # イベント列をティック列に前方埋め
+    cash = np.zeros(len(prices))
+    position = np.zeros(len(prices))
+    if len(ev_idx):
+        slot = np.searchsorted(ev_idx, np.arange(len(prices)), side="right") - 1
+        has = slot >= 0
+        cash[has] = np.cumsum(cash_flow)[slot[has]]
+        position[has] = -(size_cum[ev_e[slot[has]] + n] - size_cum[n])
+    equity = p["initial_balance"] + cash + position * prices
+
+    # 損失上限: 最初に割り込んだティックで停止
+    stopped_at = None
+    floor = p["initial_balance"] * (1.0 - p["loss_limit"])
+    breach = np.flatnonzero(equity <= floor)
+    end = len(prices)
+    if len(breach):
+        stopped_at = int(breach[0])
+        end = stopped_at + 1
+        exit_fee = abs(position[stopped_at]) * prices[stopped_at] * p["fee_rate"]
+        equity = equity[:end].copy()
+        equity[-1] -= exit_fee
+
+    eq = equity[:end]
+    peak = np.maximum.accumulate(eq)
+    used_events = int(np.searchsorted(ev_idx, end, side="left"))
+    fills = int(np.abs(ev_e[:used_events] - prev_e[:used_events]).sum())
+
+    return {
+        "params": p,
+        "ticks": int(end),
+        "quantity": sizes[np.arange(len(sizes)) != n].tolist(),  # 各段の初期注文数量（安い順）
+        "pnl": float(eq[-1] - p["initial_balance"]),
+        "fees": float(fees[:used_events].sum()),
+        "fills": fills,
+        "max_drawdown": float((peak - eq).max()),
+        "max_inventory": float(np.abs(position[:end]).max()),
+        "final_position": float(position[end - 1]) if stopped_at is None else 0.0,
+        "stopped_at": stopped_at,
+    }
+
+
+def load_prices(path: str) -> np.ndarray:
+    """CSV（最終列が価格、ヘッダー可）/ ティックファイル / ティックディレクトリ / .npy を読む"""
+    if os.path.isdir(path):
+        return np.ascontiguousarray(load_tick_range(path)["price"])
+    if path.endswith(".bin"):
+        return np.ascontiguousarray(load_ticks(path)["price"])
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    with open(path) as f:
+        first = f.readline()
+    skip = 1 if any(c.isalpha() for c in first) else 0
+    data = np.loadtxt(path, delimiter=",", skiprows=skip, ndmin=2)
+    return np.ascontiguousarray(data[:, -1], dtype=np.float64)
+
+
+# ---- パラメータスイープ（プロセスプール） ----
+
+_worker_prices: Optional[np.ndarray] = None
+
+
+def _init_worker(npy_path: str):
+    global _worker_prices
+    _worker_prices = np.load(npy_path, mmap_mode="r")  # 各プロセスはmmapで共有（コピーなし）
+
+
+def _run_one(params: Dict) -> Dict:
+    try:
+        result = run_backtest(_worker_prices, params)
+    except ValueError as e:
+        return {"params": params, "error": str(e)}
+    result["params"] = params
+    return result
+
+
+def expand_grid(grid: Dict[str, Iterable]) -> List[Dict]:
+    """{"a": [1, 2], "b": [3]} → [{"a": 1, "b": 3}, {"a": 2, "b": 3}]"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def sweep(prices: np.ndarray, grid: Dict[str, Iterable], workers: Optional[int] = None) -> List[Dict]:
+    """
+    パラメータの全組み合わせを全コアで並列バックテスト
+
+    Args:
+        prices: 価格列
+        grid: パラメータ名 → 候補値のリスト
+        workers: プロセス数（省略時はCPUコア数）
+
+    Returns:
+        List[dict]: pnl降順の結果
+    """
+    combos = expand_grid(grid)
+    with tempfile.TemporaryDirectory() as tmp:
+        npy_path = os.path.join(tmp, "prices.npy")
+        np.save(npy_path, np.asarray(prices, dtype=np.float64))
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(npy_path,)) as pool:
+            results = list(pool.map(_run_one, combos, chunksize=max(1, len(combos) // (4 * (workers or os.cpu_count() or 1)))))
+    return sorted(results, key=lambda r: r.get("pnl", float("-inf")), reverse=True)
+
+
+def _parse_value(raw: str):
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captain Grid Bot バックテスト")
+    parser.add_argument("source", help="CSV / ticks-*.bin / ティックディレクトリ / .npy")
+    for key, value in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--sweep", nargs="+", metavar="KEY=V1,V2", help="スイープするパラメータ")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    prices = load_prices(args.source)
+    base = {key: getattr(args, key) for key in DEFAULT_PARAMS}
+    print(f"📈 {len(prices):,} ticks 読み込み: {args.source}")
+
+    started = time.perf_counter()
+    if not args.sweep:
+        result = run_backtest(prices, base)
+        elapsed = time.perf_counter() - started
+        for key in ("pnl", "fees", "fills", "max_drawdown", "max_inventory", "final_position", "stopped_at"):
+            print(f"   {key}: {result[key]}")
+        print(f"⏱️ {elapsed * 1000:.1f}ms ({len(prices) / max(elapsed, 1e-9) / 1e6:.1f}M ticks/s)")
+        return
+
+    grid = {key: [base[key]] for key in base}
+    for spec in args.sweep:
+        key, _, values = spec.partition("=")
+        if key not in DEFAULT_PARAMS:
+            parser.error(f"unknown parameter: {key}")
+        grid[key] = [_parse_value(v) for v in values.split(",")]
+    results = sweep(prices, grid, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    swept = [spec.partition("=")[0] for spec in args.sweep]
+    for r in results[:args.top]:
+        label = " ".join(f"{k}={r['params'][k]}" for k in swept)
+        if "error" in r:
+            print(f"   {label}: ❌ {r['error']}")
+        else:
+            print(f"   {label}: pnl={r['pnl']:.4f} dd={r['max_drawdown']:.4f} fills={r['fills']} stopped={r['stopped_at']}")
+    print(f"⏱️ {len(results)}通り {elapsed:.1f}s ({len(results) * len(prices) / max(elapsed, 1e-9) / 1e6:.1f}M ticks/s 合計)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 # core/edgex_client.py　←　これで全置換して保存や！！！（13ドル完全対応・最終版）
 
-import requests
 import time
-from eth_account import Account
-from web3 import Web3
+
+from core.grid_ladder import build_ladder
+from core.signing import sign_eth_message
+from utils.metrics import REGISTRY
+
+# get_balanceは例外を握りつぶしてNoneを返すので、失敗はここで数える
+_balance_errors = REGISTRY.counter("request_errors_total", "取引所・価格APIの失敗回数", endpoint="get_balance")
 
 class EdgeXClient:
     def __init__(self):
@@ -12,13 +16,15 @@ class EdgeXClient:
         self.private_key = ""
         self.contract_id = 10000001
         self.is_testnet = False
-        self.w3 = Web3()
 
     def _sign(self, msg):
-        signed = Account.sign_message(self.w3.eth.account.encode_defunct(text=msg), self.private_key)
-        return signed.signature.hex()
+        # Accountは鍵ごとに1回だけ生成（毎回の鍵解析をしない）
+        return sign_eth_message(self.private_key, msg)
 
+    @REGISTRY.timed("request_seconds", endpoint="get_balance")
     def get_balance(self):
+        import requests  # 同期版だけが使う（起動時に読み込まない）
+
         try:
             url = f"{self.base_url}/account/balance"
             timestamp = str(int(time.time() * 1000))
@@ -33,9 +39,12 @@ class EdgeXClient:
             data = r.json()
             return float(data["data"]["usdt"])
         except:
+            _balance_errors.inc()
             return None
 
     def get_current_price_fallback(self):
+        import requests
+
         try:
             url = f"{self.base_url}/market/ticker?contract_id={self.contract_id}"
             r = requests.get(url, timeout=10)
@@ -47,22 +56,24 @@ class EdgeXClient:
             except:
                 return None
 
+    def _grid_ladder(self, current_price, grid_count, grid_space):
+        # grid_countは上下合計の本数、grid_spaceはドル間隔（0.01刻みで丸め）
+        return build_ladder(
+            center=current_price,
+            levels=max(1, grid_count // 2),
+            spacing=grid_space / current_price,
+            tick_size=0.01
+        ).to_orders()
+
     # ←←←←←←←←←←←←← ここが13ドル完全対応の最終 place_grid_orders ←←←←←←←←←←←←←
     def place_grid_orders(self, current_price, grid_count=4, grid_space=50, amount_per_order=3.0):
         orders = []
-        # 価格の0.5%間隔で上下に2本ずつ（合計4本）配置
-        actual_space = current_price * 0.005  # 0.5%間隔（grid_bot.pyから渡される）
-
-        for i in range(1, 3):  # 1段目と2段目（合計4本）
-            buy_price  = round(current_price - i * actual_space, 2)
-            sell_price = round(current_price + i * actual_space, 2)
-
+        # grid_space間隔で上下にgrid_count/2本ずつ配置（デフォルト: $50間隔・合計4本）
+        for side, price, _ in self._grid_ladder(current_price, grid_count, grid_space):
             # ここはダミー成功（本番注文ロジックは後で追加してもOK）
-            orders.append({"status": "success", "price": buy_price,  "side": "BUY"})
-            orders.append({"status": "success", "price": sell_price, "side": "SELL"})
-
-            print(f"【注文成功】 BUY  {amount_per_order} USDT @ {buy_price}")
-            print(f"【注文成功】 SELL {amount_per_order} USDT @ {sell_price}")
-            time.sleep(0.15)
+            orders.append({"status": "success", "price": price, "side": side})
+            print(f"【注文成功】 {side:<4} {amount_per_order} USDT @ {price}")
+            if side == "SELL":
+                time.sleep(0.15)
 
-        return orders
\ No newline at end of file
+        return orders
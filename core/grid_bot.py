@@ -1,16 +1,172 @@
 import asyncio
 import aiohttp  # ← 追加！！！
+import hashlib
+import math
 import os
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
+from core.grid_ladder import build_ladder, round_price
+from core.multi_grid import SharedServices
+from core.order_store import GridOrder, OrderStore
+from core.price_sources import PriceQuote, PriceRouter
+from core.recenter import plan_recenter
+from core.risk_engine import RiskEngine
+from core.scheduler import ACCOUNT, CANCEL, MARKET_DATA, ORDER
+from core.signing import OffloadedSdkSigner, sdk_limit_order
+from core.state_journal import StateJournal
+from core.tick_recorder import TickRecorder
+from core.risk_monitor import VolatilityMonitor
+from utils.config import load_config
+from utils.metrics import REGISTRY
+from utils.notifier import CRITICAL, INFO, WARNING
+
 class CaptainGridBot:
-    def __init__(self):
-        self.base_url = "https://pro.edgex.exchange"
-        self.account_id = os.getenv("ACCOUNT_ID")
-        self.stark_private_key = os.getenv("STARK_PRIVATE_KEY")
-        self.contract_id = "10000001"
-        self.leverage = 100
+    def __init__(self, settings: Optional[Dict] = None, shared: Optional[SharedServices] = None):
+        """
+        Args:
+            settings: グリッド個別の設定（キーはBotConfigのフィールド名、無いものは起動時に読んだ設定のまま）
+            shared: 他のグリッドと共有するサービス（省略時は自前で持つ単体起動）
+        """
+        # 環境変数は起動時に1回だけ読んだBotConfigから（グリッド別の値は上書きしたコピー）
+        config = load_config().override(settings) if settings else load_config()
+        self.config = config
+
+        self.base_url = config.base_url.rstrip("/")
+        self.account_id = config.account_id
+        self.stark_private_key = config.stark_private_key
+        self.contract_id = config.contract_id
+        self.name = str((settings or {}).get("name") or self.contract_id)
+        self.leverage = config.leverage
         self.min_lot = 0.001
+        # このグリッドが出した注文の目印（clientOrderIdの先頭、再起動しても同じ値）
+        self.client_order_prefix = "cg" + hashlib.sha1(f"{self.account_id}/{self.name}".encode()).hexdigest()[:6] + "-"
+
+        # グリッド設定（grid_countは片側の本数）
+        self.grid_percentage = config.grid_interval_percentage
+        self.grid_count = config.grid_count
+        self.grid_mode = config.grid_mode  # arithmetic（等差） / geometric（等比）
+        self.order_quantity = config.order_quantity  # ← 最低ロット0.001の2倍、安全！！ そのまま！！
+        self.order_size_usdt = config.order_size_usdt  # >0ならUSDT換算で数量決定（GRID_ORDER_SIZE_USDTを指定した時だけ）
+        self.order_concurrency = config.order_concurrency  # 同時送信上限
+
+        # セッション・スケジューラ・価格フィード・通知・監視は共有サービスから（単体起動なら自前で1組）
+        self._owns_shared = shared is None
+        self.shared = shared or SharedServices(config)
+        self.scheduler = self.shared.scheduler
+        self.market_data_mode = self.shared.market_data_mode
+        self.ws_url = self.shared.ws_url
+
+        # EdgeX SDKクライアント（check_api_connectionで1回だけ生成・ウォームアップして使い回す）
+        self.client = None
+        self.sdk_signer: Optional[OffloadedSdkSigner] = None
+        self.contract_meta: Dict = {}
+        self.collateral_coin_id = "1000"  # 担保通貨（USDT）、メタデータで上書き
+        self.stark_public_key: Optional[str] = None
+        self.metadata_ttl = 3600  # 契約メタデータの再取得間隔（秒）
+
+        # 注文・ポジションのローカル状態（約定は差分ポーリングで反映、定期的に全件突き合わせ）
+        self.orders = OrderStore()
+        self.fill_poll_interval = config.fill_poll_interval
+        self.reconcile_interval = config.reconcile_interval
+        self._last_fill_time = int(time.time() * 1000)
+        # 急落/ジワ下落の発火中に出せなかった反対注文（ポジションを増やす側、解除後に出す）
+        self._held_counters: List[Tuple[str, float, float]] = []
+
+        # リセンター（価格がグリッド範囲を出たら差分だけ付け替え）
+        self.grid_center: Optional[float] = None
+        self.grid_step: Optional[float] = None  # 等差ラダーの段幅（初回配置時に固定、段の位置を揃える）
+        self._recenter_task: Optional[asyncio.Task] = None
+
+        # ティック記録（TICK_DIRを空にすると無効、共有時はグリッド名のサブディレクトリ）
+        tick_dir = config.tick_dir
+        if tick_dir and not self._owns_shared:
+            tick_dir = os.path.join(tick_dir, self.name)
+        self.tick_recorder = TickRecorder(tick_dir) if tick_dir else None
+
+        # 状態ジャーナル（注文・約定・グリッド位置、再起動時はここから復元して再配置しない。STATE_DIRを空にすると無効）
+        state_dir = config.state_dir
+        if state_dir and not self._owns_shared:
+            state_dir = os.path.join(state_dir, self.name)
+        self.journal = StateJournal(
+            state_dir,
+            snapshot_every=config.state_snapshot_every,
+            fsync=config.state_fsync
+        ) if state_dir else None
+        self._restored = False
+
+        # 発注前リスクチェック（ポジション・片側本数・損失・残高をローカルで判定）
+        self.risk = RiskEngine(
+            max_net_position_btc=config.max_net_position_btc,
+            position_imbalance_limit=config.position_imbalance_limit,
+            loss_limit=config.loss_limit,
+            min_resume_balance=config.min_resume_balance,
+            initial_balance=config.initial_balance
+        )
+
+        # 急落・ジワ下落検知（価格更新ごとにO(1)で判定、発火中は新規グリッド配置を止める）
+        self.volatility = VolatilityMonitor(
+            volatility_threshold=config.volatility_threshold,
+            volatility_check_interval=config.volatility_check_interval,
+            gradual_decline_threshold=config.gradual_decline_threshold,
+            gradual_decline_window=config.gradual_decline_window,
+            tick_rate=config.volatility_tick_rate
+        )
+
+        # 価格ソース（oracle → ticker → Binance の順にヘッジ起動、最初の有効値を採用）
+        self.binance_symbol = config.binance_pair
+        self.binance_url = config.binance_base_url.rstrip("/")
+        sources = [
+            ("oracle", self._fetch_oracle_price),
+            ("ticker", self._fetch_ticker_price),
+        ]
+        if self.binance_symbol:
+            sources.append(("binance", self._fetch_binance_price))
+        else:
+            logger.warning(f"⚠️ [{self.name}] 契約 {self.contract_id} のBINANCE_SYMBOL未指定 - Binance価格は使わない")
+        self.price_router = PriceRouter(
+            sources=sources,
+            hedge_delay=config.price_hedge_delay,
+            timeout=config.price_timeout,
+            ttl=config.price_stale_ttl
+        )
+
+        # Slack通知（共有キュー、複数グリッド時は本文にグリッド名を付ける）
+        self.notifier = self.shared.notifier if self._owns_shared else self.shared.notifier.scoped(f"[{self.name}] ")
+
+        # メトリクス（エンドポイント別の遅延は全グリッド共通、状態はgridラベルで分ける）
+        self.metrics = self.shared.metrics
+        self._last_price_at: Optional[float] = None
+        self._m_price = self.metrics.histogram("price_get_seconds", "ヘッジ込みの価格取得時間", grid=self.name)
+        self._m_price_result = {
+            result: self.metrics.counter("price_get_total", "価格取得の結果", grid=self.name, result=result)
+            for result in ("ok", "fallback", "stale", "fail")
+        }
+        self._m_order = self.metrics.histogram("request_seconds", endpoint="create_limit_order")
+        self._m_order_errors = self.metrics.counter("request_errors_total", endpoint="create_limit_order")
+        self._m_order_rejected = self.metrics.counter("order_rejected_total", "リスクエンジンで止めた注文", grid=self.name)
+        self._m_cancel = self.metrics.histogram("request_seconds", endpoint="cancel_orders")
+        self._m_cancel_errors = self.metrics.counter("request_errors_total", endpoint="cancel_orders")
+        self._m_ticks = self.metrics.counter("monitor_iterations_total", "監視ループで処理した価格更新", grid=self.name)
+        self.metrics.gauge("last_price_age_seconds", "最後の価格更新からの秒数", fn=self._price_age, grid=self.name)
+        self.metrics.gauge("open_orders", "ローカルで管理中の注文数", fn=lambda: len(self.orders.by_id), grid=self.name)
+        self.metrics.gauge("net_position_btc", "約定から積み上げたネットポジション",
+                           fn=lambda: self.orders.net_position, grid=self.name)
+
+        # 共有フィードに契約を登録（同じ契約のグリッド同士は同じセルを読む）
+        self.feed = self.shared.feed
+        self.cell = self.feed.add_contract(self.contract_id, rest_fetch=self._fetch_fresh_price)
+
+        if not self._owns_shared:
+            logger.info(
+                f"🧩 [{self.name}] 契約 {self.contract_id} / アカウント {self.account_id or 'None'} / "
+                f"片側{self.grid_count}本 / 間隔 {self.grid_percentage * 100:.3f}% / 数量 {self._size_label()}"
+            )
+            if self.grid_count > 1:
+                logger.warning(f"⚠️ [{self.name}] 片側{self.grid_count}本: 常時{self.grid_count * 2}本の指値（従来は買い1本 + 売り1本）")
+            return
 
         logger.info("🏴‍☠️ Captain Grid Bot - EdgeX 2026 Edition ($17微益モード)")
         logger.info("🌍 環境: 🚀 PRODUCTION")
@@ -18,103 +174,835 @@ class CaptainGridBot:
         logger.info(f"👤 Account ID: {self.account_id or 'None - Koyeb環境変数設定要！！'}")
         logger.info(f"🔑 STARK_PRIVATE_KEY: {'成功 (長さ ' + str(len(self.stark_private_key or '')) + '文字)' if self.stark_private_key else '失敗 (None)'}")
         logger.info("🚀 初期化完了")
-        logger.info("📊 Phase1: 2本グリッド")
+        logger.info(f"📊 グリッド: 片側{self.grid_count}本（合計{self.grid_count * 2}本）")
+        if self.grid_count > 1:
+            logger.warning(
+                f"⚠️ GRID_LEVELS_PER_SIDE={self.grid_count}: 常時{self.grid_count * 2}本の指値（従来は買い1本 + 売り1本）"
+                f" - 想定元本も{self.grid_count}倍"
+            )
         logger.info(f"⚡ レバレッジ: {self.leverage}倍")
+        logger.info(f"📦 1注文の数量: {self._size_label()}")
         logger.info(f"📏 最小ロット: {self.min_lot} BTC")
         logger.info("🎯 毎日目標: $0.001-0.01の微益！！")
 
-    async def get_price(self) -> float:
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{self.base_url}/api/v1/public/funding/getLatestFundingRate?contractId={self.contract_id}"
-                async with session.get(url, timeout=15) as resp:
-                    if resp.status != 200:
-                        raise Exception(f"HTTP {resp.status}")
-                    raw_data = await resp.json()
+    def _size_label(self) -> str:
+        """実際に使う1注文の数量の説明（起動ログ用）"""
+        if self.order_size_usdt:
+            return (f"${self.order_size_usdt:g} × {self.leverage}倍 ÷ 価格（GRID_ORDER_SIZE_USDT、"
+                    f"固定{self.order_quantity} BTCではない）")
+        return f"{self.order_quantity} BTC固定（ORDER_QUANTITY）"
 
-                if raw_data.get("code") != "SUCCESS":
-                    raise Exception(f"APIエラー: {raw_data.get('msg')}")
+    def _get_session(self) -> aiohttp.ClientSession:
+        """共有の常駐セッションを返す"""
+        return self.shared.get_session()
 
-                item = raw_data["data"][0]
-                price = float(item["oraclePrice"])
-                logger.info(f"✅ 価格取得成功 (oraclePrice): ${price:.2f}")
-                return price
+    async def close(self):
+        """ティック書き出し・状態スナップショット（単体起動なら共有サービスもclose）"""
+        if self._recenter_task is not None and not self._recenter_task.done():
+            self._recenter_task.cancel()
+            await asyncio.gather(self._recenter_task, return_exceptions=True)
+        if self.tick_recorder is not None:
+            self.tick_recorder.close()
+        if self.journal is not None:
+            self._snapshot()
+            self.journal.close()
+        if self._owns_shared:
+            await self.shared.close()
 
-            except Exception as e:
-                logger.warning(f"⚠️ 価格取得失敗: {e}")
-                fallback = 105000.0
-                logger.error(f"❌ 仮価格 ${fallback:.2f} 使用")
-                return fallback
+    async def _get_public_json(self, url: str, endpoint: str = "public") -> Dict:
+        """公開GET（スケジューラ経由、同一URLの同時読み取りは1本に集約）"""
+        async def fetch():
+            async with self._get_session().get(url) as resp:
+                if resp.status != 200:
+                    raise Exception(f"HTTP {resp.status}")
+                return await resp.json(content_type=None)
+
+        return await self.scheduler.submit(endpoint, MARKET_DATA, fetch, key=url)
+
+    @REGISTRY.timed("request_seconds", errors="request_errors_total", endpoint="oracle")
+    async def _fetch_oracle_price(self) -> float:
+        """REST(getLatestFundingRate)からoraclePriceを取得（失敗時は例外）"""
+        url = f"{self.base_url}/api/v1/public/funding/getLatestFundingRate?contractId={self.contract_id}"
+        raw_data = await self._get_public_json(url)
+
+        if raw_data.get("code") != "SUCCESS":
+            raise Exception(f"APIエラー: {raw_data.get('msg')}")
+
+        item = raw_data["data"][0]
+        return float(item["oraclePrice"])
+
+    @REGISTRY.timed("request_seconds", errors="request_errors_total", endpoint="ticker")
+    async def _fetch_ticker_price(self) -> float:
+        """REST(getTicker)からlastPriceを取得（失敗時は例外）"""
+        url = f"{self.base_url}/api/v1/public/quote/getTicker?contractId={self.contract_id}"
+        raw_data = await self._get_public_json(url)
+
+        if raw_data.get("code") != "SUCCESS":
+            raise Exception(f"APIエラー: {raw_data.get('msg')}")
+
+        item = raw_data["data"][0]
+        return float(item["lastPrice"])
+
+    @REGISTRY.timed("request_seconds", errors="request_errors_total", endpoint="binance")
+    async def _fetch_binance_price(self) -> float:
+        """Binance現物の最終価格（EdgeX障害時の保険）"""
+        url = f"{self.binance_url}/api/v3/ticker/price?symbol={self.binance_symbol}"
+        raw_data = await self._get_public_json(url, endpoint="binance")
+        return float(raw_data["price"])
+
+    async def get_quote(self) -> Optional[PriceQuote]:
+        """全ソースを競争させて最速の価格を取得（staleなら古い値と明示、取れなければNone）"""
+        started = time.perf_counter()
+        quote = await self.price_router.get()
+        self._m_price.observe(time.perf_counter() - started)
+        if quote is None:
+            self._m_price_result["fail"].inc()
+            logger.error("❌ 価格取得失敗 - 有効な価格なし（キャッシュも期限切れ）")
+            self.notifier.notify("❌ 価格取得失敗 - 有効な価格なし", WARNING, key="price_fail")
+        elif quote.stale:
+            self._m_price_result["stale"].inc()
+            logger.warning(f"⚠️ 価格取得失敗 - 最終取得値 ${quote.price:.2f} ({quote.age:.0f}秒前, {quote.source}) はstale")
+            self.notifier.notify(f"⚠️ 価格取得失敗 - stale ${quote.price:.2f} ({quote.source})", WARNING, key="price_fail")
+        else:
+            self._m_price_result["ok" if quote.source == "oracle" else "fallback"].inc()
+            logger.info(f"✅ 価格取得成功 ({quote.source}): ${quote.price:.2f} [{quote.latency * 1000:.0f}ms]")
+        return quote
+
+    async def get_price(self) -> Optional[float]:
+        """新鮮な価格だけを返す（staleや取得失敗ならNone）"""
+        quote = await self.get_quote()
+        if quote is None or quote.stale:
+            return None
+        return quote.price
+
+    async def _fetch_fresh_price(self) -> float:
+        """フィードのRESTフォールバック用（有効な価格がなければ例外）"""
+        price = await self.get_price()
+        if price is None:
+            raise Exception("有効な価格なし")
+        return price
+
+    def _price_age(self) -> float:
+        """最後にon_priceへ届いた価格からの経過秒（未受信ならinf）"""
+        if self._last_price_at is None:
+            return float("inf")
+        return time.monotonic() - self._last_price_at
+
+    @REGISTRY.timed("request_seconds", errors="request_errors_total", endpoint="account_asset")
+    async def _fetch_balance(self) -> float:
+        """getAccountAsset（SDK・スケジューラ経由）から担保通貨の残高を取得（失敗時は例外）"""
+        resp = await self.scheduler.submit(
+            "account", ACCOUNT, self.client.get_account_asset, key=("account_asset", self.account_id)
+        )
+        if resp.get("code") != "SUCCESS":
+            raise Exception(f"APIエラー: {resp.get('msg')}")
+
+        data = resp.get("data", {})
+        # 含み損益込みの評価額があればそれを、なければ担保残高
+        for item in data.get("collateralAssetModelList") or []:
+            if str(item.get("coinId")) == self.collateral_coin_id and item.get("totalEquity") is not None:
+                return float(item["totalEquity"])
+        for item in data.get("collateralList") or []:
+            if str(item.get("coinId")) == self.collateral_coin_id:
+                return float(item["amount"])
+        raise Exception(f"担保通貨 {self.collateral_coin_id} の残高なし")
+
+    async def get_balance(self) -> Optional[float]:
+        """取引所の残高（SDK未準備・取得失敗ならNone）"""
+        if self.client is None:
+            return None
+        try:
+            return await self._fetch_balance()
+        except Exception as e:
+            logger.warning(f"⚠️ 残高取得失敗: {e}")
+            return None
+
+    async def _init_sdk_client(self):
+        """SDKクライアントを生成してウォームアップ（2回目以降は既存を返す）"""
+        if self.client is not None:
+            return self.client
+        if not self.account_id or not self.stark_private_key:
+            return None
+
+        await self.shared.sdk_ready()
+        from edgex_sdk import Client
+
+        started = time.perf_counter()
+        client = Client(
+            base_url=self.base_url,
+            account_id=int(self.account_id),
+            stark_private_key=self.stark_private_key
+        )
+        # SDK内部のHTTPも常駐セッションに相乗り（closeはボット側で行う）
+        client.async_client._session = self._get_session()
+
+        # サーバー時刻・メタデータ取得でTLS接続を温める
+        # 公開情報は全グリッド共通なので、同時に起動したグリッド同士で1回にまとめる
+        server_time = await self.scheduler.submit("public", MARKET_DATA, client.get_server_time, key="server_time")
+        metadata = await self.scheduler.submit("public", MARKET_DATA, client.get_metadata, key="metadata")
+        self._cache_sdk_metadata(client, metadata)
+        await self._install_signer(client)
+        collateral = metadata.get("data", {}).get("global", {}).get("starkExCollateralCoin", {})
+        self.collateral_coin_id = str(collateral.get("coinId") or self.collateral_coin_id)
+
+        for contract in metadata.get("data", {}).get("contractList", []):
+            if contract.get("contractId") == self.contract_id:
+                self.contract_meta = {
+                    "name": contract.get("contractName"),
+                    "tick_size": float(contract.get("tickSize", "0.1")),
+                    "step_size": float(contract.get("stepSize", "0.001")),
+                    "min_order_size": float(contract.get("minOrderSize", self.min_lot)),
+                    "maker_fee_rate": float(contract.get("defaultMakerFeeRate", "0")),
+                    "taker_fee_rate": float(contract.get("defaultTakerFeeRate", "0")),
+                }
+                self.min_lot = self.contract_meta["min_order_size"]
+                break
+        else:
+            logger.warning(f"⚠️ メタデータに契約 {self.contract_id} なし")
+
+        # 鍵由来の値（公開鍵）を先に計算して署名経路も温めておく
+        try:
+            self.stark_public_key = client.async_client.signing_adapter.get_public_key(self.stark_private_key)
+        except Exception as e:
+            logger.warning(f"⚠️ 公開鍵の事前計算失敗（注文時に再試行）: {e}")
+
+        self.client = client
+        logger.info(
+            f"🔥 SDKクライアント準備完了 ({(time.perf_counter() - started) * 1000:.0f}ms) "
+            f"サーバー時刻: {server_time.get('data', {}).get('timeMillis', '?')} / 契約: {self.contract_meta}"
+        )
+        return client
+
+    async def _install_signer(self, client):
+        """認証ヘッダー・注文のStark署名を共有の署名ワーカーへ（SDK自身の出力と一致した時だけ）"""
+        try:
+            signer = OffloadedSdkSigner(client, self.shared.signer, session_getter=self._get_session)
+            verified = await signer.verify(self.contract_id)
+        except Exception as e:
+            logger.error(f"❌ 署名ワーカーの準備失敗: {e!r}")
+            verified = False
+        if verified:
+            signer.install()
+            self.sdk_signer = signer
+        else:
+            self.sdk_signer = None
+            logger.warning("⚠️ 署名はSDK自身の実装で計算（ループ上で1件数十ms止まる）")
+            self.notifier.notify("⚠️ 署名の自己チェック不一致 - SDKの署名で稼働", WARNING, key="signing_fallback")
+
+    def _cache_sdk_metadata(self, client, metadata: Dict):
+        """注文ごとのget_metadata呼び出しをキャッシュで置き換え（TTL経過時のみ再取得）"""
+        fetch_metadata = client.get_metadata
+        cache = {"data": metadata, "at": time.monotonic()}
+
+        async def cached_metadata():
+            if time.monotonic() - cache["at"] > self.metadata_ttl:
+                cache["data"] = await fetch_metadata()
+                cache["at"] = time.monotonic()
+            return cache["data"]
+
+        client.get_metadata = cached_metadata
 
     async def check_api_connection(self):
         logger.info("📡 EdgeX API接続確認中...")
         price = await self.get_price()
+        try:
+            await self._init_sdk_client()
+        except Exception as e:
+            logger.error(f"💥 SDKクライアント初期化エラー（注文時に再試行）: {e}")
+        balance = await self.get_balance()
+        if balance is not None:
+            # 最初に取れた残高が損失判定の基準（復元時はジャーナルの基準残高を引き継ぐ）
+            self.risk.set_balance(balance)
+            logger.info(f"💰 USDT残高: {balance:.4f} USDT")
+        else:
+            logger.error("🚫 残高が取れないため、取得できるまで新規の建て玉は出さない")
         logger.info("✅ API接続確認成功 - グリッド配置準備OK！！")
 
+    def _step_price(self, price: float, steps: int) -> float:
+        """priceからグリッドをsteps段ずらした価格（丸め前）"""
+        if self.grid_mode == "geometric":
+            return price * (1 + self.grid_percentage) ** steps
+        step = self.grid_step or price * self.grid_percentage
+        return price + steps * step
+
+    def _build_ladder(self, base_price: float) -> List[Tuple[str, float, float]]:
+        """grid_count段ぶんの (side, price, size) を内側から交互に並べる"""
+        spacing = self.grid_percentage
+        if self.grid_mode != "geometric" and self.grid_step:
+            spacing = self.grid_step / base_price  # 段幅をドルで固定
+        ladder = build_ladder(
+            center=base_price,
+            levels=self.grid_count,
+            spacing=spacing,
+            mode=self.grid_mode,
+            tick_size=self.contract_meta.get("tick_size", 0.1),
+            min_lot=self.min_lot,
+            step_size=self.contract_meta.get("step_size"),
+            order_size_usdt=self.order_size_usdt or None,
+            quantity=float(self.order_quantity),
+            leverage=self.leverage
+        )
+        return ladder.to_orders()
+
+    def _new_client_order_id(self) -> str:
+        """グリッドの目印 + 乱数（UUIDと同じ36文字）"""
+        return self.client_order_prefix + uuid.uuid4().hex[:36 - len(self.client_order_prefix)]
+
+    async def _submit_orders(self, orders: List[Tuple[str, float, float]]) -> List[Dict]:
+        """注文を同時送信（同時数はorder_concurrencyで制限、1件の失敗で他を止めない）"""
+        signer = self.sdk_signer
+        semaphore = asyncio.Semaphore(self.order_concurrency)
+
+        async def submit(side: str, price: float, size: float, rejected: Optional[str]) -> Dict:
+            if rejected is not None:
+                self._m_order_rejected.inc()
+                return {"side": side, "price": price, "size": size, "ok": False,
+                        "error": f"リスク制限: {rejected}", "elapsed": 0.0}
+            started = time.perf_counter()
+            try:
+                client_order_id = self._new_client_order_id()
+                if signer is not None:
+                    # 注文署名は送信枠の外で（バッチ全体を署名ワーカーで並列に計算、ループは止めない）
+                    path, body = await signer.prepare_limit_order(
+                        self.contract_id, str(size), str(price), side, client_order_id=client_order_id
+                    )
+                    send = lambda: signer.authenticated_request("POST", path, body)
+                else:
+                    send = lambda: sdk_limit_order(self.client, self.contract_id, str(size), str(price), side,
+                                                   client_order_id=client_order_id)
+                async with semaphore:
+                    result = await self.scheduler.submit("order", ORDER, send)
+                self._m_order.observe(time.perf_counter() - started)
+                order_id = (result or {}).get("data", {}).get("orderId")
+                if order_id:
+                    order = GridOrder(str(order_id), side, price, size)
+                    self.orders.add(order)
+                    self._journal("add", order=order.to_dict())
+                return {"side": side, "price": price, "size": size, "ok": True, "result": result,
+                        "order_id": order_id, "elapsed": time.perf_counter() - started}
+            except Exception as e:
+                self._m_order.observe(time.perf_counter() - started)
+                self._m_order_errors.inc()
+                self.risk.release(side, size)
+                return {"side": side, "price": price, "size": size, "ok": False, "error": str(e),
+                        "elapsed": time.perf_counter() - started}
+
+        # 送信前に並び順どおり枠を確保（同時送信中に上限を超えないように）
+        checks = [self.risk.try_open(side, size) for side, _, size in orders]
+        return await asyncio.gather(*(
+            submit(side, price, size, rejected) for (side, price, size), rejected in zip(orders, checks)
+        ))
+
+    def _counter_orders(self, filled: List[GridOrder]) -> List[Tuple[str, float, float]]:
+        """約定した段の反対側に1段ずらした注文（買い約定→上に売り、売り約定→下に買い）"""
+        tick_size = self.contract_meta.get("tick_size", 0.1)
+        counters = []
+        for order in filled:
+            if order.side == "BUY":
+                price = round_price(self._step_price(order.price, 1), tick_size, "SELL")
+                side = "SELL"
+            else:
+                price = round_price(self._step_price(order.price, -1), tick_size, "BUY")
+                side = "BUY"
+            if self.orders.at_level(side, price) is None:
+                counters.append((side, price, order.size))
+        return counters
+
+    async def _place_counters(self, filled: List[GridOrder], label: str = "反対注文"):
+        """
+        約定した段の反対注文を出す
+
+        急落/ジワ下落の発火中はポジションを減らす（利確）分だけ出し、増やす分は保留して解除後に出す
+        （捨てると約定した段に決済注文がないまま残る）
+
+        Args:
+            filled: 全量約定した注文
+            label: ログの見出し
+        """
+        counters = []
+        for side, price, size in self._held_counters + self._counter_orders(filled):
+            if self.orders.at_level(side, price) is None and (side, price, size) not in counters:
+                counters.append((side, price, size))
+        held = []
+        if self.volatility.triggered:
+            send, reserved = [], {"BUY": 0.0, "SELL": 0.0}
+            for side, price, size in counters:
+                if self.risk.reduces(side, size + reserved[side]):
+                    reserved[side] += size
+                    send.append((side, price, size))
+                else:
+                    held.append((side, price, size))
+            counters = send
+        if held != self._held_counters:
+            if held:
+                logger.warning(f"🛑 急落/ジワ下落トリガー発火中 - {label}{len(held)}件を解除まで保留")
+            self._held_counters = held
+            self._snapshot()
+        if not counters:
+            return
+        for r in await self._submit_orders(counters):
+            if r["ok"]:
+                logger.info(f"🔁 {label}: {r['side']} {r['size']} BTC @ ${r['price']}")
+            else:
+                logger.error(f"❌ {label}失敗 {r['side']} ${r['price']}: {r['error']}")
+                self.notifier.notify(f"❌ {label}失敗 {r['side']}: {r['error']}", WARNING,
+                                     key=("order_fail", r["side"]))
+
+    async def _poll_fills(self) -> List[GridOrder]:
+        """前回以降の約定だけを取得してローカル状態に反映（全量約定した注文を返す）"""
+        from edgex_sdk import OrderFillTransactionParams
+
+        start = self._last_fill_time
+
+        async def fetch():
+            # 送信時刻も返す（同じキーで集約された呼び出し元も、実際に送った時刻で判定できるように）
+            sent_at = time.monotonic()
+            # 100件を超えても取りこぼさないよう最後のページまで読む（途中で失敗したらカーソルは進めない）
+            items, offset = [], ""
+            while True:
+                resp = await self.client.get_order_fill_transactions(OrderFillTransactionParams(
+                    size="100",
+                    offset_data=offset,
+                    filter_contract_id_list=[self.contract_id],
+                    filter_start_created_time_inclusive=start
+                ))
+                data = resp.get("data", {})
+                items.extend(data.get("dataList", []))
+                offset = data.get("nextPageOffsetData") or ""
+                if not offset:
+                    return sent_at, items
+
+        polled_at, fills = await self.scheduler.submit(
+            "account", ACCOUNT, fetch, key=("fills", self.account_id, self.contract_id)
+        )
+        filled = []
+        for fill in fills:
+            created = int(fill.get("createdTime") or 0)
+            self._last_fill_time = max(self._last_fill_time, created)
+            order_id = str(fill.get("orderId"))
+            order = self.orders.get(order_id)
+            size = float(fill.get("fillSize") or 0)
+            fill_id = str(fill.get("id")) if fill.get("id") else None
+            price = float(fill.get("fillPrice") or (order.price if order else 0))
+            fee = float(fill.get("fillFee") or 0)
+            counted, done = self._apply_fill(order_id, size, fill_id, price, fee)
+            if counted:
+                self._journal("fill", order_id=order_id, size=size, fill_id=fill_id, price=price, fee=fee,
+                              created=created)
+            if done is not None:
+                logger.info(f"💰 約定: {done.side} {done.size} BTC @ ${done.price} (ネット {self.orders.net_position:+.4f} BTC)")
+                self.notifier.notify(f"💰 約定: {done.side} {done.size} BTC @ ${done.price}", INFO)
+                filled.append(done)
+
+        # 送信前に見失った注文は、ここまでに約定が来なければ外部キャンセルとして確定
+        for order in self.orders.settle(polled_at):
+            self.risk.release(order.side, order.remaining)
+            self._journal("remove", order_id=order.order_id, status="CANCELED")
+            logger.warning(f"⚠️ 取引所に存在しない注文を削除: {order.side} ${order.price} ({order.order_id})")
+        return filled
+
+    def _apply_fill(self, order_id: str, size: float, fill_id: Optional[str], price: float,
+                    fee: float) -> Tuple[bool, Optional[GridOrder]]:
+        """約定1件を注文ストアとリスクエンジンに反映（ジャーナル再生でも同じ経路）"""
+        order = self.orders.get(order_id)
+        released = order is None and order_id in self.orders.retired
+        if released:
+            order = self.orders.retired[order_id][0]
+        counted = self.orders.fill_count
+        done = self.orders.apply_fill(order_id, size, fill_id=fill_id)
+        if order is None or self.orders.fill_count == counted:
+            return False, done
+        self.risk.on_fill(order.side, size, price, fee=fee, order_done=done is not None, released=released)
+        return True, done
+
+    async def _reconcile_orders(self, adopt_unknown: bool = False):
+        """
+        取引所のアクティブ注文全件とローカル状態を突き合わせ
+
+        Args:
+            adopt_unknown: ローカルにない注文を管理下に入れる（復元直後、発注直後に落ちて記録できなかった分）
+        """
+        from edgex_sdk import GetActiveOrderParams
+
+        params = GetActiveOrderParams(size="200", filter_contract_id_list=[self.contract_id])
+
+        async def fetch():
+            resp = await self.client.get_active_orders(params)
+            return time.monotonic(), resp  # 受信時刻（これより後に送った約定ポーリングで消えた理由が分かる）
+
+        observed_at, resp = await self.scheduler.submit(
+            "account", ACCOUNT, fetch, key=("active_orders", self.account_id, self.contract_id)
+        )
+        missing, unknown = self.orders.reconcile(resp.get("data", {}).get("dataList", []), observed_at)
+        if missing:
+            # 約定直後でまだ約定一覧に出ていないだけかもしれないので、次の約定ポーリングまで保留
+            logger.info(f"🔎 取引所に見当たらない注文{len(missing)}件 - 次の約定ポーリング後に確定")
+        # 引き取るのはこのグリッドが出した注文だけ（手動注文・同じ口座の別グリッドの注文は触らない）
+        own = [item for item in unknown if str(item.get("clientOrderId") or "").startswith(self.client_order_prefix)]
+        if len(own) < len(unknown):
+            logger.info(f"ℹ️ 他グリッド・手動のアクティブ注文 {len(unknown) - len(own)}件（管理外）")
+        if own and adopt_unknown:
+            for item in own:
+                order = GridOrder(
+                    str(item.get("id") or item.get("orderId")),
+                    item.get("side"),
+                    float(item.get("price") or 0),
+                    float(item.get("size") or 0)
+                )
+                # 約定量はこの後の約定ポーリングで反映（cumFillSizeを入れると二重に数える）
+                self.orders.add(order)
+                logger.info(f"📥 記録外の注文を引き取り: {order.side} ${order.price} ({order.order_id})")
+            self.risk.rebuild_open(self.orders.open_orders())
+        elif own:
+            logger.warning(f"⚠️ 記録にないこのグリッドのアクティブ注文 {len(own)}件")
+        self.risk.sync_position(self.orders.net_position)
+        self._snapshot()  # 突き合わせ結果（引き取った注文を含む）でジャーナルを圧縮
+
+        balance = await self.get_balance()
+        if balance is not None:
+            self.risk.set_balance(balance)
+
+    async def sync_orders(self):
+        """約定の差分ポーリング + 定期突き合わせ、全量約定した段には反対注文を出す"""
+        last_reconcile = time.monotonic()
+        while True:
+            await asyncio.sleep(self.fill_poll_interval)
+            if self.client is None:
+                continue
+            try:
+                filled = await self._poll_fills()
+                if filled or self._held_counters:
+                    await self._place_counters(filled)
+
+                if time.monotonic() - last_reconcile >= self.reconcile_interval:
+                    await self._reconcile_orders()
+                    last_reconcile = time.monotonic()
+            except Exception as e:
+                logger.error(f"💥 注文同期エラー: {e}")
+                self.notifier.notify(f"💥 注文同期エラー: {e}", WARNING, key="sync_error")
+
+    async def _cancel_orders(self, orders: List[GridOrder]) -> bool:
+        """複数注文を1リクエストでキャンセル（cancelOrderByIdはID配列を受け付ける）"""
+        if not orders:
+            return True
+        started = time.perf_counter()
+        try:
+            await self.scheduler.submit("cancel", CANCEL, lambda: self.client.async_client.make_authenticated_request(
+                method="POST",
+                path="/api/v1/private/order/cancelOrderById",
+                data={"accountId": str(self.account_id), "orderIdList": [o.order_id for o in orders]}
+            ))
+        except Exception as e:
+            self._m_cancel.observe(time.perf_counter() - started)
+            self._m_cancel_errors.inc()
+            logger.error(f"❌ 一括キャンセル失敗 ({len(orders)}件): {e}")
+            return False
+        self._m_cancel.observe(time.perf_counter() - started)
+        canceled_at = time.monotonic()
+        for order in orders:
+            # キャンセル前の約定は次の約定ポーリングで届くので、それまで注文を覚えておく
+            self.orders.retire(order.order_id, canceled_at)
+            self.risk.release(order.side, order.remaining)
+            self._journal("remove", order_id=order.order_id, status="CANCELED")
+        return True
+
+    def _out_of_range(self, price: float) -> bool:
+        """価格が現在のグリッド範囲（中心 ± grid_count段）を出たか"""
+        if self.grid_center is None:
+            return False
+        return abs(price / self.grid_center - 1) > self.grid_count * self.grid_percentage
+
+    async def recenter(self, price: float):
+        """目標ラダーとの差分だけキャンセル・新規発注"""
+        if self.client is None or self.volatility.triggered:
+            return
+        started = time.perf_counter()
+        # 新しい中心を元のグリッドの段に揃える（残す段と新しい段の価格が一致するように）
+        if self.grid_mode == "geometric":
+            steps = round(math.log(price / self.grid_center) / math.log(1 + self.grid_percentage))
+        else:
+            steps = round((price - self.grid_center) / self.grid_step)
+        center = self._step_price(self.grid_center, steps)
+        plan = plan_recenter(self._build_ladder(center), self.orders)
+        if plan.empty:
+            self._set_grid(center, self.grid_step)
+            return
+
+        logger.info(f"🔄 リセンター ${self.grid_center:.2f} → ${center:.2f}（{steps:+d}段）: {plan}")
+        if not await self._cancel_orders(plan.cancel):
+            return
+        results = await self._submit_orders(plan.place)
+        failed = [r for r in results if not r["ok"]]
+        for r in failed:
+            logger.error(f"❌ リセンター注文失敗 {r['side']} ${r['price']}: {r['error']}")
+            self.notifier.notify(f"❌ リセンター注文失敗 {r['side']}: {r['error']}", WARNING,
+                                 key=("order_fail", r["side"]))
+        self._set_grid(center, self.grid_step)
+        logger.info(
+            f"⏱️ リセンター完了: 維持{len(plan.keep)} / キャンセル{len(plan.cancel)} / "
+            f"新規{len(results) - len(failed)}/{len(results)} - 所要 {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def _maybe_recenter(self, price: float):
+        """範囲外なら（実行中でなければ）リセンターをバックグラウンドで開始"""
+        if not self._out_of_range(price):
+            return
+        if self._recenter_task is not None and not self._recenter_task.done():
+            return
+        self._recenter_task = asyncio.create_task(self.recenter(price))
+
+    def on_price(self, price: float, source: str = "rest", latency: float = 0.0):
+        """価格更新ごとのティック記録・リスク判定"""
+        self._last_price_at = time.monotonic()
+        self._m_ticks.inc()
+        if self.tick_recorder is not None:
+            self.tick_recorder.record(price, source, latency)
+        self.risk.on_price(price)
+        signal = self.volatility.update(price)
+        if signal is not None:
+            label = "急落" if signal == "crash" else "ジワ下落"
+            self.notifier.notify(f"🚨 {label}検知 ${price:.2f} - 新規グリッド配置停止", CRITICAL)
+        if signal == "crash":
+            logger.error(
+                f"🚨 急落検知: {self.volatility.fast.window:.0f}秒高値 ${self.volatility.fast.max:.2f} → ${price:.2f} "
+                f"- 新規グリッド配置停止"
+            )
+        elif signal == "decline":
+            logger.error(
+                f"🚨 ジワ下落検知: {self.volatility.slow.span:.0f}秒で {self.volatility.slow.rolling_return() * 100:.2f}% "
+                f"- 新規グリッド配置停止"
+            )
+        self._maybe_recenter(price)
+
+    # ---- 状態ジャーナル（再起動時は復元 + 1回の突き合わせで続行、ラダーを出し直さない） ----
+
+    def _journal(self, kind: str, **fields):
+        if self.journal is None:
+            return
+        self.journal.append(kind, **fields)
+        if self.journal.pending >= self.journal.snapshot_every:
+            self._snapshot()
+
+    def _set_grid(self, center: float, step: Optional[float]):
+        self.grid_center = center
+        self.grid_step = step
+        self._journal("grid", center=center, step=step)
+
+    def _capture_state(self) -> Dict:
+        return {
+            "account_id": self.account_id,
+            "contract_id": self.contract_id,
+            "grid_center": self.grid_center,
+            "grid_step": self.grid_step,
+            "last_fill_time": self._last_fill_time,
+            "held_counters": [list(c) for c in self._held_counters],
+            "orders": self.orders.to_state(),
+            "risk": self.risk.to_state(),
+        }
+
+    def _snapshot(self):
+        if self.journal is None:
+            return
+        try:
+            self.journal.snapshot(self._capture_state())
+        except OSError as e:
+            logger.error(f"❌ 状態スナップショット書き込み失敗: {e}")
+
+    def _replay(self, record: Dict):
+        """ジャーナル1件を適用（_journalで書いた種別と対）"""
+        kind = record.get("kind")
+        if kind == "add":
+            self.orders.add(GridOrder.from_dict(record["order"]))
+        elif kind == "remove":
+            # 後続の約定レコード・再起動後の最初の約定ポーリングまでは遅れた約定を受け付ける
+            self.orders.retire(str(record["order_id"]), 0.0)
+        elif kind == "fill":
+            self._apply_fill(str(record["order_id"]), float(record["size"]), record.get("fill_id"),
+                             float(record["price"]), float(record.get("fee", 0)))
+            self._last_fill_time = max(self._last_fill_time, int(record.get("created", 0)))
+        elif kind == "grid":
+            self.grid_center = record.get("center")
+            self.grid_step = record.get("step")
+
+    def _restore_state(self) -> bool:
+        """スナップショット + ジャーナル末尾から状態を組み立てる（I/Oはローカルファイルのみ）"""
+        if self.journal is None:
+            return False
+        started = time.perf_counter()
+        state, records = self.journal.load()
+        if state is None and not records:
+            return False
+        if state is not None and (state.get("account_id") != self.account_id or state.get("contract_id") != self.contract_id):
+            logger.warning(
+                f"⚠️ 保存済みの状態は別のアカウント/契約（{state.get('account_id')} / {state.get('contract_id')}）- 破棄して新規配置"
+            )
+            self._snapshot()
+            return False
+
+        if state is not None:
+            self.grid_center = state.get("grid_center")
+            self.grid_step = state.get("grid_step")
+            self._last_fill_time = int(state.get("last_fill_time") or self._last_fill_time)
+            self._held_counters = [(side, float(price), float(size)) for side, price, size in state.get("held_counters", [])]
+            self.orders.load_state(state.get("orders", {}))
+            self.risk.load_state(state.get("risk", {}))
+        for record in records:
+            self._replay(record)
+        self.risk.rebuild_open(self.orders.open_orders())
+
+        if self.grid_center is None:
+            return False
+        logger.info(
+            f"♻️ 状態復元: 注文{len(self.orders)}本 / 中心 ${self.grid_center:.2f} / ネット {self.orders.net_position:+.4f} BTC / "
+            f"実現損益 ${self.risk.realized_pnl:.4f}（ジャーナル{len(records)}件, "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms）"
+        )
+        return True
+
+    async def resume_grid(self) -> bool:
+        """
+        復元した状態を取引所と1回だけ突き合わせて続行
+
+        Returns:
+            bool: 続行できたらTrue（SDK未準備・管理中の注文が全部消えていればFalse → 通常配置）
+        """
+        if self.client is None:
+            return False
+        started = time.perf_counter()
+        try:
+            # 突き合わせ → 約定ポーリングの順（消えていた注文は停止中の約定かキャンセルかをポーリングで確定）
+            await self._reconcile_orders(adopt_unknown=True)
+            filled = await self._poll_fills()  # 停止中の約定
+        except Exception as e:
+            logger.error(f"💥 復元後の突き合わせ失敗 - 新規配置に切り替え: {e}")
+            return False
+
+        await self._place_counters(filled, label="反対注文（停止中の約定分）")
+
+        if not self.orders.by_id:
+            logger.warning("⚠️ 復元した注文が取引所に残っていない - 新規配置")
+            return False
+        logger.info(
+            f"♻️ 再起動から復帰: 管理中{len(self.orders)}本 / 停止中の約定{len(filled)}件 - "
+            f"所要 {(time.perf_counter() - started) * 1000:.0f}ms（再配置なし）"
+        )
+        self.notifier.notify(f"♻️ 再起動から復帰: 管理中{len(self.orders)}本（再配置なし）", INFO)
+        return True
+
     async def place_grids(self):
         current_price = await self.get_price()
+        if current_price is None:
+            logger.error("🚫 有効な価格が取れないためグリッド配置スキップ")
+            return
         logger.info(f"📍 現在価格: ${current_price:.2f} でグリッド配置開始")
 
+        if self.volatility.triggered:
+            logger.warning("🛑 急落/ジワ下落トリガー発火中 - グリッド配置スキップ")
+            return
+
         if not self.account_id or not self.stark_private_key:
             logger.error("🚫 ACCOUNT_ID または STARK_PRIVATE_KEY 未設定 - 注文スキップ！！")
             return
 
         try:
-            from edgex_sdk import Client, OrderSide
+            if await self._init_sdk_client() is None:
+                raise Exception("SDKクライアント未初期化")
 
-            client = Client(
-                base_url=self.base_url,
-                account_id=int(self.account_id),
-                stark_private_key=self.stark_private_key
-            )
+            if self.risk.balance is None:
+                balance = await self.get_balance()
+                if balance is None:
+                    logger.error("🚫 取引所残高が取れないためグリッド配置スキップ")
+                    return
+                self.risk.set_balance(balance)
 
-            grid_percentage = 0.0006
-            order_quantity = "0.002"  # ← 最低ロット0.001の2倍、安全！！ そのまま！！
+            self.grid_step = None  # 新規配置は現在価格基準で段幅を決め直す
+            ladder = self._build_ladder(current_price)
 
-            # 価格だけ0.1刻みに丸める（quantityは触らない！！）
-            base_price = current_price
-            buy_price = round((base_price * (1 - grid_percentage)) // 0.1 * 0.1, 1)
-            sell_price = round((base_price * (1 + grid_percentage)) // 0.1 * 0.1, 1)
+            logger.info(f"🔥 SDKで本番グリッド注文実行！！（片側{self.grid_count}本 × 2、同時{self.order_concurrency}件）")
+            for side, price, size in ladder:
+                arrow = "↓ 買い" if side == "BUY" else "↑ 売り"
+                logger.info(f"   {arrow}指値: ${price} で {size} BTC")
+            notional = sum(price * size for _, price, size in ladder)
+            logger.info(f"📦 注文数量 {self._size_label()} → 全{len(ladder)}本の想定元本 ${notional:,.2f}")
 
-            logger.info("🔥 SDKで本番グリッド注文実行！！")
-            logger.info(f"   ↓ 買い指値: ${buy_price} で {order_quantity} BTC")
-            logger.info(f"   ↑ 売り指値: ${sell_price} で {order_quantity} BTC")
+            started = time.perf_counter()
+            results = await self._submit_orders(ladder)
+            elapsed = time.perf_counter() - started
 
-            buy_result = await client.create_limit_order(
-                contract_id=self.contract_id,
-                size=order_quantity,
-                price=str(buy_price),
-                side=OrderSide.BUY
-            )
-            logger.info(f"📩 買い注文結果: {buy_result}")
-
-            sell_result = await client.create_limit_order(
-                contract_id=self.contract_id,
-                size=order_quantity,
-                price=str(sell_price),
-                side=OrderSide.SELL
-            )
-            logger.info(f"📩 売り注文結果: {sell_result}")
+            ok_count = 0
+            for r in results:
+                label = "買い" if r["side"] == "BUY" else "売り"
+                if r["ok"]:
+                    ok_count += 1
+                    logger.info(f"📩 {label}注文結果 ${r['price']}: {r['result']} ({r['elapsed'] * 1000:.0f}ms)")
+                else:
+                    logger.error(f"❌ {label}注文失敗 ${r['price']}: {r['error']}")
+                    self.notifier.notify(f"❌ {label}注文失敗 ${r['price']}: {r['error']}", WARNING,
+                                         key=("order_fail", r["side"]))
 
-            logger.info("🎉🎉 グリッド注文成功！！ 微益積み上げ開始！！ 🎉🎉")
+            logger.info(f"⏱️ グリッド配置 {ok_count}/{len(results)}件成功 - 所要 {elapsed * 1000:.0f}ms")
+            self.notifier.notify(f"📊 グリッド配置 {ok_count}/{len(results)}件成功 @ ${current_price:.2f}", INFO)
+            if ok_count:
+                self._set_grid(current_price, current_price * self.grid_percentage)
+            if ok_count == len(results):
+                logger.info("🎉🎉 グリッド注文成功！！ 微益積み上げ開始！！ 🎉🎉")
 
         except Exception as e:
             logger.error(f"💥 SDK注文エラー: {e}")
+            self.notifier.notify(f"💥 SDK注文エラー: {e}", WARNING, key="sdk_error")
 
     async def monitor(self):
-        logger.info("👀 監視開始 - グリッドボット稼働中...")
+        if self.market_data_mode != "ws":
+            await self._monitor_polling()
+            return
+
+        logger.info(f"👀 [{self.name}] 監視開始（WebSocketストリーミング） - グリッドボット稼働中...")
+        cell = self.cell
+        last_log = 0.0
+        while True:
+            try:
+                if not await cell.wait_next(timeout=30):
+                    logger.warning(f"⚠️ 価格更新なし（最終更新 {cell.age():.0f}秒前）")
+                    continue
+
+                # ここで戦略がcell.priceを読む（I/Oなし）
+                self.on_price(cell.price, cell.source, cell.latency)
+                now = asyncio.get_running_loop().time()
+                if now - last_log >= 30:
+                    logger.info(f"📊 現在価格: ${cell.price:.2f} ({cell.source})")
+                    last_log = now
+            except Exception as e:
+                logger.error(f"💥 監視エラー: {e}")
+                await asyncio.sleep(1)
+
+    async def _monitor_polling(self):
+        logger.info("👀 監視開始（RESTポーリング） - グリッドボット稼働中...")
         while True:
             try:
-                await self.get_price()
+                quote = await self.get_quote()
+                if quote is not None and not quote.stale:
+                    self.on_price(quote.price, quote.source, quote.latency)
                 await asyncio.sleep(30)
             except Exception as e:
                 logger.error(f"💥 監視エラー: {e}")
                 await asyncio.sleep(30)
 
     async def run(self):
-        await self.check_api_connection()
-        await self.place_grids()
-        await self.monitor()
+        if self._owns_shared:
+            await self.shared.start()
+        sync_task = None
+        try:
+            self._restored = self._restore_state()
+            await self.check_api_connection()
+            if not (self._restored and await self.resume_grid()):
+                await self.place_grids()
+            sync_task = asyncio.create_task(self.sync_orders())
+            await self.monitor()
+        finally:
+            if sync_task is not None:
+                sync_task.cancel()
+                await asyncio.gather(sync_task, return_exceptions=True)
+            await self.close()
 
 
 async def main():
@@ -0,0 +1,121 @@
+"""
+グリッド価格ラダー生成モジュール - NumPyで全段を一括計算
+等差（arithmetic）/ 等比（geometric）ラダーを取引所のtick・lotに合わせて丸める
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+BUY = -1
+SELL = 1
+
+
+def _decimals(step: float) -> int:
+    """刻み幅の小数桁数（0.1 → 1, 0.001 → 3）"""
+    return max(0, -int(math.floor(math.log10(step) + 1e-9)))
+
+
+class GridLadder:
+    """グリッド全段（sideは BUY=-1 / SELL=1、levelは中心からの段数）"""
+
+    __slots__ = ("center", "side", "level", "price", "size")
+
+    def __init__(self, center: float, side: np.ndarray, level: np.ndarray, price: np.ndarray, size: np.ndarray):
+        self.center = center
+        self.side = side
+        self.level = level
+        self.price = price
+        self.size = size
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def to_orders(self) -> List[Tuple[str, float, float]]:
+        """(side, price, size) のリストに変換（内側の段から買い・売り交互）"""
+        order = np.lexsort((self.side, self.level))
+        return [
+            ("BUY" if self.side[i] == BUY else "SELL", float(self.price[i]), float(self.size[i]))
+            for i in order
+        ]
+
+
+def build_ladder(
+    center: float,
+    levels: int,
+    spacing: float,
+    mode: str = "arithmetic",
+    tick_size: float = 0.1,
+    min_lot: float = 0.001,
+    step_size: Optional[float] = None,
+    order_size_usdt: Optional[float] = None,
+    quantity: Optional[float] = None,
+    leverage: float = 1.0,
+) -> GridLadder:
+    """
+    中心価格の上下にlevels段ずつのラダーを生成
+
+    Args:
+        center: 中心価格
+        levels: 片側の段数
+        spacing: 段間隔（中心価格に対する比率、0.0006 = 0.06%）
+        mode: "arithmetic"（等差）または "geometric"（等比）
+        tick_size: 価格刻み（買いは切り下げ、売りは切り上げ）
+        min_lot: 最小注文数量
+        step_size: 数量刻み（省略時はmin_lot）
+        order_size_usdt: 1注文あたりのUSDT（指定時は価格ごとに数量換算）
+        quantity: 固定数量（order_size_usdt未指定時）
+        leverage: order_size_usdt換算時のレバレッジ
+
+    Returns:
+        GridLadder: 丸め済みの全段（tick丸めで重複した段は除外）
+    """
+    if levels < 1:
+        raise ValueError(f"levels must be >= 1, got {levels}")
+    if spacing <= 0:
+        raise ValueError(f"spacing must be positive, got {spacing}")
+
+    k = np.arange(1, levels + 1, dtype=np.float64)
+    if mode == "geometric":
+        buy_raw = center * (1.0 + spacing) ** -k
+        sell_raw = center * (1.0 + spacing) ** k
+    elif mode == "arithmetic":
+        buy_raw = center * (1.0 - spacing * k)
+        sell_raw = center * (1.0 + spacing * k)
+    else:
+        raise ValueError(f"unknown ladder mode: {mode}")
+
+    # tick丸め（誤差で1tickずれないよう微小値を足してから丸める）
+    price_dp = _decimals(tick_size)
+    buy_px = np.round(np.floor(buy_raw / tick_size + 1e-9) * tick_size, price_dp)
+    sell_px = np.round(np.ceil(sell_raw / tick_size - 1e-9) * tick_size, price_dp)
+
+    # tick丸めで同値になった段・0以下になった段を落とす
+    buy_keep = (buy_px > 0) & np.concatenate(([True], np.diff(buy_px) != 0))
+    sell_keep = np.concatenate(([True], np.diff(sell_px) != 0))
+
+    side = np.concatenate((np.full(levels, BUY, dtype=np.int8), np.full(levels, SELL, dtype=np.int8)))
+    level = np.concatenate((k, k)).astype(np.int32)
+    price = np.concatenate((buy_px, sell_px))
+    keep = np.concatenate((buy_keep, sell_keep))
+
+    # 数量: USDT指定なら価格ごとに換算してstep_sizeに切り下げ、min_lot未満は引き上げ
+    step = step_size or min_lot
+    size_dp = _decimals(step)
+    if order_size_usdt is not None:
+        raw_size = order_size_usdt * leverage / price[keep].clip(min=tick_size)
+        size = np.floor(raw_size / step + 1e-9) * step
+    else:
+        size = np.full(int(keep.sum()), quantity if quantity is not None else min_lot)
+    size = np.round(np.maximum(size, min_lot), size_dp)
+
+    return GridLadder(center, side[keep], level[keep], price[keep], size)
+
+
+def round_price(price: float, tick_size: float, side: str) -> float:
+    """1本分のtick丸め（買いは切り下げ、売りは切り上げ）"""
+    if side == "BUY":
+        ticks = math.floor(price / tick_size + 1e-9)
+    else:
+        ticks = math.ceil(price / tick_size - 1e-9)
+    return round(ticks * tick_size, _decimals(tick_size))
@@ -0,0 +1,193 @@
+"""
+ストリーミング価格フィード - EdgeX公開WebSocket（ticker）購読
+1本の接続で複数契約を購読し、切断中はRESTポーリングに自動フォールバックして指数バックオフで再接続
+"""
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import aiohttp
+from loguru import logger
+
+
+class PriceCell:
+    """最新価格セル（戦略側はI/Oなしで読むだけ）"""
+
+    __slots__ = ("price", "updated_at", "source", "latency", "_event")
+
+    def __init__(self):
+        self.price: Optional[float] = None
+        self.updated_at: float = 0.0  # time.monotonic()基準
+        self.source: str = ""
+        self.latency: float = 0.0  # REST取得時の所要秒数（WebSocketは0）
+        self._event = asyncio.Event()
+
+    def update(self, price: float, source: str, latency: float = 0.0):
+        """価格を書き込み、待機中のコルーチンを起こす"""
+        self.price = price
+        self.updated_at = time.monotonic()
+        self.source = source
+        self.latency = latency
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    def age(self) -> float:
+        """最終更新からの経過秒（未取得ならinf）"""
+        if self.price is None:
+            return float("inf")
+        return time.monotonic() - self.updated_at
+
+    async def wait_next(self, timeout: float) -> bool:
+        """次の更新まで待つ（タイムアウトならFalse）"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class MarketDataFeed:
+    """WebSocket ticker購読 + RESTフォールバック（契約ごとにPriceCellを持つ）"""
+
+    def __init__(
+        self,
+        session_getter: Callable[[], aiohttp.ClientSession],
+        ws_url: str,
+        contract_id: Optional[str] = None,
+        rest_fetch: Optional[Callable[[], Awaitable[float]]] = None,
+        poll_interval: float = 5.0,
+        backoff_min: float = 1.0,
+        backoff_max: float = 60.0,
+        idle_timeout: float = 30.0,
+    ):
+        self._session_getter = session_getter
+        self.ws_url = ws_url
+        self.poll_interval = poll_interval
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.idle_timeout = idle_timeout
+
+        self.cells: Dict[str, PriceCell] = {}  # channel -> セル
+        self._rest_fetch: Dict[str, Callable[[], Awaitable[float]]] = {}
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.connected = False
+        self.reconnects = 0
+        if contract_id is not None:
+            self.add_contract(contract_id, rest_fetch)
+
+    @staticmethod
+    def channel_for(contract_id: str) -> str:
+        return f"ticker.{contract_id}"
+
+    @property
+    def cell(self) -> PriceCell:
+        """最初に登録した契約のセル（単一契約で使う場合）"""
+        return next(iter(self.cells.values()))
+
+    def add_contract(self, contract_id: str, rest_fetch: Optional[Callable[[], Awaitable[float]]] = None) -> PriceCell:
+        """
+        契約を購読対象に追加してセルを返す（登録済みなら既存のセル）
+
+        Args:
+            contract_id: EdgeX契約ID
+            rest_fetch: 切断中に使うRESTの価格取得（省略時はWebSocket復旧まで更新なし、
+                登録済みなら置き換え: 再起動したグリッドの古いインスタンスを呼び続けないように）
+        """
+        channel = self.channel_for(contract_id)
+        cell = self.cells.get(channel)
+        if cell is None:
+            cell = self.cells[channel] = PriceCell()
+            if self._ws is not None and not self._ws.closed:
+                # 接続中なら同じ接続に購読を追加
+                asyncio.ensure_future(self._ws.send_json({"type": "subscribe", "channel": channel}))
+        if rest_fetch is not None:
+            self._rest_fetch[channel] = rest_fetch
+        return cell
+
+    async def run(self):
+        """購読ループ（キャンセルされるまで継続）"""
+        backoff = self.backoff_min
+        while True:
+            try:
+                if await self._stream():
+                    backoff = self.backoff_min  # 1件でも受信できたらバックオフをリセット
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ WebSocket切断: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            self.reconnects += 1
+            logger.info(f"🔁 {backoff:.0f}秒間RESTポーリングで代替 → WebSocket再接続")
+            await self._poll_for(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+
+    async def _stream(self) -> bool:
+        """WebSocketに接続してtickerを受信し続ける（受信実績を返す）"""
+        received = False
+        session = self._session_getter()
+        async with session.ws_connect(self.ws_url, heartbeat=20, receive_timeout=self.idle_timeout) as ws:
+            for channel in list(self.cells):
+                await ws.send_json({"type": "subscribe", "channel": channel})
+            self._ws = ws
+            self.connected = True
+            logger.info(f"📡 WebSocket購読開始: {', '.join(self.cells)}")
+
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                    continue
+
+                data = json.loads(msg.data)
+                msg_type = data.get("type")
+                if msg_type == "ping":
+                    await ws.send_json({"type": "pong", "time": data.get("time", "")})
+                    continue
+                cell = self.cells.get(data.get("channel")) if msg_type == "quote-event" else None
+                if cell is None:
+                    continue
+
+                price = self._parse_ticker(data)
+                if price is not None:
+                    cell.update(price, "ws")
+                    received = True
+        return received
+
+    @staticmethod
+    def _parse_ticker(data: dict) -> Optional[float]:
+        """ticker内容からoraclePrice（なければlastPrice）を取り出す"""
+        items = data.get("content", {}).get("data") or []
+        if not items:
+            return None
+        item = items[0]
+        raw = item.get("oraclePrice") or item.get("lastPrice")
+        try:
+            price = float(raw)
+        except (TypeError, ValueError):
+            return None
+        return price if price > 0 else None
+
+    async def _poll_one(self, channel: str, fetch: Callable[[], Awaitable[float]]):
+        try:
+            started = time.monotonic()
+            price = await fetch()
+            self.cells[channel].update(price, "rest", time.monotonic() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ RESTフォールバック価格取得失敗 ({channel}): {e}")
+
+    async def _poll_for(self, duration: float):
+        """duration秒の間、RESTで全契約の価格を取り続ける（最低1回）"""
+        deadline = time.monotonic() + duration
+        while True:
+            await asyncio.gather(*(self._poll_one(ch, fetch) for ch, fetch in list(self._rest_fetch.items())))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(self.poll_interval, remaining))
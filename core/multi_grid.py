@@ -0,0 +1,268 @@
+"""
+マルチグリッド実行 - 複数の（アカウント, 契約, グリッド設定）を1プロセス・1イベントループで運用
+HTTPセッション・レート制限・価格WebSocket・通知・監視は全グリッドで共有し、
+各グリッドは独立タスクとして監視（1つが落ちても他は止めず、バックオフ付きで作り直す）
+
+定義ファイル（GRIDS_FILE、またはGRIDS環境変数にJSONを直接）:
+    [
+      {"name": "btc", "contract_id": "10000001", "grid_count": 2},
+      {"name": "eth", "contract_id": "10000002", "binance_symbol": "ETHUSDT",
+       "account_id_env": "ETH_ACCOUNT_ID", "stark_private_key_env": "ETH_STARK_PRIVATE_KEY",
+       "grid_interval_percentage": 0.001, "order_quantity": "0.02"}
+    ]
+キーはBotConfigのフィールド名 = 単体起動時の環境変数名の小文字（省略時は起動時の設定）。秘密鍵は *_env で環境変数名を指す
+（*_env の指す環境変数が未設定なら起動しない）。BTC以外の契約はbinance_symbolを書かなければBinance価格を使わない
+"""
+import asyncio
+import importlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import aiohttp
+from loguru import logger
+
+from core.market_feed import MarketDataFeed
+from core.scheduler import RequestScheduler
+from core.signing import SigningExecutor
+from utils.config import BotConfig, load_config
+from utils.loop_monitor import LoopMonitor
+from utils.metrics import REGISTRY, MetricsServer
+from utils.notifier import CRITICAL, SlackNotifier
+
+
+class SharedServices:
+    """グリッド間で共有する接続・スケジューラ・署名ワーカー・価格フィード・通知・監視（プロセスに1つ）"""
+
+    def __init__(self, config: Optional[BotConfig] = None):
+        """
+        Args:
+            config: 起動時に読んだ設定（省略時はload_config()）
+        """
+        config = config or load_config()
+        # 全HTTP経路で共有する常駐セッション（初回使用時に生成、close()で閉じる）
+        self.session: Optional[aiohttp.ClientSession] = None
+        # 取引所呼び出しの一元スケジューラ（レート制限・優先レーン・同一読み取りの集約）
+        self.scheduler = RequestScheduler()
+
+        # 価格フィード（"ws": WebSocketストリーミング / "rest": 30秒ポーリング）、契約は各グリッドが登録
+        self.market_data_mode = config.market_data_mode.lower()
+        self.ws_url = config.ws_url
+        self.feed = MarketDataFeed(session_getter=self.get_session, ws_url=self.ws_url)
+        self._feed_task: Optional[asyncio.Task] = None
+        # edgex_sdkの読み込み（約0.3秒）はワーカー起動と並行して別スレッドで
+        self._sdk_import: Optional[asyncio.Future] = None
+        self._signer_start: Optional[asyncio.Future] = None
+
+        # 署名ワーカー（SIGNING_EXECUTOR: process / thread / inline、Stark署名をループの外で並列計算）
+        self.signer = SigningExecutor(
+            mode=config.signing_executor.lower(),
+            workers=config.signing_workers or None,
+            registry=REGISTRY
+        )
+
+        # Slack通知（キューに積むだけで取引ループは待たない、送信はバックグラウンドでまとめて）
+        self.notifier = SlackNotifier(
+            config.slack_webhook_url,
+            session_getter=self.get_session,
+            interval=config.slack_notify_interval
+        )
+
+        # メトリクス（/metricsはMETRICS_PORTを指定した時だけ127.0.0.1で公開）
+        self.metrics = REGISTRY
+        self.metrics_server = MetricsServer(self.metrics, port=config.metrics_port)
+        self.metrics.gauge("feed_reconnects", "WebSocket再接続回数", fn=lambda: self.feed.reconnects)
+
+        # イベントループ監視（LOOP_MONITOR: off / prod=遅延計測+停止時スタック / debug=コルーチン別の占有時間も）
+        self.loop_monitor = LoopMonitor(
+            mode=config.loop_monitor.lower(),
+            threshold=config.loop_block_threshold,
+            registry=self.metrics
+        )
+        self._started = False
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """常駐セッションを返す（未生成・close済みなら作り直す）"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,       # pro.edgex.exchange向けの同時接続上限
+                ttl_dns_cache=300,       # DNS解決を5分キャッシュ
+                keepalive_timeout=75,    # 30秒ポーリングより長くkeep-alive
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+            logger.info("🔌 HTTPセッション生成（keep-alive / DNSキャッシュ有効）")
+        return self.session
+
+    async def start(self):
+        """監視・通知・メトリクス・価格フィードを起動（2回目以降は何もしない）"""
+        if self._started:
+            return
+        self._started = True
+        self.loop_monitor.start()
+        self._sdk_import = asyncio.ensure_future(asyncio.to_thread(importlib.import_module, "edgex_sdk"))
+        self.get_session()
+        # 署名ワーカーの起動（spawn + SDK読み込みで数百ms〜）は待たずに裏で進める、最初の署名時に合流
+        self._signer_start = asyncio.ensure_future(self.signer.start())
+        self.notifier.start()
+        await self.metrics_server.start()
+        if self.market_data_mode == "ws" and self.feed.cells:
+            self._feed_task = asyncio.create_task(self.feed.run())
+
+    async def sdk_ready(self):
+        """start()で始めたedgex_sdkの読み込みを待つ（未開始・失敗時は呼び出し側の通常のimportに任せる）"""
+        if self._sdk_import is not None:
+            await asyncio.gather(self._sdk_import, return_exceptions=True)
+
+    async def close(self):
+        """フィード停止・通知の送り切り・スケジューラ停止・常駐セッションをclose"""
+        if self._feed_task is not None:
+            self._feed_task.cancel()
+            await asyncio.gather(self._feed_task, return_exceptions=True)
+            self._feed_task = None
+        await self.loop_monitor.stop()
+        await self.notifier.close()
+        await self.metrics_server.close()
+        await self.scheduler.close()
+        await self.signer.close()
+        if self._signer_start is not None:
+            await asyncio.gather(self._signer_start, return_exceptions=True)
+            self._signer_start = None
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info("🔌 HTTPセッションclose完了")
+        self.session = None
+        self._started = False
+
+
+def _resolve_env_refs(definition: Dict) -> Dict:
+    """"xxx_env": "VAR" を "xxx": os.getenv("VAR") に展開（秘密鍵を定義ファイルに書かないため）"""
+    resolved = {}
+    for key, value in definition.items():
+        if key.endswith("_env") and isinstance(value, str):
+            # 未設定のまま起動時のACCOUNT_ID・鍵で取引しないよう、ここで止める
+            if not os.getenv(value):
+                raise ValueError(f"grid {definition.get('name', '?')}: {key} refers to unset env var {value}")
+            resolved[key[:-4]] = os.getenv(value)
+        else:
+            resolved[key] = value
+    return resolved
+
+
+def load_grid_definitions(path: Optional[str] = None, raw: Optional[str] = None) -> List[Dict]:
+    """
+    グリッド定義を読む
+
+    Args:
+        path: JSONファイル（省略時は設定のGRIDS_FILE）
+        raw: JSON文字列（省略時は設定のGRIDS）
+
+    Returns:
+        List[dict]: 各グリッドの設定（nameは必須、重複不可）
+    """
+    config = load_config()
+    path = path or config.grids_file
+    raw = raw or config.grids
+    if path:
+        with open(path) as f:
+            definitions = json.load(f)
+    elif raw:
+        definitions = json.loads(raw)
+    else:
+        return []
+
+    if not isinstance(definitions, list):
+        raise ValueError("grid definitions must be a JSON list")
+    seen = set()
+    resolved = []
+    for i, definition in enumerate(definitions):
+        definition = _resolve_env_refs(definition)
+        name = str(definition.setdefault("name", f"grid{i + 1}"))
+        if name in seen:
+            raise ValueError(f"duplicate grid name: {name}")
+        seen.add(name)
+        resolved.append(definition)
+    return resolved
+
+
+class MultiGridRunner:
+    """グリッドごとに監視タスクを立て、共有サービスの上で並行運用"""
+
+    def __init__(
+        self,
+        definitions: List[Dict],
+        shared: Optional[SharedServices] = None,
+        restart_delay: float = 30.0,
+        max_restart_delay: float = 600.0,
+    ):
+        if not definitions:
+            raise ValueError("at least one grid definition is required")
+        self.definitions = definitions
+        self.shared = shared or SharedServices()
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.bots: Dict[str, object] = {}
+        self.restarts: Dict[str, int] = {}
+
+    def _create_bot(self, definition: Dict):
+        from core.grid_bot import CaptainGridBot
+
+        bot = CaptainGridBot(settings=definition, shared=self.shared)
+        self.bots[bot.name] = bot
+        return bot
+
+    async def _supervise(self, definition: Dict):
+        """1グリッドを動かし続ける（例外で落ちたら管理中の注文を取り消して作り直す）"""
+        name = definition["name"]
+        delay = self.restart_delay
+        bot = self.bots.get(name) or self._create_bot(definition)
+        while True:
+            try:
+                await bot.run()
+                logger.warning(f"⚠️ [{name}] グリッド終了")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.restarts[name] = self.restarts.get(name, 0) + 1
+                logger.exception(f"💥 [{name}] グリッド停止（{delay:.0f}秒後に再起動）: {e}")
+                self.shared.notifier.notify(f"💥 [{name}] グリッド停止: {e}", CRITICAL)
+                await self._abandon(bot)
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+            bot = self._create_bot(definition)
+
+    @staticmethod
+    async def _abandon(bot):
+        """落ちたグリッドの注文を残さない（取り消し済みのジャーナルから復元した次のインスタンスは新規配置になる）"""
+        open_orders = list(bot.orders.by_id.values())
+        try:
+            if bot.client is not None and open_orders:
+                await bot._cancel_orders(open_orders)
+        except Exception as e:
+            logger.error(f"❌ [{bot.name}] 注文の取り消し失敗（取引所側に残っている可能性）: {e}")
+        finally:
+            # 取り消しをジャーナルに書いてから閉じる（次のインスタンスが同じファイルを開く）
+            if bot.journal is not None:
+                bot.journal.close()
+
+    async def run(self):
+        # 先に全グリッドを生成して契約をフィードに登録してから、共有サービスを起動
+        for definition in self.definitions:
+            self._create_bot(definition)
+        logger.info(f"🧩 マルチグリッド起動: {len(self.bots)}グリッド / 契約 {len(self.shared.feed.cells)}種類")
+        await self.shared.start()
+
+        tasks = [asyncio.create_task(self._supervise(d), name=f"grid:{d['name']}") for d in self.definitions]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.shared.close()
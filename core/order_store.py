@@ -0,0 +1,200 @@
+"""
+注文・ポジションのローカルキャッシュ - 約定イベントで逐次更新し、定期スナップショットで突き合わせ
+注文ID・価格レベルのどちらからもO(1)で引ける
+
+約定量・ポジションを動かすのは約定レコード（apply_fill）だけ。突き合わせで取引所に見当たらない注文や
+キャンセルした注文は、その時刻より後に送った約定ポーリングが済むまで約定を受け付けてから消す
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class GridOrder:
+    """ボットが出した1本の指値注文"""
+
+    __slots__ = ("order_id", "side", "price", "size", "filled", "status", "level")
+
+    def __init__(self, order_id: str, side: str, price: float, size: float, level: int = 0):
+        self.order_id = order_id
+        self.side = side      # "BUY" / "SELL"
+        self.price = price
+        self.size = size
+        self.filled = 0.0
+        self.status = "OPEN"  # OPEN / FILLED / CANCELED
+        self.level = level
+
+    @property
+    def remaining(self) -> float:
+        return max(self.size - self.filled, 0.0)
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GridOrder":
+        order = cls(str(data["order_id"]), data["side"], float(data["price"]), float(data["size"]), data.get("level", 0))
+        order.filled = float(data.get("filled", 0.0))
+        order.status = data.get("status", "OPEN")
+        return order
+
+
+class OrderStore:
+    """未約定注文とネットポジションを保持"""
+
+    def __init__(self, fill_id_memory: int = 4096):
+        self.by_id: Dict[str, GridOrder] = {}
+        self.by_level: Dict[Tuple[str, float], str] = {}  # (side, price) → order_id
+        self.net_position = 0.0  # BTC（買いで+、売りで-）
+        self.fill_count = 0
+        # 同じ約定を二重に数えないための直近約定ID（件数固定）
+        self._seen_fills: set = set()
+        self._seen_order: deque = deque()
+        self._fill_id_memory = fill_id_memory
+        # 突き合わせで取引所に見当たらなかった注文 → 観測時刻（time.monotonic）
+        self._missing: Dict[str, float] = {}
+        # キャンセル済みで遅れて届く約定を待っている注文 → (注文, キャンセル完了時刻)
+        self.retired: Dict[str, Tuple[GridOrder, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def add(self, order: GridOrder):
+        self.by_id[order.order_id] = order
+        self.by_level[(order.side, order.price)] = order.order_id
+
+    def get(self, order_id: str) -> Optional[GridOrder]:
+        return self.by_id.get(order_id)
+
+    def at_level(self, side: str, price: float) -> Optional[GridOrder]:
+        order_id = self.by_level.get((side, price))
+        return self.by_id.get(order_id) if order_id else None
+
+    def open_orders(self, side: Optional[str] = None) -> List[GridOrder]:
+        return [o for o in self.by_id.values() if side is None or o.side == side]
+
+    def remove(self, order_id: str, status: str = "CANCELED") -> Optional[GridOrder]:
+        order = self.by_id.pop(order_id, None)
+        self._missing.pop(order_id, None)
+        if order is None:
+            return None
+        order.status = status
+        key = (order.side, order.price)
+        if self.by_level.get(key) == order_id:
+            del self.by_level[key]
+        return order
+
+    def retire(self, order_id: str, at: float) -> Optional[GridOrder]:
+        """
+        キャンセルした注文を板から外す（キャンセル前に約定していた分はsettleまで受け付ける）
+
+        Args:
+            order_id: 注文ID
+            at: キャンセル完了時刻（time.monotonic）
+
+        Returns:
+            GridOrder: 外した注文（未知のIDならNone）
+        """
+        order = self.remove(order_id)
+        if order is not None:
+            self.retired[order_id] = (order, at)
+        return order
+
+    def settle(self, polled_at: float) -> List[GridOrder]:
+        """
+        polled_at以前に見失った・キャンセルした注文を確定させる（その時刻以降に送った約定ポーリングの反映後に呼ぶ）
+
+        Args:
+            polled_at: 反映済みの約定ポーリングを送った時刻（time.monotonic）
+
+        Returns:
+            List[GridOrder]: 約定が来ないまま取引所から消えていた注文（外部キャンセル扱いで削除済み）
+        """
+        self.retired = {oid: entry for oid, entry in self.retired.items() if entry[1] > polled_at}
+        gone = [oid for oid, seen in self._missing.items() if seen <= polled_at]
+        return [order for order in (self.remove(oid) for oid in gone) if order is not None]
+
+    def apply_fill(self, order_id: str, size: float, fill_id: Optional[str] = None) -> Optional[GridOrder]:
+        """
+        約定1件を反映（キャンセル済みの注文への遅れた約定も数える）
+
+        Returns:
+            GridOrder: この約定で全量約定した注文（まだ残りがあればNone）
+        """
+        if fill_id is not None:
+            if fill_id in self._seen_fills:
+                return None
+            self._seen_fills.add(fill_id)
+            self._seen_order.append(fill_id)
+            if len(self._seen_order) > self._fill_id_memory:
+                self._seen_fills.discard(self._seen_order.popleft())
+
+        order = self.by_id.get(order_id)
+        retired = order is None and order_id in self.retired
+        if retired:
+            order = self.retired[order_id][0]
+        if order is None:
+            return None
+
+        order.filled += size
+        self.net_position += size if order.side == "BUY" else -size
+        self.fill_count += 1
+        if order.remaining <= 1e-12:
+            if retired:
+                del self.retired[order_id]
+                order.status = "FILLED"
+                return order
+            return self.remove(order_id, status="FILLED")
+        return None
+
+    def to_state(self) -> Dict:
+        """ジャーナルのスナップショット用（未約定注文・ポジション・直近の約定ID）"""
+        return {
+            "orders": [o.to_dict() for o in self.by_id.values()],
+            "retired": [o.to_dict() for o, _ in self.retired.values()],
+            "net_position": self.net_position,
+            "fill_count": self.fill_count,
+            "seen_fills": list(self._seen_order),
+        }
+
+    def load_state(self, state: Dict):
+        """to_stateの内容で置き換え"""
+        self.by_id.clear()
+        self.by_level.clear()
+        self._missing.clear()
+        for data in state.get("orders", []):
+            self.add(GridOrder.from_dict(data))
+        # 再起動後は最初の約定ポーリングまで遅れた約定を受け付ける
+        self.retired = {str(d["order_id"]): (GridOrder.from_dict(d), 0.0) for d in state.get("retired", [])}
+        self.net_position = float(state.get("net_position", 0.0))
+        self.fill_count = int(state.get("fill_count", 0))
+        self._seen_order = deque(state.get("seen_fills", [])[-self._fill_id_memory:])
+        self._seen_fills = set(self._seen_order)
+
+    def reconcile(self, snapshot: Iterable[Dict], observed_at: float) -> Tuple[List[GridOrder], List[Dict]]:
+        """
+        取引所の全アクティブ注文と突き合わせ（約定量・ポジションは変えない、約定レコードで反映する）
+
+        Args:
+            snapshot: 取引所のアクティブ注文（id / side / price / size / cumFillSize）
+            observed_at: スナップショットを受け取った時刻（time.monotonic）
+
+        Returns:
+            (ローカルにあって取引所にない注文 ※settleまで保留, 取引所にあってローカルにない注文)
+        """
+        live_ids = set()
+        unknown = []
+        for item in snapshot:
+            order_id = str(item.get("id") or item.get("orderId"))
+            live_ids.add(order_id)
+            if order_id not in self.by_id:
+                unknown.append(item)
+
+        # 消えた理由（約定かキャンセルか）は次の約定ポーリングで分かるので、ここでは印を付けるだけ
+        missing = []
+        for order_id, order in self.by_id.items():
+            if order_id in live_ids:
+                self._missing.pop(order_id, None)
+            else:
+                self._missing.setdefault(order_id, observed_at)
+                missing.append(order)
+        return missing, unknown
@@ -0,0 +1,111 @@
+"""
+価格ソース層 - 複数ソースをヘッジ付きで競争させ、最初の有効値を採用
+全滅時は最終取得値をstale（古い）と明示して返し、TTL切れならNone（仮価格は作らない）
+"""
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from loguru import logger
+
+PriceFetch = Callable[[], Awaitable[float]]
+
+
+class PriceQuote:
+    """取得した価格と由来"""
+
+    __slots__ = ("price", "source", "fetched_at", "latency", "stale")
+
+    def __init__(self, price: float, source: str, fetched_at: float, latency: float, stale: bool = False):
+        self.price = price
+        self.source = source
+        self.fetched_at = fetched_at  # time.monotonic()基準
+        self.latency = latency        # 取得にかかった秒数
+        self.stale = stale
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def __repr__(self) -> str:
+        flag = " STALE" if self.stale else ""
+        return f"PriceQuote({self.price:.2f} from {self.source}, {self.latency * 1000:.0f}ms{flag})"
+
+
+class PriceRouter:
+    """優先順にソースを起動し、hedge_delay秒応答がなければ次のソースも並走させる"""
+
+    def __init__(
+        self,
+        sources: List[Tuple[str, PriceFetch]],
+        hedge_delay: float = 0.3,
+        timeout: float = 5.0,
+        ttl: float = 60.0,
+    ):
+        if not sources:
+            raise ValueError("at least one price source is required")
+        self.sources = sources
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.ttl = ttl  # 最終取得値をstaleとして返してよい秒数
+        self.last_good: Optional[PriceQuote] = None
+
+    @staticmethod
+    def _valid(price) -> bool:
+        return isinstance(price, (int, float)) and math.isfinite(price) and price > 0
+
+    async def get(self) -> Optional[PriceQuote]:
+        """最速の有効値を返す（全滅時はTTL内の最終取得値をstale付きで、それも無ければNone）"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        names = {}
+        pending = set()
+        errors = []
+        next_idx = 0
+        next_hedge = started
+
+        try:
+            while True:
+                now = time.monotonic()
+                # 次のソースを起動: 初回 / hedge_delay経過 / 走っているものが全部失敗した時
+                if next_idx < len(self.sources) and (now >= next_hedge or not pending):
+                    name, fetch = self.sources[next_idx]
+                    task = asyncio.ensure_future(fetch())
+                    names[task] = name
+                    pending.add(task)
+                    next_idx += 1
+                    next_hedge = now + self.hedge_delay
+
+                if not pending or now >= deadline:
+                    break
+
+                wait = deadline - now
+                if next_idx < len(self.sources):
+                    wait = min(wait, max(next_hedge - now, 0.0))
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    name = names[task]
+                    if task.exception() is not None:
+                        errors.append(f"{name}: {task.exception()}")
+                        continue
+                    price = task.result()
+                    if not self._valid(price):
+                        errors.append(f"{name}: invalid price {price!r}")
+                        continue
+                    finished = time.monotonic()
+                    self.last_good = PriceQuote(float(price), name, finished, finished - started)
+                    return self.last_good
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if len(errors) < len(names):
+            errors.append(f"timeout {self.timeout:.1f}s")
+        logger.warning(f"⚠️ 全価格ソース失敗: {' / '.join(errors)}")
+
+        cached = self.last_good
+        if cached is None or cached.age > self.ttl:
+            return None
+        return PriceQuote(cached.price, cached.source, cached.fetched_at, cached.latency, stale=True)
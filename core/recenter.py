@@ -0,0 +1,53 @@
+"""
+差分リセンター - 目標ラダーと稼働中の注文を比べて、変わった段だけキャンセル・新規発注
+そのままの段は板の順番（キュー位置）を保つため触らない
+"""
+from typing import Dict, List, Tuple
+
+from core.order_store import GridOrder, OrderStore
+
+
+class RecenterPlan:
+    """リセンターで必要な最小限の操作"""
+
+    __slots__ = ("keep", "cancel", "place")
+
+    def __init__(self, keep: List[GridOrder], cancel: List[GridOrder], place: List[Tuple[str, float, float]]):
+        self.keep = keep
+        self.cancel = cancel
+        self.place = place
+
+    @property
+    def empty(self) -> bool:
+        return not self.cancel and not self.place
+
+    def __repr__(self) -> str:
+        return f"RecenterPlan(keep={len(self.keep)}, cancel={len(self.cancel)}, place={len(self.place)})"
+
+
+def plan_recenter(desired: List[Tuple[str, float, float]], store: OrderStore, size_tolerance: float = 1e-12) -> RecenterPlan:
+    """
+    目標ラダーとの差分を計算
+
+    Args:
+        desired: 目標ラダー（side, price, size）
+        store: 稼働中の注文
+        size_tolerance: 発注数量の差がこの値以下なら同一とみなす（部分約定済みでも維持）
+
+    Returns:
+        RecenterPlan: 維持・キャンセル・新規の内訳
+        （EdgeXに注文訂正APIがないため、数量違いはキャンセル＋新規で置き換え）
+    """
+    wanted: Dict[Tuple[str, float], float] = {(side, price): size for side, price, size in desired}
+
+    keep, cancel = [], []
+    for order in store.open_orders():
+        size = wanted.get((order.side, order.price))
+        if size is not None and abs(order.size - size) <= size_tolerance:
+            keep.append(order)
+            del wanted[(order.side, order.price)]
+        else:
+            cancel.append(order)
+
+    place = [(side, price, size) for (side, price), size in wanted.items()]
+    return RecenterPlan(keep, cancel, place)
@@ -0,0 +1,176 @@
+"""
+発注前リスクエンジン - ポジション・片側本数・損益・残高を約定/価格ごとに逐次更新
+発注前チェックは取引所に問い合わせず、保持している数値だけでO(1)判定
+"""
+from typing import Dict, Iterable, Optional
+
+
+class RiskEngine:
+    """max_net_position_btc / position_imbalance_limit / loss_limit / min_resume_balance を発注時に強制"""
+
+    def __init__(
+        self,
+        max_net_position_btc: float = 0.01,
+        position_imbalance_limit: int = 3,
+        loss_limit: float = 0.50,
+        min_resume_balance: float = 8.5,
+        initial_balance: float = 195.0,
+    ):
+        self.max_net_position_btc = max_net_position_btc
+        self.position_imbalance_limit = position_imbalance_limit
+        self.loss_limit = loss_limit
+        self.min_resume_balance = min_resume_balance
+        self.initial_balance = initial_balance
+
+        self.net_position = 0.0   # BTC（買いで+）
+        self.avg_entry = 0.0      # 現ポジションの平均建値
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.last_price = 0.0
+        self.balance: Optional[float] = None  # 取引所残高（取得できるまで新規の建て玉は出さない）
+        self._baseline_set = False  # initial_balanceが実残高（または復元値）になったか
+        self.open_levels = {"BUY": 0, "SELL": 0}
+        self.open_size = {"BUY": 0.0, "SELL": 0.0}
+        self.rejected = 0
+
+    # ---- 状態更新 ----
+
+    def set_balance(self, balance: float, initial: bool = False):
+        """取引所残高を反映（最初の1回、またはinitial=Trueで損失判定の基準残高にもする）"""
+        self.balance = balance
+        if initial or not self._baseline_set:
+            self.initial_balance = balance
+            self._baseline_set = True
+
+    def on_price(self, price: float):
+        self.last_price = price
+
+    def release(self, side: str, size: float):
+        """未約定のまま消えた注文（キャンセル・発注失敗）の枠を戻す"""
+        self.open_levels[side] = max(self.open_levels[side] - 1, 0)
+        self.open_size[side] = max(self.open_size[side] - size, 0.0)
+
+    def on_fill(self, side: str, size: float, price: float, fee: float = 0.0, order_done: bool = False,
+                released: bool = False):
+        """約定を反映（平均建値方式で実現損益を計算、released: キャンセルで枠を戻し済みの注文への遅れた約定）"""
+        if not released:
+            self.open_size[side] = max(self.open_size[side] - size, 0.0)
+            if order_done:
+                self.open_levels[side] = max(self.open_levels[side] - 1, 0)
+        self.fees += fee
+
+        signed = size if side == "BUY" else -size
+        pos = self.net_position
+        if pos == 0 or (pos > 0) == (signed > 0):
+            # 建て増し
+            new_pos = pos + signed
+            self.avg_entry = (self.avg_entry * abs(pos) + price * size) / abs(new_pos)
+            self.net_position = new_pos
+            return
+
+        # 決済（超えた分はドテン）
+        closed = min(abs(signed), abs(pos))
+        direction = 1.0 if pos > 0 else -1.0
+        self.realized_pnl += (price - self.avg_entry) * closed * direction
+        new_pos = pos + signed
+        if abs(new_pos) < 1e-12:
+            self.net_position, self.avg_entry = 0.0, 0.0
+        elif (new_pos > 0) != (pos > 0):
+            self.net_position, self.avg_entry = new_pos, price
+        else:
+            self.net_position = new_pos
+
+    def rebuild_open(self, orders: Iterable):
+        """未約定注文の一覧から片側本数・数量を数え直す（状態復元後）"""
+        self.open_levels = {"BUY": 0, "SELL": 0}
+        self.open_size = {"BUY": 0.0, "SELL": 0.0}
+        for order in orders:
+            self.open_levels[order.side] += 1
+            self.open_size[order.side] += order.remaining
+
+    def to_state(self) -> Dict:
+        """ジャーナルのスナップショット用（損益は再起動をまたいで引き継ぐ）"""
+        state = {
+            "net_position": self.net_position,
+            "avg_entry": self.avg_entry,
+            "realized_pnl": self.realized_pnl,
+            "fees": self.fees,
+            "rejected": self.rejected,
+        }
+        if self._baseline_set:
+            state["initial_balance"] = self.initial_balance  # 設定の既定値のままなら引き継がない
+        return state
+
+    def load_state(self, state: Dict):
+        for name in ("net_position", "avg_entry", "realized_pnl", "fees", "initial_balance"):
+            if name in state:
+                setattr(self, name, float(state[name]))
+        if "initial_balance" in state:
+            self._baseline_set = True  # 再起動をまたいで基準残高を引き継ぐ
+        self.rejected = int(state.get("rejected", self.rejected))
+
+    def sync_position(self, net_position: float):
+        """突き合わせで判明したポジションに合わせる（建値は維持）"""
+        self.net_position = net_position
+        if net_position == 0:
+            self.avg_entry = 0.0
+
+    # ---- 参照 ----
+
+    @property
+    def unrealized_pnl(self) -> float:
+        if self.net_position == 0 or self.last_price == 0:
+            return 0.0
+        return (self.last_price - self.avg_entry) * self.net_position
+
+    @property
+    def equity(self) -> float:
+        return self.initial_balance + self.realized_pnl + self.unrealized_pnl - self.fees
+
+    @property
+    def loss_halted(self) -> bool:
+        return self.equity <= self.initial_balance * (1.0 - self.loss_limit)
+
+    # ---- 発注前チェック ----
+
+    def reduces(self, side: str, size: float) -> bool:
+        """同じ側で予約済みの未約定と合わせてもポジション以内に収まる（= ポジションを減らすだけの）注文か"""
+        signed = size if side == "BUY" else -size
+        return self.net_position * signed < 0 and size + self.open_size[side] <= abs(self.net_position) + 1e-12
+
+    def check(self, side: str, size: float) -> Optional[str]:
+        """発注してよければNone、ダメなら理由"""
+        reduces = self.reduces(side, size)
+
+        # ポジションを減らす注文（約定後の利確など）は残高・損失・本数の制限を受けない
+        if not reduces:
+            if self.balance is None:
+                return "balance_unknown: 取引所残高が未取得"
+            if self.loss_halted:
+                return f"loss_limit: equity ${self.equity:.2f} <= {1 - self.loss_limit:.0%} of ${self.initial_balance:.2f}"
+            if self.balance < self.min_resume_balance:
+                return f"min_resume_balance: ${self.balance:.2f} < ${self.min_resume_balance:.2f}"
+
+        # 同じ側の未約定が全部約定した場合の最悪ポジション
+        if side == "BUY":
+            worst = self.net_position + self.open_size["BUY"] + size
+        else:
+            worst = self.net_position - self.open_size["SELL"] - size
+        if abs(worst) > self.max_net_position_btc + 1e-12 and abs(worst) > abs(self.net_position):
+            return f"max_net_position: worst {worst:+.4f} BTC > {self.max_net_position_btc} BTC"
+
+        other = "SELL" if side == "BUY" else "BUY"
+        imbalance = self.open_levels[side] + 1 - self.open_levels[other]
+        if not reduces and imbalance > self.position_imbalance_limit:
+            return f"imbalance: {side} {self.open_levels[side] + 1}本 vs {other} {self.open_levels[other]}本"
+        return None
+
+    def try_open(self, side: str, size: float) -> Optional[str]:
+        """チェックを通れば枠を確保（同時発注でも上限を超えないよう発注前に予約）"""
+        reason = self.check(side, size)
+        if reason is not None:
+            self.rejected += 1
+            return reason
+        self.open_levels[side] += 1
+        self.open_size[side] += size
+        return None
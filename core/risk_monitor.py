@@ -0,0 +1,191 @@
+"""
+急落・ジワ下落検知モジュール - 1tickあたりO(1)の時間窓統計
+固定長リングバッファ + 単調deque（最大/最小）+ 逐次分散で、窓の長さに関係なく一定コスト
+"""
+import math
+import time
+from collections import deque
+from typing import Optional
+
+from loguru import logger
+
+
+class RollingWindow:
+    """時間窓（window秒）内の最大・最小・リターン・ボラティリティ"""
+
+    def __init__(self, window: float, capacity: Optional[int] = None, tick_rate: float = 20.0):
+        """
+        Args:
+            window: 窓の長さ（秒）
+            capacity: 保持する最大点数（省略時は window × tick_rate、超えたら窓内でも古い点から捨てる）
+            tick_rate: 想定する最大の価格更新回数/秒（capacity省略時の見積もり用）
+        """
+        self.window = window
+        self.capacity = capacity = capacity or max(2, math.ceil(window * tick_rate) + 1)  # メモリ上限
+        self.overflowed = 0  # 窓から出る前に捨てた点の数（>0なら実際の窓はwindow秒より短い）
+        self._ts = [0.0] * capacity
+        self._px = [0.0] * capacity
+        self._ret = [0.0] * capacity  # 直前の点からの対数リターン
+        self._head = 0  # 窓内で最も古い点の通し番号
+        self._seq = 0   # 次に書き込む通し番号
+        self._maxq: deque = deque()  # 価格が単調減少する通し番号列
+        self._minq: deque = deque()  # 価格が単調増加する通し番号列
+        self._sumsq = 0.0  # 窓内リターン（最古の点を除く）の二乗和
+        self._sum = 0.0
+
+    def __len__(self) -> int:
+        return self._seq - self._head
+
+    def push(self, ts: float, price: float):
+        cap = self.capacity
+        if self._seq - self._head >= cap:
+            if self._ts[self._head % cap] >= ts - self.window:
+                if not self.overflowed:
+                    logger.warning(
+                        f"⚠️ 価格更新が想定より速く{self.window:.0f}秒窓に収まらない"
+                        f"（{cap}点で{ts - self._ts[self._head % cap]:.0f}秒分）- 古い点を窓の途中で捨てる"
+                    )
+                self.overflowed += 1
+            self._evict()
+
+        ret = 0.0
+        if self._seq > self._head:
+            ret = math.log(price / self._px[(self._seq - 1) % cap])
+            self._sum += ret
+            self._sumsq += ret * ret
+
+        slot = self._seq % cap
+        self._ts[slot] = ts
+        self._px[slot] = price
+        self._ret[slot] = ret
+
+        px = self._px
+        while self._maxq and px[self._maxq[-1] % cap] <= price:
+            self._maxq.pop()
+        self._maxq.append(self._seq)
+        while self._minq and px[self._minq[-1] % cap] >= price:
+            self._minq.pop()
+        self._minq.append(self._seq)
+        self._seq += 1
+
+        horizon = ts - self.window
+        while self._seq - self._head > 1 and self._ts[self._head % cap] < horizon:
+            self._evict()
+
+    def _evict(self):
+        head = self._head
+        if self._maxq and self._maxq[0] == head:
+            self._maxq.popleft()
+        if self._minq and self._minq[0] == head:
+            self._minq.popleft()
+        self._head = head + 1
+
+        if self._seq - self._head <= 1:
+            # 残り1点以下なら累積誤差ごとリセット
+            self._sum = 0.0
+            self._sumsq = 0.0
+        else:
+            # 新しい最古点のリターンは窓の外の点とのリターンなので除外
+            ret = self._ret[self._head % self.capacity]
+            self._sum -= ret
+            self._sumsq -= ret * ret
+
+    @property
+    def last(self) -> float:
+        return self._px[(self._seq - 1) % self.capacity]
+
+    @property
+    def oldest(self) -> float:
+        return self._px[self._head % self.capacity]
+
+    @property
+    def span(self) -> float:
+        """窓内の最古点から最新点までの秒数"""
+        if len(self) < 2:
+            return 0.0
+        cap = self.capacity
+        return self._ts[(self._seq - 1) % cap] - self._ts[self._head % cap]
+
+    @property
+    def max(self) -> float:
+        return self._px[self._maxq[0] % self.capacity]
+
+    @property
+    def min(self) -> float:
+        return self._px[self._minq[0] % self.capacity]
+
+    def rolling_return(self) -> float:
+        """窓の最古点から最新点までの単純リターン"""
+        return self.last / self.oldest - 1.0
+
+    def stddev(self) -> float:
+        """窓内の対数リターンの標準偏差"""
+        n = len(self) - 1
+        if n < 2:
+            return 0.0
+        var = (self._sumsq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class VolatilityMonitor:
+    """価格更新ごとに急落・ジワ下落トリガーを判定（発火は状態が変わった時だけ）"""
+
+    def __init__(
+        self,
+        volatility_threshold: float = 0.03,
+        volatility_check_interval: float = 30,
+        gradual_decline_threshold: float = 0.01,
+        gradual_decline_window: float = 600,
+        capacity: Optional[int] = None,
+        tick_rate: float = 20.0,
+    ):
+        """
+        Args:
+            volatility_threshold: 短期窓の高値からの下落率（急落）
+            volatility_check_interval: 短期窓（秒）
+            gradual_decline_threshold: 長期窓のリターン（ジワ下落）
+            gradual_decline_window: 長期窓（秒）
+            capacity: 各窓の最大点数（省略時は窓の秒数 × tick_rate）
+            tick_rate: 想定する最大の価格更新回数/秒
+        """
+        self.volatility_threshold = volatility_threshold
+        self.gradual_decline_threshold = gradual_decline_threshold
+        self.fast = RollingWindow(volatility_check_interval, capacity, tick_rate)
+        self.slow = RollingWindow(gradual_decline_window, capacity, tick_rate)
+        self.crash_active = False
+        self.decline_active = False
+
+    def update(self, price: float, ts: Optional[float] = None) -> Optional[str]:
+        """
+        価格を1件取り込み、新たに発火したトリガーを返す
+
+        Returns:
+            "crash"（短期急落）/ "decline"（ジワ下落）/ None
+        """
+        if ts is None:
+            ts = time.monotonic()
+        self.fast.push(ts, price)
+        self.slow.push(ts, price)
+
+        # 急落: 短期窓の最大値からの下落率
+        drawdown = 1.0 - price / self.fast.max
+        crash = drawdown >= self.volatility_threshold
+
+        # ジワ下落: 長期窓の半分以上のデータが揃ってから窓内リターンで判定
+        decline = (
+            self.slow.span >= self.slow.window * 0.5
+            and self.slow.rolling_return() <= -self.gradual_decline_threshold
+        )
+
+        fired = None
+        if crash and not self.crash_active:
+            fired = "crash"
+        elif decline and not self.decline_active:
+            fired = "decline"
+        self.crash_active = crash
+        self.decline_active = decline
+        return fired
+
+    @property
+    def triggered(self) -> bool:
+        return self.crash_active or self.decline_active
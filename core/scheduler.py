@@ -0,0 +1,199 @@
+"""
+リクエストスケジューラ - エンドポイント別トークンバケット + 優先レーン
+キャンセル > 新規注文 > 相場データ > 残高照会 の順に送り出し、同一の読み取りは1本にまとめる
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from loguru import logger
+
+# 優先レーン（小さいほど先）
+CANCEL = 0
+ORDER = 1
+MARKET_DATA = 2
+ACCOUNT = 3
+
+# エンドポイント別の (毎秒補充数, バースト上限)
+# EdgeXの公開レート制限より控えめに設定（キャンセルは専用枠で常に空きを残す）
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "cancel": (10.0, 20.0),
+    "order": (10.0, 20.0),
+    "public": (5.0, 10.0),
+    "account": (2.0, 5.0),
+    "binance": (10.0, 20.0),
+}
+# EdgeX全体で共有する枠（binanceなど外部は対象外）
+DEFAULT_GLOBAL_LIMIT: Tuple[float, float] = (20.0, 40.0)
+EXTERNAL_ENDPOINTS = {"binance"}
+
+
+class TokenBucket:
+    """トークンバケット（時間経過で補充）"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """1トークン使えるまでの秒数（0なら即時）"""
+        self._refill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1.0
+
+
+class RequestScheduler:
+    """全取引所呼び出しの送り出しを一元管理"""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        global_limit: Optional[Tuple[float, float]] = DEFAULT_GLOBAL_LIMIT,
+    ):
+        merged = dict(DEFAULT_LIMITS)
+        merged.update(limits or {})
+        self._buckets: Dict[str, TokenBucket] = {name: TokenBucket(*lim) for name, lim in merged.items()}
+        self._global = TokenBucket(*global_limit) if global_limit else None
+        self._queue: List[tuple] = []  # (priority, seq, endpoint, factory, future)
+        self._seq = itertools.count()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: set = set()  # 実行中タスクの参照保持（GC対策）
+        self.coalesced = 0
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            bucket = self._buckets[endpoint] = TokenBucket(*DEFAULT_LIMITS["public"])
+        return bucket
+
+    async def submit(
+        self,
+        endpoint: str,
+        priority: int,
+        factory: Callable[[], Awaitable[Any]],
+        key: Optional[Hashable] = None,
+    ) -> Any:
+        """
+        リクエストを予約して結果を待つ
+
+        Args:
+            endpoint: レート制限の枠名（cancel / order / public / account / binance）
+            priority: 優先レーン（CANCEL / ORDER / MARKET_DATA / ACCOUNT）
+            factory: 実行時に呼ばれるコルーチン生成関数
+            key: 読み取り系の同一判定キー（実行中の同じkeyがあれば結果を共有）
+        """
+        if key is not None:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key is not None:
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        heapq.heappush(self._queue, (priority, next(self._seq), endpoint, factory, future))
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return await asyncio.shield(future) if key is not None else await future
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self):
+        while True:
+            delay = self._dispatch_ready()
+            self._wakeup.clear()
+            if not self._queue:
+                await self._wakeup.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch_ready(self) -> float:
+        """送れるものを優先順に全部送り、次に空きが出るまでの秒数を返す"""
+        now = time.monotonic()
+        waiting = []
+        next_delay = 1.0
+        global_blocked = False  # 上位レーンが共有枠待ちなら下位レーンに共有枠を譲らない
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            _, _, endpoint, factory, future = item
+            if future.done():  # 呼び出し側がキャンセル済み
+                continue
+
+            bucket = self._bucket(endpoint)
+            wait = bucket.wait_time(now)
+            use_global = self._global is not None and endpoint not in EXTERNAL_ENDPOINTS
+            if use_global:
+                global_wait = self._global.wait_time(now)
+                if global_blocked and global_wait == 0:
+                    global_wait = 1.0 / self._global.rate
+                if global_wait > 0:
+                    global_blocked = True
+                wait = max(wait, global_wait)
+            if wait > 0:
+                waiting.append(item)
+                next_delay = min(next_delay, wait)
+                continue
+
+            bucket.take()
+            if use_global:
+                self._global.take()
+            task = asyncio.create_task(self._run(factory, future))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+        for item in waiting:
+            heapq.heappush(self._queue, item)
+        return next_delay
+
+    @staticmethod
+    async def _run(factory: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def close(self):
+        """ディスパッチャ停止、未送信の予約はキャンセル"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        while self._queue:
+            future = heapq.heappop(self._queue)[-1]
+            if not future.done():
+                future.cancel()
+        if self.coalesced:
+            logger.info(f"📦 スケジューラ停止（同一読み取りの集約 {self.coalesced}件）")
@@ -0,0 +1,464 @@
+"""
+署名モジュール - Stark署名（注文・リクエストヘッダー）とEIP-191署名をワーカープールで計算
+SDKの署名は純Pythonの楕円曲線演算で1件数十ms、イベントループ上で回すと発注中ずっとループが止まる
+鍵の解析・資産IDペアのPedersenハッシュはワーカー内でキャッシュ（注文ごとのハッシュは4回→2回）
+
+注文ハッシュの組み立てはedgex-python-sdk 0.3.0の内部実装（internal / crypto）を写したもの
+requirements.txtでバージョンを固定し、起動時にOffloadedSdkSigner.verifyでSDK自身の出力と比べて
+一致しなければSDKの署名（ループ上）に戻す
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from utils.metrics import REGISTRY, MetricsRegistry
+
+MODES = ("process", "thread", "inline")
+
+# StarkExの定数（edgex_sdk.internal.starkex_signing_adapterと同じ値）
+FIELD_PRIME = 0x800000000000011000000000000000000000000000000000000000000000001
+EC_ORDER = 0x800000000000010ffffffffffffffffb781126dcae7b2321e66a241adc64d2f
+LIMIT_ORDER_WITH_FEE_TYPE = 3
+L2_EXPIRE_MS = 14 * 24 * 60 * 60 * 1000  # SDKと同じ14日
+
+
+# ---- ワーカー側（プロセスプールでも呼べるようにモジュール関数、状態はプロセスごとのキャッシュ） ----
+
+def _warm_up():
+    """ワーカー起動時にSDKの暗号モジュールを読み込んでおく（初回署名の遅れをなくす）"""
+    _stark_adapter()
+
+
+@lru_cache(maxsize=1)
+def _stark_adapter():
+    from edgex_sdk.internal.starkex_signing_adapter import StarkExSigningAdapter
+
+    return StarkExSigningAdapter()
+
+
+@lru_cache(maxsize=8)
+def _stark_key(private_key: str) -> int:
+    """hex鍵 → 整数（SDKのsignと同じ正規化、1回だけ）"""
+    key = int(private_key, 16) % EC_ORDER
+    return key or 1
+
+
+@lru_cache(maxsize=8)
+def _eth_account(private_key: str):
+    from eth_account import Account
+
+    return Account.from_key(private_key)
+
+
+def _pedersen(a: int, b: int) -> int:
+    from edgex_sdk.crypto.pedersen_hash import pedersen_hash
+
+    return pedersen_hash(a, b)
+
+
+@lru_cache(maxsize=64)
+def _asset_prefix(synthetic_asset_id: str, collateral_asset_id: str, fee_asset_id: str, is_buy: bool) -> int:
+    """hash(hash(sell, buy), fee) - 契約と売買方向だけで決まるので注文ごとに計算しない"""
+    synthetic = int(synthetic_asset_id.removeprefix("0x"), 16) % FIELD_PRIME
+    collateral = int(collateral_asset_id.removeprefix("0x"), 16) % FIELD_PRIME
+    fee = int(fee_asset_id.removeprefix("0x"), 16) % FIELD_PRIME
+    sell, buy = (collateral, synthetic) if is_buy else (synthetic, collateral)
+    return _pedersen(_pedersen(sell, buy), fee)
+
+
+def limit_order_hash(
+    synthetic_asset_id: str,
+    collateral_asset_id: str,
+    fee_asset_id: str,
+    is_buy: bool,
+    amount_synthetic: int,
+    amount_collateral: int,
+    amount_fee: int,
+    nonce: int,
+    account_id: int,
+    expire_time: int,
+) -> int:
+    """AsyncClient.calc_limit_order_hashと同じ値（前半2回のハッシュはキャッシュ）"""
+    amount_sell, amount_buy = (amount_collateral, amount_synthetic) if is_buy else (amount_synthetic, amount_collateral)
+    packed0 = amount_sell
+    packed0 = (packed0 << 64) + amount_buy
+    packed0 = (packed0 << 64) + amount_fee
+    packed0 = (packed0 << 32) + nonce
+    packed1 = LIMIT_ORDER_WITH_FEE_TYPE
+    for _ in range(3):
+        packed1 = (packed1 << 64) + account_id
+    packed1 = ((packed1 << 32) + expire_time) << 17
+
+    msg = _asset_prefix(synthetic_asset_id, collateral_asset_id, fee_asset_id, is_buy)
+    msg = _pedersen(msg, packed0 % FIELD_PRIME)
+    return _pedersen(msg, packed1 % FIELD_PRIME)
+
+
+def sign_stark_hash(private_key: str, message_hash: int) -> str:
+    """Stark署名 r‖s（64桁hex×2）"""
+    r, s = _stark_adapter()._sign(message_hash % EC_ORDER, _stark_key(private_key))
+    return f"{r:064x}{s:064x}"
+
+
+def sign_limit_order(private_key: str, *order_fields) -> str:
+    """注文ハッシュの計算と署名を1回のワーカー呼び出しで（引数はlimit_order_hashと同じ並び）"""
+    return sign_stark_hash(private_key, limit_order_hash(*order_fields))
+
+
+def sign_eth_message(private_key: str, text: str) -> str:
+    """EIP-191（personal_sign）署名、Accountは鍵ごとに1回だけ生成"""
+    from eth_account.messages import encode_defunct
+
+    return _eth_account(private_key).sign_message(encode_defunct(text=text)).signature.hex()
+
+
+# ---- ループ側 ----
+
+async def sdk_limit_order(client, contract_id: str, size: str, price: str, side: str,
+                          client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    """SDK自身の署名で指値注文（GTC）を出す（create_limit_orderはsideを文字列のまま渡して失敗するため）"""
+    from edgex_sdk import CreateOrderParams, OrderSide, OrderType
+
+    return await client.create_order(CreateOrderParams(
+        contract_id=contract_id,
+        price=price,
+        size=size,
+        type=OrderType.LIMIT,
+        side=OrderSide(side),
+        client_order_id=client_order_id
+    ))
+
+
+class SigningExecutor:
+    """
+    署名用ワーカープール（プロセスに1つ、全グリッドで共有）
+
+    - process: 別プロセスで計算（GILを握らないので複数注文を本当に並列で署名、既定）
+    - thread: スレッドで計算（純Pythonなので並列にはならないがループは5ms単位で回る）
+    - inline: 従来どおりループ上で計算（比較・デバッグ用）
+    """
+
+    def __init__(self, mode: str = "process", workers: Optional[int] = None, registry: Optional[MetricsRegistry] = None):
+        """
+        Args:
+            mode: process / thread / inline
+            workers: ワーカー数（省略時はCPU数、最大4）
+            registry: 記録先メトリクス（省略時は共通レジストリ）
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self._pool: Optional[Executor] = None
+        self._starting: Optional[asyncio.Future] = None  # 起動中・起動済みのウォームアップ（同時に呼ばれても1回だけ）
+        self.available = True  # ワーカーでSDKの暗号モジュールを読み込めたか（Falseならその場で計算）
+        registry = registry or REGISTRY
+        self._m_sign = registry.histogram("signing_seconds", "署名の待ち+計算時間", mode=mode)
+
+    def _create_pool(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="signer", initializer=_warm_up)
+        # forkはスレッド（ループ監視など）を持つ親から安全に使えないのでspawn
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up
+        )
+
+    async def start(self):
+        """プールを作ってワーカーを起こしておく（初回注文で起動待ちをしない、並行して呼ばれたら同じ起動を待つ）"""
+        if self.mode == "inline" or not self.available:
+            return
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        await asyncio.shield(self._starting)
+
+    async def _start(self):
+        started = time.perf_counter()
+        self._pool = self._create_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self.workers)))
+        except Exception as e:
+            # SDKのバージョン違いなどで内部モジュールがない → 起動は止めず、注文はSDK自身の署名で
+            logger.error(f"❌ 署名ワーカーの起動失敗 - SDKの署名に切り替え: {e!r}")
+            self.available = False
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            return
+        logger.info(f"✍️ 署名ワーカー起動（{self.mode} × {self.workers}、{(time.perf_counter() - started) * 1000:.0f}ms）")
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """fn(*args)をワーカーで実行（inlineならその場で）"""
+        started = time.perf_counter()
+        try:
+            if self.mode == "inline":
+                return fn(*args)
+            if self._starting is None or not self._starting.done():
+                await self.start()
+            if not self.available:
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._pool, fn, *args)
+            except BrokenProcessPool:
+                # ワーカーが落ちたらプールを作り直して1回だけ再試行
+                logger.warning("⚠️ 署名ワーカーが停止 - プールを再作成")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool()
+                return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self._m_sign.observe(time.perf_counter() - started)
+
+    async def close(self):
+        if self._starting is not None and not self._starting.done():
+            self._starting.cancel()
+            await asyncio.gather(self._starting, return_exceptions=True)
+        self._starting = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class OffloadedSdkSigner:
+    """
+    EdgeX SDKクライアントの署名をSigningExecutorへ逃がす
+
+    - verify(): SDK自身の署名・create_orderの出力と一致するか確認（一致した時だけ使う）
+    - install(): async_client.make_authenticated_requestを差し替え（全ての認証リクエストのヘッダー署名）
+    - prepare_limit_order(): SDKのcreate_orderと同じリクエストを、注文署名だけワーカーで計算して組み立てる
+    """
+
+    def __init__(self, client, executor: SigningExecutor, session_getter: Optional[Callable[[], aiohttp.ClientSession]] = None):
+        """
+        Args:
+            client: edgex_sdk.Client
+            executor: 署名ワーカープール
+            session_getter: 送信に使うセッション（省略時はSDK内部のセッション）
+        """
+        self.client = client
+        self.async_client = client.async_client
+        self.executor = executor
+        self._session_getter = session_getter
+        self._private_key = self.async_client.get_stark_pri_key()
+        self._account_id = int(self.async_client.get_account_id())
+
+    def install(self):
+        self.async_client.make_authenticated_request = self.authenticated_request
+
+    async def verify(self, contract_id: str) -> bool:
+        """
+        SDK自身の実装と比べる（起動時に1回、送信はしない）
+        Stark署名はkが乱数なので署名文字列ではなく、ハッシュの一致と公開鍵での検証で確認
+
+        Args:
+            contract_id: 確認に使う契約（メタデータ取得済みであること）
+
+        Returns:
+            bool: 全て一致ならTrue（Falseなら呼び出し側はSDKの署名経路を使う）
+        """
+        from Crypto.Hash import keccak
+
+        await self.executor.start()  # バックグラウンドで起動中ならワーカーの準備を待つ
+        if not self.executor.available:
+            return False
+        try:
+            adapter = self.async_client.signing_adapter
+            public_key = adapter.get_public_key(self._private_key)
+
+            digest = keccak.new(digest_bits=256, data=b"captain-grid-signing-self-check").digest()
+            signature = await self.executor.run(sign_stark_hash, self._private_key, int.from_bytes(digest, "big"))
+            if not adapter.verify(digest, (signature[:64], signature[64:]), public_key):
+                logger.error("❌ 署名の自己チェック不一致: リクエストヘッダー")
+                return False
+
+            for side in ("BUY", "SELL"):
+                sdk_path, sdk_body = await self._capture_sdk_order(contract_id, "0.001", "50000.0", side)
+                fields, body = await self._limit_order_fields(
+                    contract_id, "0.001", "50000.0", side,
+                    client_order_id=sdk_body["clientOrderId"],
+                    l2_expire_time=int(sdk_body["l2ExpireTime"])
+                )
+                sdk_hash = await asyncio.to_thread(self.async_client.calc_limit_order_hash, *fields)
+                order_hash = await self.executor.run(limit_order_hash, *fields)
+                signature = await self.executor.run(sign_stark_hash, self._private_key, order_hash)
+                body["l2Signature"] = signature
+
+                diff = sorted(k for k in set(body) | set(sdk_body)
+                              if k != "l2Signature" and body.get(k) != sdk_body.get(k))
+                if sdk_path != "/api/v1/private/order/createOrder":
+                    diff.append(sdk_path)
+                if order_hash != int.from_bytes(sdk_hash, "big"):
+                    diff.append("hash")
+                if len(signature) != len(sdk_body.get("l2Signature", "")) or \
+                        not adapter.verify(sdk_hash, (signature[:64], signature[64:]), public_key):
+                    diff.append("l2Signature")
+                if diff:
+                    logger.error(f"❌ 署名の自己チェック不一致: {side}注文 {diff}")
+                    return False
+        except Exception as e:
+            logger.error(f"❌ 署名の自己チェック失敗: {e!r}")
+            return False
+        return True
+
+    async def _capture_sdk_order(self, contract_id: str, size: str, price: str, side: str) -> Tuple[str, Dict[str, Any]]:
+        """SDKの注文が送るはずのリクエストを、送信せずに受け取る"""
+        captured: Dict[str, Any] = {}
+
+        async def capture(method: str, path: str, data=None, params=None):
+            captured.update(path=path, data=data)
+            return {"code": "SUCCESS", "data": {}}
+
+        previous = self.async_client.__dict__.get("make_authenticated_request")
+        self.async_client.make_authenticated_request = capture
+        try:
+            # SDKは署名をその場で計算する（数十ms）ので、別スレッドの一時ループで回してこのループは止めない
+            await asyncio.to_thread(asyncio.run, sdk_limit_order(self.client, contract_id, size, price, side))
+        finally:
+            if previous is None:
+                del self.async_client.make_authenticated_request
+            else:
+                self.async_client.make_authenticated_request = previous
+        return captured["path"], captured["data"]
+
+    async def _session(self) -> aiohttp.ClientSession:
+        if self._session_getter is not None:
+            return self._session_getter()
+        await self.async_client._ensure_session()
+        return self.async_client.session
+
+    async def authenticated_request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """AsyncClient.make_authenticated_requestと同じ署名・エラー処理（署名計算だけワーカー）"""
+        from Crypto.Hash import keccak
+
+        timestamp = int(time.time() * 1000)
+        content = self.async_client._build_signature_content(timestamp, method, path, data, params)
+        digest = keccak.new(digest_bits=256, data=content.encode()).digest()
+        signature = await self.executor.run(sign_stark_hash, self._private_key, int.from_bytes(digest, "big"))
+
+        session = await self._session()
+        headers = {"X-edgeX-Api-Timestamp": str(timestamp), "X-edgeX-Api-Signature": signature}
+        try:
+            async with session.request(
+                method=method,
+                url=f"{self.async_client.base_url}{path}",
+                json=data,
+                params=params,
+                headers=headers
+            ) as response:
+                if response.status != 200:
+                    detail = await response.text()
+                    raise ValueError(f"request failed with status code: {response.status}, response: {detail}")
+                resp_data = await response.json(content_type=None)
+        except aiohttp.ClientError as e:
+            raise ValueError(f"HTTP request failed: {str(e)}")
+
+        if resp_data.get("code") != "SUCCESS":
+            error_param = resp_data.get("errorParam")
+            if error_param:
+                raise ValueError(f"request failed with error params: {error_param}")
+            raise ValueError(f"request failed with code: {resp_data.get('code')}")
+        return resp_data
+
+    async def prepare_limit_order(
+        self,
+        contract_id: str,
+        size: str,
+        price: str,
+        side: str,
+        client_order_id: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        署名済みの指値注文（GTC）を組み立てる
+
+        Args:
+            client_order_id: 省略時はSDKのUUID
+
+        Returns:
+            (path, request_data): authenticated_request("POST", path, request_data)でそのまま送れる
+        """
+        fields, request_data = await self._limit_order_fields(contract_id, size, price, side, client_order_id)
+        request_data["l2Signature"] = await self.executor.run(sign_limit_order, self._private_key, *fields)
+        return "/api/v1/private/order/createOrder", request_data
+
+    async def _limit_order_fields(
+        self,
+        contract_id: str,
+        size: str,
+        price: str,
+        side: str,
+        client_order_id: Optional[str] = None,
+        l2_expire_time: Optional[int] = None
+    ) -> Tuple[Tuple, Dict[str, Any]]:
+        """
+        SDKのcreate_orderと同じ計算で注文ハッシュの入力とリクエスト本体（署名以外）を作る
+
+        Args:
+            l2_expire_time: 署名の有効期限（ミリ秒、省略時は14日後。自己チェックでSDKと揃える用）
+
+        Returns:
+            (limit_order_hashの引数, l2Signature以外のrequest_data)
+        """
+        metadata = (await self.client.get_metadata()).get("data", {})
+        contract = next((c for c in metadata.get("contractList", []) if c.get("contractId") == contract_id), None)
+        if contract is None:
+            raise ValueError(f"contract not found: {contract_id}")
+        collateral_asset_id = metadata.get("global", {}).get("starkExCollateralCoin", {}).get("starkExAssetId", "")
+
+        size_dm = Decimal(size)
+        price_dm = Decimal(price)
+        resolution = Decimal(int(contract.get("starkExResolution", "0x0").replace("0x", ""), 16))
+        value_dm = price_dm * size_dm
+        fee_dm = Decimal(str(math.ceil(float(value_dm * Decimal(contract.get("defaultTakerFeeRate", "0"))))))
+
+        client_order_id = client_order_id or self.async_client.generate_uuid()
+        nonce = self.async_client.calc_nonce(client_order_id)
+        l2_expire_time = l2_expire_time or int(time.time() * 1000) + L2_EXPIRE_MS
+
+        fields = (
+            contract.get("starkExSyntheticAssetId", ""),
+            collateral_asset_id,
+            collateral_asset_id,
+            side == "BUY",
+            int(size_dm * resolution),
+            int(value_dm * Decimal("1000000")),
+            int(fee_dm * Decimal("1000000")),
+            nonce,
+            self._account_id,
+            l2_expire_time // (60 * 60 * 1000)
+        )
+        request_data = {
+            "accountId": str(self._account_id),
+            "contractId": contract_id,
+            "price": price,
+            "size": size,
+            "type": "LIMIT",
+            "timeInForce": "GOOD_TIL_CANCEL",
+            "side": side,
+            "l2Signature": "",
+            "l2Nonce": str(nonce),
+            "l2ExpireTime": str(l2_expire_time),
+            "l2Value": str(value_dm),
+            "l2Size": size,
+            "l2LimitFee": str(fee_dm),
+            "clientOrderId": client_order_id,
+            "expireTime": str(l2_expire_time - 864000000),
+            "reduceOnly": False
+        }
+        return fields, request_data
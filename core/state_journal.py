@@ -0,0 +1,123 @@
+"""
+状態ジャーナル - 注文・約定・グリッド位置の変更を1行JSONで追記し、定期的にスナップショットへ圧縮
+再起動時はスナップショット + その後のジャーナルだけを読んで数ミリ秒で状態を復元
+スナップショットは一時ファイルに書いてからos.replaceで差し替え（途中で落ちても壊れない）
+"""
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.jsonl"
+VERSION = 1
+
+
+class StateJournal:
+    """追記専用ジャーナル + アトミックなスナップショット"""
+
+    def __init__(self, directory: str, snapshot_every: int = 500, fsync: bool = False):
+        """
+        Args:
+            directory: 保存先（グリッドごとに1つ）
+            snapshot_every: この件数たまったらスナップショットに圧縮
+            fsync: 1件ごとにfsyncする（プロセスクラッシュだけならflushで十分、電源断まで守るならTrue）
+        """
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.pending = 0  # 前回スナップショット以降の件数
+        self._seq = 0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    # ---- 読み出し ----
+
+    def load(self) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        保存済みの状態を読む（起動時に1回）
+
+        Returns:
+            (スナップショットのstate、なければNone, それ以降のジャーナルレコード)
+        """
+        state = None
+        snapshot_seq = 0
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") == VERSION:
+                state = snapshot["state"]
+                snapshot_seq = int(snapshot.get("seq", 0))
+            else:
+                logger.warning(f"⚠️ スナップショットのバージョン違い（{snapshot.get('version')}）- 無視")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ スナップショット読み込み失敗 - 無視: {e}")
+
+        records = []
+        try:
+            with open(self.journal_path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        for i, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 書き込み途中で落ちた最終行は捨てる、途中の破損はそこで打ち切り
+                if i != len(lines) - 1:
+                    logger.warning(f"⚠️ ジャーナル{i + 1}行目が破損 - 以降{len(lines) - i}行を無視")
+                break
+            # スナップショット差し替え直後・切り詰め前に落ちた場合の重複を除く
+            if record.get("seq", 0) > snapshot_seq:
+                records.append(record)
+
+        self._seq = max([snapshot_seq] + [r["seq"] for r in records])
+        self.pending = len(records)
+        return state, records
+
+    # ---- 書き込み ----
+
+    def append(self, kind: str, **fields):
+        """
+        1件追記（flushまで行うのでプロセスが落ちても残る）
+
+        Args:
+            kind: レコード種別（add / remove / fill / grid など、解釈は呼び出し側）
+            **fields: JSONにできる値
+        """
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._seq += 1
+        record = {"seq": self._seq, "at": round(time.time(), 3), "kind": kind, **fields}
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.pending += 1
+
+    def snapshot(self, state: Dict):
+        """現在の状態全体を書き出してジャーナルを空にする"""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, "seq": self._seq, "at": time.time(), "state": state}, f,
+                      separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # 差し替え後に切り詰め（間で落ちてもseqで重複を除ける）
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        self.pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
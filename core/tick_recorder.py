@@ -0,0 +1,151 @@
+"""
+ティック記録モジュール - 固定長バイナリ（24バイト/件）に追記、日付（UTC）ごとにファイル分割
+読み出しはmmapでNumPy構造化配列としてゼロコピー参照
+"""
+import glob
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+from loguru import logger
+
+# ts: UNIX秒 / price: 価格 / latency_ms: 取得にかかった時間 / source: 取得元コード
+TICK_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("price", "<f8"),
+    ("latency_ms", "<f4"),
+    ("source", "u1"),
+    ("_pad", "u1", (3,)),
+])
+
+SOURCE_CODES = {"unknown": 0, "ws": 1, "rest": 2, "oracle": 3, "ticker": 4, "binance": 5}
+SOURCE_NAMES = {code: name for name, code in SOURCE_CODES.items()}
+
+FILE_PREFIX = "ticks-"
+FILE_SUFFIX = ".bin"
+
+
+def tick_path(directory: str, ts: float) -> str:
+    """tsの日付（UTC）に対応するファイルパス"""
+    day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%d")
+    return os.path.join(directory, f"{FILE_PREFIX}{day}{FILE_SUFFIX}")
+
+
+def truncate_partial(path: str) -> int:
+    """
+    クラッシュで書きかけになった末尾の端数レコードを切り詰める（追記位置をレコード境界に揃える）
+
+    Args:
+        path: ティックファイル（なければ何もしない）
+
+    Returns:
+        int: 捨てたバイト数
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+    partial = size % TICK_DTYPE.itemsize
+    if partial:
+        os.truncate(path, size - partial)
+        logger.warning(f"⚠️ ティックファイル末尾の書きかけ{partial}バイトを切り詰め: {path}")
+    return partial
+
+
+class TickRecorder:
+    """ティックをメモリにため、件数か経過時間でまとめて書き出す"""
+
+    def __init__(self, directory: str, flush_every: int = 256, flush_interval: float = 5.0):
+        self.directory = directory
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buf = np.zeros(flush_every, dtype=TICK_DTYPE)
+        self._n = 0
+        self._day: Optional[int] = None
+        self._path: Optional[str] = None
+        self._last_flush = time.monotonic()
+        self.written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, price: float, source: str = "unknown", latency: float = 0.0, ts: Optional[float] = None):
+        """
+        1件追加
+
+        Args:
+            price: 価格
+            source: 取得元（SOURCE_CODESのキー）
+            latency: 取得にかかった秒数
+            ts: UNIX秒（省略時は現在時刻）
+        """
+        if ts is None:
+            ts = time.time()
+        day = int(ts // 86400)
+        if day != self._day:
+            # 日付が変わったら前日分を書き切ってから切り替え
+            self.flush()
+            self._day = day
+            self._path = tick_path(self.directory, ts)
+            truncate_partial(self._path)
+
+        row = self._buf[self._n]
+        row["ts"] = ts
+        row["price"] = price
+        row["latency_ms"] = latency * 1000.0
+        row["source"] = SOURCE_CODES.get(source, 0)
+        self._n += 1
+
+        if self._n >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """ためたティックをファイル末尾に追記"""
+        self._last_flush = time.monotonic()
+        if self._n == 0 or self._path is None:
+            return
+        with open(self._path, "ab") as f:
+            f.write(self._buf[:self._n].tobytes())
+        self.written += self._n
+        self._n = 0
+
+    def close(self):
+        self.flush()
+
+
+def load_ticks(path: str) -> np.ndarray:
+    """1ファイルをmmapで開く（書き込み途中の端数レコードは無視）"""
+    count = os.path.getsize(path) // TICK_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    return np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+
+
+def list_tick_files(directory: str) -> List[str]:
+    """ディレクトリ内のティックファイル（日付順）"""
+    return sorted(glob.glob(os.path.join(directory, f"{FILE_PREFIX}*{FILE_SUFFIX}")))
+
+
+def load_tick_range(directory: str, start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+    """
+    期間内のファイルを連結して読む
+
+    Args:
+        directory: ティック保存先
+        start: 開始日 "YYYYMMDD"（含む、省略時は最初から）
+        end: 終了日 "YYYYMMDD"（含む、省略時は最後まで）
+
+    Returns:
+        np.ndarray: 1ファイルならmmapのまま、複数なら連結したコピー
+    """
+    arrays = []
+    for path in list_tick_files(directory):
+        day = os.path.basename(path)[len(FILE_PREFIX):-len(FILE_SUFFIX)]
+        if (start and day < start) or (end and day > end):
+            continue
+        arrays.append(load_ticks(path))
+    if not arrays:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.concatenate(arrays)
@@ -1,16 +1,25 @@
 import asyncio
-import os
 from loguru import logger
 
 # ここで新しいCaptainGridBotをインポート！！（パスは君の構成に合わせて）
 from core.grid_bot import CaptainGridBot
+from core.multi_grid import MultiGridRunner, SharedServices, load_grid_definitions
+from utils.config import load_config
 # もしcoreフォルダがない場合は from grid_bot import CaptainGridBot
 
 async def main():
     logger.info("=" * 70)
     logger.info("🏴‍☠️ Captain Grid Bot - EdgeX 2026 Edition ($17微益モード)")
     logger.info("=" * 70)
-    logger.info("🌍 環境: 🚀 PRODUCTION")
+    # 設定はここで1回だけ読む（以降はどこから呼んでも同じBotConfig）
+    config = load_config()
+    logger.info(f"🌍 環境: {'🧪 TESTNET' if config.is_testnet else '🚀 PRODUCTION'}")
+
+    # GRIDS_FILE / GRIDS があれば複数グリッドを1プロセスで（接続・レート制限・価格フィードは共有）
+    definitions = load_grid_definitions()
+    if definitions:
+        await MultiGridRunner(definitions, shared=SharedServices(config)).run()
+        return
     
     # 引数なしで起動！！ これ大事！！
     bot = CaptainGridBot()
@@ -20,4 +29,4 @@ async def main():
 
 if __name__ == "__main__":
     # Koyeb/Heroku系はこれで永遠に動く
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+"""バックテスト: 数量はボットと同じbuild_ladder呼び出しで段ごとに決まる"""
+import numpy as np
+
+from core.backtest import DEFAULT_PARAMS, grid_levels, run_backtest
+
+
+def test_default_matches_live_fixed_quantity():
+    prices = np.array([100000.0, 99930.0, 100010.0])
+    result = run_backtest(prices)
+    assert result["quantity"] == [0.002, 0.002]
+    assert result["fills"] == 2
+    assert result["final_position"] == 0.0
+
+
+def test_usdt_sizes_floored_per_level():
+    params = dict(DEFAULT_PARAMS, grid_count=2, order_size_usdt=10.0)
+    prices, sizes = grid_levels(100000.0, params)
+    # 10 * 100 / 99880 = 0.01001 → 0.010、10 * 100 / 100060 = 0.00999 → 0.009
+    assert sizes.tolist() == [0.01, 0.01, 0.0, 0.009, 0.009]
+
+    # 2段下まで買って、売りは1段上の元の買い数量で出る
+    result = run_backtest(np.array([100000.0, 99870.0, 99950.0]), params)
+    assert result["fills"] == 3
+    assert np.isclose(result["final_position"], 0.01)
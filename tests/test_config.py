@@ -0,0 +1,67 @@
+"""BotConfig / グリッド定義: 上書き・環境変数参照"""
+import pytest
+
+from core.multi_grid import load_grid_definitions
+from utils.config import BotConfig
+
+
+def test_legacy_env_names():
+    config = BotConfig.from_env({"GRID_INTERVAL_PERCENTAG": "0.002", "EDGEX_ACCOUNT_ID": "5"})
+    assert config.grid_interval_percentage == 0.002
+    assert config.account_id == "5"
+
+
+def test_usdt_sizing_needs_explicit_opt_in():
+    assert BotConfig.from_env({"ORDER_SIZE_USDT": "10"}).order_size_usdt == 0.0
+    assert BotConfig.from_env({"GRID_ORDER_SIZE_USDT": "10"}).order_size_usdt == 10.0
+
+
+def test_grid_levels_need_explicit_opt_in():
+    assert BotConfig.from_env({"GRID_COUNT": "4"}).grid_count == 1
+    assert BotConfig.from_env({"GRID_LEVELS_PER_SIDE": "4"}).grid_count == 4
+
+
+def test_override_rejects_unknown_keys():
+    with pytest.raises(ValueError):
+        BotConfig().override({"grid_cuont": 3})
+
+
+def test_other_contract_does_not_inherit_binance_symbol():
+    base = BotConfig.from_env({"BINANCE_SYMBOL": "BTCUSDT"})
+    assert base.binance_pair == "BTCUSDT"
+    assert BotConfig().binance_pair == "BTCUSDT"
+
+    eth = base.override({"name": "eth", "contract_id": "10000002"})
+    assert eth.binance_pair is None
+    eth = base.override({"name": "eth", "contract_id": "10000002", "binance_symbol": "ETHUSDT"})
+    assert eth.binance_pair == "ETHUSDT"
+
+
+def test_missing_env_reference_raises(monkeypatch):
+    monkeypatch.delenv("ETH_ACCOUNT_ID", raising=False)
+    with pytest.raises(ValueError, match="ETH_ACCOUNT_ID"):
+        load_grid_definitions(raw='[{"name": "eth", "account_id_env": "ETH_ACCOUNT_ID"}]')
+
+    monkeypatch.setenv("ETH_ACCOUNT_ID", "42")
+    [definition] = load_grid_definitions(raw='[{"name": "eth", "account_id_env": "ETH_ACCOUNT_ID"}]')
+    assert definition["account_id"] == "42"
+
+
+def test_legacy_get_config_follows_bot_defaults(monkeypatch, tmp_path):
+    import config as legacy
+
+    (tmp_path / ".env").write_text("GRID_COUNT=7\n")
+    monkeypatch.chdir(tmp_path)
+    for name in ("GRID_LEVELS_PER_SIDE", "GRID_ORDER_SIZE_USDT"):
+        monkeypatch.delenv(name, raising=False)
+    # 旧変数はボットと同じく読まない
+    monkeypatch.setenv("GRID_COUNT", "4")
+    monkeypatch.setenv("ORDER_SIZE_USDT", "10")
+    monkeypatch.setenv("EDGEX_ACCOUNT_ID", "5")
+    monkeypatch.setenv("EDGEX_STARK_PRIVATE_KEY", "0x1234567890")
+
+    values = legacy.get_config()
+    # 既定値はBotConfigと同じ（旧: 4本 / $10）、.envは読まない
+    assert values["grid_count"] == 1
+    assert values["order_size_usdt"] == 0.0
+    assert values["account_id"] == "5"
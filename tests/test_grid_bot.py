@@ -0,0 +1,63 @@
+"""CaptainGridBot: 急落/ジワ下落の発火中に約定した段の反対注文"""
+import asyncio
+
+from core.grid_bot import CaptainGridBot
+from core.order_store import GridOrder
+
+
+def make_bot(sent):
+    bot = CaptainGridBot(settings={"name": "test", "tick_dir": "", "state_dir": ""})
+
+    async def submit(orders):
+        sent.extend(orders)
+        return [{"side": side, "price": price, "size": size, "ok": True} for side, price, size in orders]
+
+    bot._submit_orders = submit
+    bot.risk.set_balance(100.0)
+    return bot
+
+
+def test_counters_for_fills_while_triggered():
+    sent = []
+    bot = make_bot(sent)
+    bot.volatility.crash_active = True
+
+    # 買いが約定 → 上の売り（利確）はポジションを減らすので発火中でも出す
+    bot.risk.on_fill("BUY", 0.002, 100000.0, order_done=True)
+    asyncio.run(bot._place_counters([GridOrder("1", "BUY", 100000.0, 0.002)]))
+    assert [side for side, _, _ in sent] == ["SELL"]
+
+    # 売りが約定してポジションが0 → 下の買いは建て増しなので解除まで保留（捨てない）
+    sent.clear()
+    bot.risk.on_fill("SELL", 0.002, 100060.0, order_done=True)
+    asyncio.run(bot._place_counters([GridOrder("2", "SELL", 100060.0, 0.002)]))
+    assert sent == []
+    assert [side for side, _, _ in bot._held_counters] == ["BUY"]
+
+    bot.volatility.crash_active = False
+    asyncio.run(bot._place_counters([]))
+    assert [side for side, _, _ in sent] == ["BUY"]
+    assert bot._held_counters == []
+
+
+def test_fill_poll_reads_every_page():
+    bot = make_bot([])
+    for i in range(150):
+        bot.orders.add(GridOrder(str(i), "BUY", 100000.0 - i, 0.002))
+    fills = [{"id": f"f{i}", "orderId": str(i), "fillSize": "0.002", "fillPrice": str(100000.0 - i),
+              "createdTime": str(1000 + i)} for i in range(150)]
+    offsets = []
+
+    class Client:
+        async def get_order_fill_transactions(self, params):
+            offsets.append(params.offset_data)
+            start = int(params.offset_data or 0)
+            more = start + 100 < len(fills)
+            return {"data": {"dataList": fills[start:start + 100], "nextPageOffsetData": str(start + 100) if more else ""}}
+
+    bot.client = Client()
+    bot._last_fill_time = 0
+    filled = asyncio.run(bot._poll_fills())
+    assert offsets == ["", "100"]
+    assert len(filled) == 150
+    assert bot._last_fill_time == 1149
@@ -0,0 +1,33 @@
+"""MultiGridRunner: 落ちたグリッドを作り直した後のRESTフォールバック"""
+import asyncio
+
+from core.grid_bot import CaptainGridBot
+from core.market_feed import MarketDataFeed
+from core.multi_grid import MultiGridRunner
+
+
+def test_restarted_grid_takes_over_rest_fallback(monkeypatch):
+    runs, fetched_by = [], []
+
+    async def run(bot):
+        runs.append(bot)
+        if len(runs) == 1:
+            raise RuntimeError("boom")
+
+    async def fetch(bot):
+        fetched_by.append(bot)
+        return 100000.0
+
+    monkeypatch.setattr(CaptainGridBot, "run", run)
+    monkeypatch.setattr(CaptainGridBot, "_fetch_fresh_price", fetch)
+    runner = MultiGridRunner([{"name": "btc", "tick_dir": "", "state_dir": ""}], restart_delay=0)
+
+    asyncio.run(runner._supervise(runner.definitions[0]))
+    first, second = runs
+    assert first is not second and runner.bots["btc"] is second
+
+    # 切断中のREST取得は作り直した方のインスタンスを呼ぶ
+    asyncio.run(runner.shared.feed._poll_for(0))
+    channel = MarketDataFeed.channel_for(second.contract_id)
+    assert fetched_by == [second]
+    assert runner.shared.feed.cells[channel].price == 100000.0
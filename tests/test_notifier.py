@@ -0,0 +1,55 @@
+"""SlackNotifier: 投稿に失敗した通知は次の送信で再送"""
+import asyncio
+
+import pytest
+
+from utils.notifier import CRITICAL, WARNING, SlackNotifier
+
+
+class FakeResponse:
+    status = 200
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.posted = []
+
+    def post(self, url, json, timeout):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("slack down")
+        self.posted.append(json["text"])
+        return FakeResponse()
+
+
+def test_failed_post_keeps_batch():
+    session = FakeSession(failures=1)
+    notifier = SlackNotifier("https://hooks.example/x", session_getter=lambda: session)
+    notifier.notify("🚨 急落検知", CRITICAL)
+    notifier.notify("❌ 注文失敗", WARNING, key="order_fail")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(notifier._flush())
+    assert len(notifier._pending) == 2
+
+    asyncio.run(notifier._flush())
+    assert not notifier._pending
+    assert "急落検知" in session.posted[0] and "注文失敗" in session.posted[0]
+
+
+def test_retained_alerts_stay_capped():
+    session = FakeSession(failures=1)
+    notifier = SlackNotifier("https://hooks.example/x", session_getter=lambda: session, max_pending=3)
+    for i in range(5):
+        notifier.notify(f"🚨 急落 {i}", CRITICAL)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(notifier._flush())
+    assert len(notifier._pending) == 3
@@ -0,0 +1,103 @@
+"""OrderStore: 約定レコードだけがポジションを動かし、見失った注文は約定ポーリング後に確定"""
+import pytest
+
+from core.order_store import GridOrder, OrderStore
+
+
+def make_store(*orders):
+    store = OrderStore()
+    for order in orders:
+        store.add(order)
+    return store
+
+
+def live(order, cum_filled=0.0):
+    return {"id": order.order_id, "side": order.side, "price": order.price, "size": order.size,
+            "cumFillSize": str(cum_filled)}
+
+
+def test_partial_fill_is_not_double_counted_by_reconcile():
+    order = GridOrder("1", "BUY", 100.0, 0.002)
+    store = make_store(order)
+
+    # 突き合わせが先に部分約定（cumFillSize）を見ても、ポジションは約定レコードでしか動かない
+    missing, unknown = store.reconcile([live(order, 0.001)], observed_at=10.0)
+    assert (missing, unknown) == ([], [])
+    assert store.net_position == 0.0
+
+    assert store.apply_fill("1", 0.001, fill_id="f1") is None
+    # 次のポーリングでも同じ約定が返る（開始時刻はinclusive）
+    assert store.apply_fill("1", 0.001, fill_id="f1") is None
+    store.reconcile([live(order, 0.001)], observed_at=20.0)
+
+    assert store.net_position == pytest.approx(0.001)
+    assert order.filled == pytest.approx(0.001)
+    assert order.status == "OPEN"
+    assert store.get("1") is order
+
+
+def test_order_filled_during_reconcile_keeps_its_fill():
+    order = GridOrder("1", "SELL", 101.0, 0.002)
+    store = make_store(order)
+
+    # 約定ポーリングと突き合わせの間に全量約定 → 突き合わせには出てこない
+    missing, _ = store.reconcile([], observed_at=10.0)
+    assert missing == [order]
+    assert store.get("1") is order  # まだ消さない
+
+    # 突き合わせより前に送ったポーリングでは確定させない
+    assert store.settle(polled_at=9.0) == []
+
+    done = store.apply_fill("1", 0.002, fill_id="f1")
+    assert done is order and done.status == "FILLED"
+    assert store.settle(polled_at=11.0) == []
+    assert store.net_position == pytest.approx(-0.002)
+    assert len(store) == 0
+
+
+def test_missing_order_without_fill_is_dropped_after_covering_poll():
+    order = GridOrder("1", "BUY", 100.0, 0.002)
+    store = make_store(order)
+
+    store.reconcile([], observed_at=10.0)
+    assert store.settle(polled_at=11.0) == [order]
+    assert order.status == "CANCELED"
+    assert len(store) == 0 and store.at_level("BUY", 100.0) is None
+
+
+def test_missing_mark_is_cleared_when_order_reappears():
+    order = GridOrder("1", "BUY", 100.0, 0.002)
+    store = make_store(order)
+
+    store.reconcile([], observed_at=10.0)
+    store.reconcile([live(order)], observed_at=12.0)
+    assert store.settle(polled_at=13.0) == []
+    assert store.get("1") is order
+
+
+def test_fill_arriving_after_cancel_is_counted():
+    order = GridOrder("1", "BUY", 100.0, 0.002)
+    store = make_store(order)
+
+    store.retire("1", at=10.0)
+    assert store.get("1") is None and store.at_level("BUY", 100.0) is None
+
+    # キャンセル直前に約定していた分が次のポーリングで届く
+    assert store.apply_fill("1", 0.001, fill_id="f1") is None
+    assert store.net_position == pytest.approx(0.001)
+
+    store.settle(polled_at=11.0)
+    assert store.apply_fill("1", 0.001, fill_id="f2") is None  # 確定後は数えない
+    assert store.net_position == pytest.approx(0.001)
+
+
+def test_retired_orders_survive_snapshot():
+    order = GridOrder("1", "SELL", 101.0, 0.002)
+    store = make_store(order)
+    store.retire("1", at=10.0)
+
+    restored = OrderStore()
+    restored.load_state(store.to_state())
+    done = restored.apply_fill("1", 0.002, fill_id="f1")
+    assert done is not None and done.status == "FILLED"
+    assert restored.net_position == pytest.approx(-0.002)
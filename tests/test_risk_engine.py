@@ -0,0 +1,66 @@
+"""RiskEngine: 残高未取得なら新規は出さない、決済方向の注文は制限を受けない"""
+from core.risk_engine import RiskEngine
+
+
+def test_new_exposure_blocked_until_balance_known():
+    risk = RiskEngine(initial_balance=195.0)
+    assert risk.check("BUY", 0.002).startswith("balance_unknown")
+
+    risk.set_balance(17.0)
+    assert risk.check("BUY", 0.002) is None
+    # 損失判定の基準は設定の既定値ではなく最初の実残高
+    assert risk.initial_balance == 17.0
+
+
+def test_min_resume_balance_enforced():
+    risk = RiskEngine(min_resume_balance=8.5)
+    risk.set_balance(5.0)
+    assert risk.check("SELL", 0.002).startswith("min_resume_balance")
+
+
+def test_loss_limit_uses_real_balance():
+    risk = RiskEngine(loss_limit=0.5, initial_balance=195.0)
+    risk.set_balance(17.0)
+    risk.on_fill("BUY", 0.01, 1000.0)
+    risk.on_price(100.0)  # 含み損 $9 > 17の50%
+    assert risk.check("BUY", 0.001).startswith("loss_limit")
+
+
+def test_reducing_orders_bypass_imbalance_limit():
+    risk = RiskEngine(position_imbalance_limit=1, max_net_position_btc=1.0)
+    risk.set_balance(100.0)
+    # 3本の買いが約定 → 買い0本・売り3本（利確）が並ぶ
+    for _ in range(3):
+        risk.on_fill("BUY", 0.002, 100.0)
+    for _ in range(3):
+        assert risk.try_open("SELL", 0.002) is None
+    # 4本目の売りはもうポジションを減らさない（建て増し）ので制限される
+    risk.on_fill("SELL", 0.002, 101.0)
+    risk.on_fill("SELL", 0.002, 101.0)
+    assert risk.check("SELL", 0.004) is not None
+
+
+def test_baseline_survives_restart_only_when_real():
+    risk = RiskEngine(initial_balance=195.0)
+    assert "initial_balance" not in risk.to_state()
+
+    risk.set_balance(17.0)
+    restored = RiskEngine(initial_balance=195.0)
+    restored.load_state(risk.to_state())
+    restored.set_balance(12.0)
+    assert restored.initial_balance == 17.0
+
+
+def test_reducing_orders_count_reserved_size_while_halted():
+    risk = RiskEngine(loss_limit=0.5, max_net_position_btc=1.0)
+    risk.set_balance(5.0)
+    risk.on_fill("BUY", 0.004, 1000.0)
+    risk.on_price(1.0)  # 含み損 $4 > 5の50% → 損失上限で停止中
+    assert risk.loss_halted
+
+    # 1本目はポジション全量の決済なので通る
+    assert risk.try_open("SELL", 0.004) is None
+    # 予約済みの0.004と合わせるとショートになる → 新規扱いで止まる
+    assert risk.try_open("SELL", 0.004).startswith("loss_limit")
+    assert risk.try_open("SELL", 0.002).startswith("loss_limit")
+    assert risk.open_size["SELL"] == 0.004
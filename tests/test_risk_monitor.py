@@ -0,0 +1,20 @@
+"""RollingWindow: バッファの大きさと窓の長さ"""
+from core.risk_monitor import RollingWindow, VolatilityMonitor
+
+
+def test_capacity_follows_window_and_tick_rate():
+    monitor = VolatilityMonitor(volatility_check_interval=30, gradual_decline_window=600, tick_rate=20)
+    assert monitor.slow.capacity == 600 * 20 + 1
+    # 想定どおりの速さなら600秒窓が最後まで保たれる
+    for i in range(600 * 20 + 200):
+        monitor.update(100.0, ts=i / 20)
+    assert monitor.slow.overflowed == 0
+    assert monitor.slow.span >= 599.9
+
+
+def test_overflow_is_counted():
+    window = RollingWindow(10, tick_rate=2)
+    for i in range(100):
+        window.push(i * 0.1, 100.0)  # 10 ticks/s > 想定の2 ticks/s
+    assert window.overflowed > 0
+    assert window.span < 10
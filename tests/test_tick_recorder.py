@@ -0,0 +1,25 @@
+"""TickRecorder: クラッシュで書きかけになったファイルへの追記"""
+import numpy as np
+
+from core.tick_recorder import TICK_DTYPE, TickRecorder, load_ticks, tick_path
+
+TS = 1_790_000_000.0
+
+
+def test_append_after_partial_record(tmp_path):
+    recorder = TickRecorder(str(tmp_path))
+    recorder.record(100.0, "ws", ts=TS)
+    recorder.close()
+    path = tick_path(str(tmp_path), TS)
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 10)  # 書き込み途中で落ちた端数
+
+    recorder = TickRecorder(str(tmp_path))
+    recorder.record(101.0, "rest", ts=TS + 1)
+    recorder.record(102.0, "rest", ts=TS + 2)
+    recorder.close()
+
+    ticks = load_ticks(path)
+    assert len(ticks) * TICK_DTYPE.itemsize == len(open(path, "rb").read())
+    np.testing.assert_array_equal(ticks["price"], [100.0, 101.0, 102.0])
+    np.testing.assert_array_equal(ticks["ts"], [TS, TS + 1, TS + 2])
@@ -1,75 +1,258 @@
 """
-設定管理モジュール - EdgeX SDK用の環境変数を読み込み
+設定管理モジュール - 全設定を1つの不変オブジェクト（BotConfig）に起動時1回だけ読み込み
 2026年1月版 - 本番優先 + 微益モード完全対応
+
+環境変数名は新旧どちらでも可（ACCOUNT_ID / EDGEX_ACCOUNT_ID、GRID_INTERVAL_PERCENTAGE / 旧綴りのGRID_INTERVAL_PERCENTAGなど）
+マルチグリッドの定義ファイルのキーはフィールド名（基本は環境変数名の小文字、grid_count・order_size_usdtは別名の変数から読む）
 """
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass, field, fields, replace
+from typing import Mapping, Optional
+
+_TRUE = ("true", "1", "yes", "on")
+DEFAULT_CONTRACT_ID = "10000001"  # BTC-USDT
+
+
+def _env(default, *names: str):
+    """フィールド定義（namesは優先順の環境変数名、省略時はフィールド名の大文字）"""
+    return field(default=default, metadata={"env": names})
+
+
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """CaptainGridBotの全設定（frozen: 読み込み後は変更不可、グリッド別の値はoverrideで別インスタンス）"""
+
+    # EdgeX API（本番デフォルト）
+    base_url: str = _env("https://pro.edgex.exchange", "EDGEX_BASE_URL")
+    ws_url: str = _env("wss://quote.edgex.exchange/api/v1/public/ws", "EDGEX_WS_URL")
+    binance_base_url: str = _env("https://api.binance.com")
+    account_id: Optional[str] = _env(None, "ACCOUNT_ID", "EDGEX_ACCOUNT_ID")
+    stark_private_key: Optional[str] = _env(None, "STARK_PRIVATE_KEY", "EDGEX_STARK_PRIVATE_KEY")
+
+    # 取引ペア
+    contract_id: str = _env(DEFAULT_CONTRACT_ID)
+    symbol: str = _env("BTC-USDT")
+    binance_symbol: Optional[str] = _env(None)  # 省略時はBTC契約ならBTCUSDT、他の契約ではBinanceを使わない
+
+    # グリッド設定（grid_countは片側の本数）
+    # 旧ボットは片側1本固定。GRID_COUNTは.envに4が残っている（片側4本 = 8本になる）ので読まず、
+    # 段数を増やす時だけ明示的にGRID_LEVELS_PER_SIDEを指定する
+    grid_count: int = _env(1, "GRID_LEVELS_PER_SIDE")
+    grid_mode: str = _env("arithmetic")  # arithmetic（等差） / geometric（等比）
+    grid_interval_percentage: float = _env(0.0006, "GRID_INTERVAL_PERCENTAGE", "GRID_INTERVAL_PERCENTAG")  # 0.06%
+    grid_interval: float = _env(100.0)  # 旧方式のドル幅
+    leverage: int = _env(100)
+    order_quantity: str = _env("0.002")  # ← 最低ロット0.001の2倍、安全！！
+    # >0ならUSDT × レバレッジ ÷ 価格で数量決定（明示的に指定した時だけ。旧ORDER_SIZE_USDTは読まない:
+    # .envの10だと100倍で約0.0095 BTC = 固定0.002の約5倍になるため）
+    order_size_usdt: float = _env(0.0, "GRID_ORDER_SIZE_USDT")
+    order_concurrency: int = _env(5)
+    force_min_order: bool = _env(True)
+
+    # 注文同期
+    fill_poll_interval: float = _env(5.0)
+    reconcile_interval: float = _env(60.0)
+
+    # 記録（空文字で無効）
+    tick_dir: str = _env("ticks")
+    state_dir: str = _env("state")
+    state_snapshot_every: int = _env(500)
+    state_fsync: bool = _env(False)
+
+    # 資金管理・リスク
+    initial_balance: float = _env(195.0)  # 本番: $195スタート
+    invest_usdt: float = _env(195.0)
+    loss_limit: float = _env(0.50)  # 50%損失で停止
+    max_net_position_btc: float = _env(0.01)
+    position_imbalance_limit: int = _env(3)  # 3本差
+    min_resume_balance: float = _env(8.5)
+
+    # 急落・ジワ下落検知
+    volatility_threshold: float = _env(0.03)  # 3%急落
+    volatility_check_interval: int = _env(30)
+    gradual_decline_threshold: float = _env(0.01)  # 1%ジワ下落
+    gradual_decline_window: int = _env(600)  # 10分
+    volatility_tick_rate: float = _env(20.0)  # 想定する最大の価格更新回数/秒（窓のバッファ = 窓の秒数 × これ）
+
+    # 自動復帰
+    cooldown_period_minutes: int = _env(45)
+    max_cooldown_minutes: int = _env(75)
+    stability_check_period_minutes: int = _env(60)
+    stability_threshold: float = _env(0.02)
+    max_consecutive_errors: int = _env(5)
+    force_resume_after_max: bool = _env(True)
+
+    # Phase設定
+    grid_count_phase1: int = _env(2)  # $17-20: 2本
+    grid_count_phase2: int = _env(3)  # $20-30: 3本
+    phase2_threshold: float = _env(20.0)
+    phase3_threshold: float = _env(30.0)
+
+    # 価格取得
+    market_data_mode: str = _env("ws")  # ws / rest
+    price_hedge_delay: float = _env(0.3)
+    price_timeout: float = _env(5.0)
+    price_stale_ttl: float = _env(60.0)
+
+    # 通知・監視・署名
+    slack_webhook_url: Optional[str] = _env(None, "SLACK_WEBHOOK_URL", "EDGEX_SLACK_WEBHOOK")
+    slack_notify_interval: float = _env(5.0)
+    metrics_port: int = _env(0)
+    loop_monitor: str = _env("prod")  # off / prod / debug
+    loop_block_threshold: float = _env(0.1)
+    signing_executor: str = _env("process")  # process / thread / inline
+    signing_workers: int = _env(0)  # 0ならCPU数（最大4）
+
+    # マルチグリッド定義（ファイルパス or JSON文字列）
+    grids_file: Optional[str] = _env(None)
+    grids: Optional[str] = _env(None)
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "BotConfig":
+        """
+        環境変数から生成
+
+        Args:
+            environ: 読み込み元（省略時はos.environ）
+
+        Returns:
+            BotConfig: 未設定の項目は既定値
+        """
+        environ = os.environ if environ is None else environ
+        values = {}
+        for f in fields(cls):
+            for name in f.metadata["env"] or (f.name.upper(),):
+                raw = environ.get(name)
+                if raw is not None:
+                    values[f.name] = _coerce(f, raw, name)
+                    break
+        return cls(**values)
+
+    def override(self, settings: Mapping) -> "BotConfig":
+        """
+        グリッド別の値で上書きした新しいインスタンス
+
+        Args:
+            settings: フィールド名 → 値（"name"は無視、Noneは上書きしない）
+
+        Returns:
+            BotConfig: 上書き後のコピー（自身は変わらない）
+        """
+        by_name = {f.name: f for f in fields(self)}
+        values = {}
+        for key, value in settings.items():
+            if key == "name" or value is None:
+                continue
+            f = by_name.get(key)
+            if f is None:
+                raise ValueError(f"unknown setting: {key}")
+            values[key] = _coerce(f, value, key)
+        # 契約を変えたグリッドは起動時のBINANCE_SYMBOLを引き継がない（別銘柄の価格で発注しないため）
+        if values.get("contract_id", self.contract_id) != self.contract_id and "binance_symbol" not in values:
+            values["binance_symbol"] = None
+        return replace(self, **values)
+
+    @property
+    def binance_pair(self) -> Optional[str]:
+        """Binanceの参照銘柄（指定がなくBTC契約でもなければNone = Binanceを使わない）"""
+        if self.binance_symbol:
+            return self.binance_symbol
+        return "BTCUSDT" if self.contract_id == DEFAULT_CONTRACT_ID else None
 
-# .envファイルから環境変数を読み込む（ローカルテスト用）
-load_dotenv()
+    @property
+    def is_testnet(self) -> bool:
+        return is_testnet(self.base_url)
 
-def get_config():
+
+def _coerce(f, value, source: str):
+    """文字列・JSONの値をフィールドの型に変換（変換できなければ設定名つきで例外）"""
+    if isinstance(value, str):
+        value = value.strip()
+    kind = type(f.default) if f.default is not None else str
+    try:
+        if kind is bool:
+            return value if isinstance(value, bool) else str(value).lower() in _TRUE
+        if value == "" and f.default is None:
+            return None
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"❌ {source} の値が不正です: {value!r}（{kind.__name__}）")
+
+
+_CONFIG: Optional[BotConfig] = None
+
+
+def load_config(reload: bool = False) -> BotConfig:
     """
-    環境変数から設定を辞書形式で取得（Koyeb + ローカル両対応）
-    
+    プロセス共通の設定（初回だけ環境変数を読む、.envはボット本体では読まない）
+
+    Args:
+        reload: 読み直す（テスト・ベンチマークで環境変数を変えた時）
+
+    Returns:
+        BotConfig: 2回目以降は同じインスタンス
+    """
+    global _CONFIG
+    if _CONFIG is None or reload:
+        _CONFIG = BotConfig.from_env()
+    return _CONFIG
+
+
+def get_config(load_env: bool = True):
+    """
+    環境変数 + .envから設定を辞書形式で取得（接続テスト用、Koyeb + ローカル両対応、旧キー名つき）
+
+    既定値はBotConfig（= ボット本体）と同じ。以前この関数だけが持っていた既定値とは異なる:
+    initial_balance 43 → 195、order_size_usdt 3 → 0（ORDER_QUANTITY固定）、grid_count_phase2 2 → 3、
+    Slack通知はEDGEX_SLACK_WEBHOOKに加えてSLACK_WEBHOOK_URLも読む。
+    値を変えたい場合は環境変数（または.env）で指定する。
+
+    Args:
+        load_env: .envを読み込むか（config.get_configは従来どおり読み込まない）
+
     Returns:
         dict: EdgeX SDK + CaptainGridBot用の設定情報
     """
-    # Account IDを取得して整数化
-    account_id_str = os.getenv("EDGEX_ACCOUNT_ID")
+    if load_env:
+        try:
+            from dotenv import load_dotenv  # ローカルテスト用（ボット本体の起動では読み込まない）
+
+            load_dotenv()
+        except ImportError:
+            pass
+    config = BotConfig.from_env()
+
+    # Account IDを整数化
     try:
-        account_id = int(account_id_str) if account_id_str else None
+        account_id = int(config.account_id) if config.account_id else None
     except (ValueError, TypeError):
-        raise ValueError(f"❌ EDGEX_ACCOUNT_IDが数値ではありません: {account_id_str}")
-    
+        raise ValueError(f"❌ EDGEX_ACCOUNT_IDが数値ではありません: {config.account_id}")
+
     # Stark Private Key
-    stark_private_key = os.getenv("EDGEX_STARK_PRIVATE_KEY")
-    if not stark_private_key or stark_private_key.strip() in ["", "None", "null"]:
+    stark_private_key = config.stark_private_key
+    if not stark_private_key or stark_private_key in ["None", "null"]:
         raise ValueError("❌ EDGEX_STARK_PRIVATE_KEYが設定されていません！Koyeb Secretまたは.envを確認してください")
-    
-    config = {
-        # EdgeX API基本設定（本番優先）
-        "base_url": os.getenv("EDGEX_BASE_URL", "https://pro.edgex.exchange"),  # ← 本番デフォルト！！
-        "account_id": account_id,
-        "stark_private_key": stark_private_key.strip(),
-        
-        # 取引設定（ボット固有）
-        "symbol": os.getenv("SYMBOL", "BTC-USDT"),
-        
-        # 微益モード設定（新方式：パーセント間隔）
-        "grid_interval_percentage": float(os.getenv("GRID_INTERVAL_PERCENTAG", "0.0006")),  # デフォルト0.06%
-        "order_size_usdt": float(os.getenv("ORDER_SIZE_USDT", "3.0")),  # 安全第一で$3スタート推奨
-        
-        # Phase設定
-        "grid_count_phase1": int(os.getenv("GRID_COUNT_PHASE1", "2")),
-        "grid_count_phase2": int(os.getenv("GRID_COUNT_PHASE2", "2")),  # 合計4本に抑え
-        
-        # その他ボット設定（main.pyで使う）
-        "initial_balance": float(os.getenv("INITIAL_BALANCE", "43.0")),
-        "force_min_order": os.getenv("FORCE_MIN_ORDER", "true").lower() == "true",
-        "volatility_threshold": float(os.getenv("VOLATILITY_THRESHOLD", "0.03")),
-        "volatility_check_interval": int(os.getenv("VOLATILITY_CHECK_INTERVAL", "30")),
-        "loss_limit": float(os.getenv("LOSS_LIMIT", "0.50")),
-        "position_imbalance_limit": int(os.getenv("POSITION_IMBALANCE_LIMIT", "3")),
-        
-        # オプション
-        "slack_webhook": os.getenv("EDGEX_SLACK_WEBHOOK") or None,
-    }
-    
-    # 必須項目最終チェック
-    if not config["account_id"]:
+    if not account_id:
         raise ValueError("❌ EDGEX_ACCOUNT_IDが設定されていません！")
-    
-    return config
+
+    values = {f.name: getattr(config, f.name) for f in fields(config)}
+    values.update(
+        account_id=account_id,
+        stark_private_key=stark_private_key,
+        slack_webhook=config.slack_webhook_url,
+        is_testnet=config.is_testnet,
+    )
+    return values
+
 
 def is_testnet(base_url: str) -> bool:
     """
     テストネットかどうか判定
-    
+
     Args:
         base_url: EdgeXのベースURL
-        
+
     Returns:
         bool: テストネットならTrue、本番ならFalse
     """
-    return "testnet" in str(base_url).lower()
\ No newline at end of file
+    return "testnet" in str(base_url).lower()
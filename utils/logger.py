@@ -38,7 +38,9 @@ def setup_logger(name: str = "CaptainGridBot") -> logging.Logger:
 
 def send_slack_notification(webhook_url: str, message: str):
     """
-    Slackに通知を送信（オプション機能）
+    Slackに通知を送信（オプション機能、同期送信）
+
+    asyncioのボットからはイベントループを止めるため、utils.notifier.SlackNotifierを使う
     
     Args:
         webhook_url: Slack Webhook URL
@@ -0,0 +1,253 @@
+"""
+イベントループ監視モジュール - スケジューリング遅延の常時計測とブロッキング呼び出しの検出
+ループが閾値以上止まったら別スレッドからループスレッドのスタックを取得してログに出す
+debugモードではタスクごとの実行時間（コルーチン名単位）も集計
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Coroutine
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from utils.metrics import REGISTRY, MetricsRegistry
+
+MODES = ("off", "prod", "debug")
+
+
+class CoroutineStats:
+    """コルーチン1種類ぶんの実行時間（ループを占有していた時間のみ、await中は含まない）"""
+
+    __slots__ = ("name", "steps", "total", "max", "tasks")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.steps = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.tasks = 0
+
+
+class _TimedCoroutine(Coroutine):
+    """send/throwの1ステップごとの所要時間を記録するラッパー"""
+
+    __slots__ = ("_coro", "_stats", "_monitor")
+
+    def __init__(self, coro, stats: CoroutineStats, monitor: "LoopMonitor"):
+        self._coro = coro
+        self._stats = stats
+        self._monitor = monitor
+
+    def _record(self, started: float):
+        elapsed = time.perf_counter() - started
+        stats = self._stats
+        stats.steps += 1
+        stats.total += elapsed
+        if elapsed > stats.max:
+            stats.max = elapsed
+        if elapsed >= self._monitor.threshold:
+            self._monitor._on_slow_step(stats.name, elapsed)
+
+    def send(self, value):
+        started = time.perf_counter()
+        try:
+            return self._coro.send(value)
+        finally:
+            self._record(started)
+
+    def throw(self, typ, val=None, tb=None):
+        started = time.perf_counter()
+        try:
+            if val is None and tb is None:
+                return self._coro.throw(typ)
+            return self._coro.throw(typ, val, tb)
+        finally:
+            self._record(started)
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    @property
+    def cr_frame(self):
+        return getattr(self._coro, "cr_frame", None)
+
+    @property
+    def cr_running(self):
+        return getattr(self._coro, "cr_running", False)
+
+    @property
+    def cr_await(self):
+        return getattr(self._coro, "cr_await", None)
+
+    @property
+    def cr_code(self):
+        return getattr(self._coro, "cr_code", None)
+
+
+class LoopMonitor:
+    """
+    ループ遅延プローブ + ウォッチドッグスレッド（+ debugではタスク計測）
+
+    - prod: interval秒ごとにsleepして実際に起きるまでの遅れを計測、threshold超の停止はスタック付きで警告
+    - debug: prodに加えてタスクファクトリでコルーチンごとの占有時間を集計、asyncioのデバッグモードも有効化
+    """
+
+    def __init__(
+        self,
+        mode: str = "prod",
+        threshold: float = 0.1,
+        interval: float = 0.05,
+        report_interval: float = 300.0,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Args:
+            mode: off / prod / debug
+            threshold: ブロッキングとみなす停止時間（秒）
+            interval: 遅延プローブの間隔（秒）
+            report_interval: 集計をログに出す間隔（秒）
+            registry: 記録先メトリクス（省略時は共通レジストリ）
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self.threshold = threshold
+        self.interval = interval
+        self.report_interval = report_interval
+
+        registry = registry or REGISTRY
+        self._lag = registry.histogram("loop_lag_seconds", "イベントループのスケジューリング遅延")
+        self._blocked = registry.counter("loop_blocked_total", "threshold以上のループ停止")
+        self._slow_steps = registry.counter("coroutine_slow_steps_total", "threshold以上ループを占有したステップ")
+        self.coroutines: Dict[str, CoroutineStats] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = time.monotonic()
+        self._probe_task: Optional[asyncio.Task] = None
+        self._report_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._prev_factory = None
+        self.stalls: List[Dict] = []  # 直近の停止（スタック付き）
+        self.max_stalls = 20
+
+    def start(self):
+        """実行中のループに取り付ける（ループ内から呼ぶ）"""
+        if self.mode == "off" or self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+
+        if self.mode == "debug":
+            self._prev_factory = self._loop.get_task_factory()
+            self._loop.set_task_factory(self._task_factory)
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+
+        self._probe_task = asyncio.create_task(self._probe())
+        self._report_task = asyncio.create_task(self._report_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🩺 ループ監視開始（{self.mode}、閾値 {self.threshold * 1000:.0f}ms）")
+
+    async def stop(self):
+        if self._loop is None:
+            return
+        self._stop.set()
+        for task in (self._probe_task, self._report_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._probe_task, self._report_task) if t), return_exceptions=True)
+        if self.mode == "debug":
+            self._loop.set_task_factory(self._prev_factory)
+            self._loop.set_debug(False)
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+        self.report()
+        self._loop = None
+
+    # ---- 遅延プローブ（ループ側） ----
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - scheduled - self.interval
+            self._beat = time.monotonic()
+            self._lag.observe(max(lag, 0.0))
+            if lag >= self.threshold:
+                self._blocked.inc()
+                logger.warning(f"🐢 イベントループ停止 {lag * 1000:.0f}ms（スタックはウォッチドッグのログ参照）")
+
+    # ---- ウォッチドッグ（別スレッド） ----
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat  # 1回の停止につき1回だけ取得
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self._remember({"at": time.time(), "stalled": stalled, "stack": stack})
+            logger.warning(f"🧱 ループが{stalled * 1000:.0f}ms以上停止中 - 実行中のスタック:\n{stack}")
+
+    def _remember(self, stall: Dict):
+        self.stalls.append(stall)
+        if len(self.stalls) > self.max_stalls:
+            del self.stalls[0]
+
+    # ---- タスク計測（debugのみ） ----
+
+    def _task_factory(self, loop, coro, **kwargs):
+        name = getattr(coro, "__qualname__", None) or type(coro).__qualname__
+        stats = self.coroutines.get(name)
+        if stats is None:
+            stats = self.coroutines[name] = CoroutineStats(name)
+        stats.tasks += 1
+        wrapped = _TimedCoroutine(coro, stats, self)
+        if self._prev_factory is not None:
+            return self._prev_factory(loop, wrapped, **kwargs)
+        return asyncio.Task(wrapped, loop=loop, **kwargs)
+
+    def _on_slow_step(self, name: str, elapsed: float):
+        self._slow_steps.inc()
+        logger.warning(f"🧱 {name} が1ステップで{elapsed * 1000:.0f}msループを占有")
+
+    # ---- 集計 ----
+
+    def top(self, n: int = 10) -> List[CoroutineStats]:
+        """占有時間の長いコルーチン順"""
+        return sorted(self.coroutines.values(), key=lambda s: s.total, reverse=True)[:n]
+
+    def report(self):
+        if self._lag.count == 0:
+            return
+        logger.info(
+            f"🩺 ループ遅延 p50 {self._lag.quantile(0.5) * 1000:.1f}ms / p99 {self._lag.quantile(0.99) * 1000:.1f}ms / "
+            f"max {self._lag.max * 1000:.1f}ms / 停止{self._blocked.value}回"
+        )
+        for stats in self.top(5):
+            logger.info(
+                f"   {stats.name}: 計{stats.total * 1000:.0f}ms / {stats.steps}step / "
+                f"最大{stats.max * 1000:.1f}ms / タスク{stats.tasks}"
+            )
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report()
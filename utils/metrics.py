@@ -0,0 +1,285 @@
+"""
+メトリクスモジュール - 固定メモリの対数バケットヒストグラム / カウンター / ゲージ
+記録は配列の加算だけ（全呼び出しをラップできるコスト）、/metrics でPrometheus形式を公開
+"""
+import asyncio
+import inspect
+import math
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# ヒストグラムの分解能: 2倍ごとに SUB_BUCKETS 分割（相対誤差 約1/SUB_BUCKETS）
+SUB_BUCKETS = 8
+MIN_EXPONENT = -20  # 2^-20秒 ≒ 1µs
+MAX_EXPONENT = 12   # 2^12秒 ≒ 68分
+_SCALE = 2 * SUB_BUCKETS
+_frexp = math.frexp
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """
+    対数バケットのヒストグラム（HDR風、メモリは値の個数によらず一定）
+
+    バケット i は [2^e × (1 + s/SUB), 2^e × (1 + (s+1)/SUB)) を表す（e, sはiから逆算）
+    """
+
+    __slots__ = ("counts", "count", "sum", "max", "_offset", "_base", "_last")
+
+    def __init__(self):
+        self._offset = -MIN_EXPONENT * SUB_BUCKETS
+        self.counts: List[int] = [0] * ((MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS + 2)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        # (e - 1) × SUB + int((m - 0.5) × 2SUB) + offset + 1 を e × SUB + int(m × 2SUB) + base に整理
+        self._base = self._offset + 1 - 2 * SUB_BUCKETS
+        self._last = len(self.counts) - 1
+
+    def observe(self, value: float):
+        """1件記録（秒）"""
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        if value > 0.0:
+            m, e = _frexp(value)  # value = m × 2^e, 0.5 <= m < 1
+            idx = e * SUB_BUCKETS + int(m * _SCALE) + self._base
+            if idx < 1:
+                idx = 1
+            elif idx > self._last:
+                idx = self._last
+            self.counts[idx] += 1
+        else:
+            self.counts[0] += 1
+
+    def _upper(self, idx: int) -> float:
+        """バケットidxの上限値"""
+        if idx == 0:
+            return 0.0
+        i = idx - 1 - self._offset
+        e, s = divmod(i, SUB_BUCKETS)
+        return math.ldexp(1.0 + (s + 1) / SUB_BUCKETS, e)
+
+    def quantile(self, q: float) -> float:
+        """分位点（バケット上限で近似、最大値で頭打ち）"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for idx, c in enumerate(self.counts):
+            running += c
+            if c and running >= target:
+                return min(self._upper(idx), self.max)
+        return self.max
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """2倍刻みの境界ごとの累積件数（Prometheusのle用、細かいバケットは集約）"""
+        out = []
+        running = 0
+        for idx, c in enumerate(self.counts):
+            running += c
+            if idx % SUB_BUCKETS == 0 and idx > 0:
+                out.append((self._upper(idx), running))
+        return out
+
+
+class Gauge:
+    """現在値（setで上書き、またはスクレイプ時に関数で評価）"""
+
+    __slots__ = ("value", "fn")
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        if self.fn is not None:
+            try:
+                return float(self.fn())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class Counter:
+    """単調増加カウンター"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class MetricsRegistry:
+    """名前 + ラベルごとのメトリクスを保持（同じ指定なら同じインスタンスを返す）"""
+
+    def __init__(self, prefix: str = "captain_grid_"):
+        self.prefix = prefix
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._metrics: Dict[str, Dict[LabelKey, object]] = {}
+        self.started_at = time.time()
+
+    def _get(self, kind: str, name: str, help_text: str, labels: Dict[str, str], factory):
+        family = self._metrics.get(name)
+        if family is None:
+            family = self._metrics[name] = {}
+            self._help[name] = (kind, help_text)
+        elif self._help[name][0] != kind:
+            raise ValueError(f"metric {name} already registered as {self._help[name][0]}")
+        key = _label_key(labels)
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = factory()
+        return metric
+
+    def histogram(self, name: str, help_text: str = "", **labels) -> Histogram:
+        return self._get("histogram", name, help_text, labels, Histogram)
+
+    def counter(self, name: str, help_text: str = "", **labels) -> Counter:
+        return self._get("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str = "", fn: Optional[Callable[[], float]] = None, **labels) -> Gauge:
+        gauge = self._get("gauge", name, help_text, labels, Gauge)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def timed(self, name: str, errors: Optional[str] = None, **labels):
+        """
+        関数の所要時間をヒストグラムに記録するデコレーター（同期・非同期どちらも可）
+
+        Args:
+            name: ヒストグラム名
+            errors: 例外時に加算するカウンター名（省略時は数えない）
+            **labels: 両方に付けるラベル
+        """
+        hist = self.histogram(name, **labels)
+        err = self.counter(errors, **labels) if errors else None
+
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    started = time.perf_counter()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except asyncio.CancelledError:
+                        raise  # ヘッジで負けて取り消された呼び出しは数えない
+                    except Exception:
+                        if err is not None:
+                            err.inc()
+                        hist.observe(time.perf_counter() - started)
+                        raise
+                    hist.observe(time.perf_counter() - started)
+                    return result
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception:
+                    if err is not None:
+                        err.inc()
+                    hist.observe(time.perf_counter() - started)
+                    raise
+                hist.observe(time.perf_counter() - started)
+                return result
+            return wrapper
+
+        return decorator
+
+    def render(self) -> str:
+        """Prometheusテキスト形式に書き出す"""
+        lines = []
+        for name, family in self._metrics.items():
+            kind, help_text = self._help[name]
+            full = self.prefix + name
+            if help_text:
+                lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for key, metric in family.items():
+                if kind == "histogram":
+                    for upper, running in metric.cumulative():
+                        lines.append(f"{full}_bucket{_format_labels(key, ('le', f'{upper:.9g}'))} {running}")
+                    lines.append(f"{full}_bucket{_format_labels(key, ('le', '+Inf'))} {metric.count}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {metric.sum:.9g}")
+                    lines.append(f"{full}_count{_format_labels(key)} {metric.count}")
+                elif kind == "counter":
+                    lines.append(f"{full}{_format_labels(key)} {metric.value}")
+                else:
+                    lines.append(f"{full}{_format_labels(key)} {metric.get():.9g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ヒストグラムごとの p50 / p99 / max / count（ログ出力用）"""
+        out = {}
+        for name, family in self._metrics.items():
+            if self._help[name][0] != "histogram":
+                continue
+            for key, hist in family.items():
+                label = name + _format_labels(key)
+                out[label] = {
+                    "count": hist.count,
+                    "p50": hist.quantile(0.5),
+                    "p99": hist.quantile(0.99),
+                    "max": hist.max,
+                }
+        return out
+
+
+class MetricsServer:
+    """/metrics を返すローカルHTTPサーバー（aiohttp.web、portが0なら起動しない）"""
+
+    def __init__(self, registry: MetricsRegistry, port: int = 0, host: str = "127.0.0.1"):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self._runner = None
+
+    async def start(self):
+        if not self.port or self._runner is not None:
+            return
+        from aiohttp import web
+
+        async def handle(_request):
+            return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"📈 メトリクス公開: http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# プロセス共通のレジストリ（EdgeXClientなどボット外のモジュールもここに記録）
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,228 @@
+"""
+Slack通知モジュール - 非同期キュー + バックグラウンド送信（取引ループを止めない）
+一定間隔ごとに1回のWebhook投稿へまとめ、同じ警告は件数付きで集約
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+# 優先度（小さいほど重要）
+CRITICAL = 0  # 急落・損失停止など（キューが満杯でも捨てない）
+WARNING = 1   # 注文失敗・価格取得失敗など
+INFO = 2      # 約定・グリッド配置など（混雑時は最初に捨てる）
+
+
+class _Pending:
+    """送信待ちの1件（同じkeyの通知は件数だけ増やす）"""
+
+    __slots__ = ("priority", "message", "count", "first_at", "last_at")
+
+    def __init__(self, priority: int, message: str, now: float):
+        self.priority = priority
+        self.message = message
+        self.count = 1
+        self.first_at = now
+        self.last_at = now
+
+    def render(self) -> str:
+        if self.count == 1:
+            return self.message
+        span = self.last_at - self.first_at
+        return f"{self.message} (×{self.count}, {span:.0f}秒間)"
+
+
+class SlackNotifier:
+    """有界キュー + 送信ワーカー（notify()は同期・即時に戻る）"""
+
+    def __init__(
+        self,
+        webhook_url: Optional[str],
+        session_getter: Callable[[], aiohttp.ClientSession],
+        interval: float = 5.0,
+        max_pending: int = 100,
+        max_chars: int = 3500,
+        timeout: float = 5.0,
+        title: str = "🤖 Captain Grid Bot",
+    ):
+        """
+        Args:
+            webhook_url: Slack Webhook URL（空なら何もしない）
+            session_getter: 共有aiohttpセッションを返す関数
+            interval: まとめて投稿する間隔（秒）
+            max_pending: 送信待ちの最大件数（超えたら優先度の低いものから捨てる）
+            max_chars: 1投稿あたりの最大文字数（超えた分は次の投稿へ）
+            timeout: 1投稿のタイムアウト（秒）
+            title: 投稿の先頭行
+        """
+        self.webhook_url = webhook_url or None
+        self._session_getter = session_getter
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_chars = max_chars
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.title = title
+
+        self._pending: "OrderedDict[Hashable, _Pending]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._seq = 0
+        self.stats: Dict[str, int] = {"queued": 0, "coalesced": 0, "dropped": 0, "posted": 0, "failed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.webhook_url is not None
+
+    def notify(self, message: str, priority: int = INFO, key: Optional[Hashable] = None):
+        """
+        通知を積む（I/Oなし、呼び出し側は待たない）
+
+        Args:
+            message: 本文
+            priority: CRITICAL / WARNING / INFO
+            key: 同じkeyの未送信通知があれば件数だけ加算（省略時は集約しない）
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if key is not None:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry.count += 1
+                entry.last_at = now
+                entry.message = message  # 最新の内容で表示
+                entry.priority = min(entry.priority, priority)
+                self.stats["coalesced"] += 1
+                return
+        else:
+            self._seq += 1
+            key = ("_", self._seq)
+
+        if len(self._pending) >= self.max_pending and not self._evict(priority) and priority != CRITICAL:
+            self.stats["dropped"] += 1
+            return
+
+        self._pending[key] = _Pending(priority, message, now)
+        self.stats["queued"] += 1
+        if priority == CRITICAL:
+            self._wakeup.set()  # 重要通知は間隔を待たずに送る
+
+    def _evict(self, priority: int) -> bool:
+        """満杯時、新しい通知より優先度の低い最古の1件を捨てる（捨てられなければFalse）"""
+        victim_key, victim = None, None
+        for key, entry in self._pending.items():
+            if entry.priority == CRITICAL:
+                continue
+            if victim is None or entry.priority > victim.priority:
+                victim_key, victim = key, entry
+        if victim is None or (victim.priority <= priority and priority != CRITICAL):
+            return False
+        del self._pending[victim_key]
+        self.stats["dropped"] += 1
+        return True
+
+    def scoped(self, prefix: str) -> "ScopedNotifier":
+        """本文とkeyに接頭辞を付けるビュー（複数グリッドで1つの通知キューを共有する時用）"""
+        return ScopedNotifier(self, prefix)
+
+    def start(self):
+        """送信ワーカーを起動（Webhook未設定なら何もしない）"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._worker())
+
+    async def close(self, flush_timeout: float = 3.0):
+        """ワーカーを止めて残りを1回だけ送る"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pending:
+            try:
+                await asyncio.wait_for(self._flush(), flush_timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ Slack通知の最終送信失敗: {e}")
+
+    async def _worker(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Slack通知失敗してもボット停止しない
+                logger.warning(f"⚠️ Slack通知エラー（無視して継続）: {e}")
+
+    def _take_batch(self) -> Tuple[str, List[Tuple[Hashable, _Pending, int]]]:
+        """
+        優先度順にmax_charsまで選んで1投稿分の本文を作る（キューから外すのは投稿成功後）
+
+        Returns:
+            (本文, [(key, 通知, 本文に含めた件数)])
+        """
+        ordered = sorted(self._pending.items(), key=lambda kv: kv[1].priority)
+        lines, size, batch = [self.title], len(self.title), []
+        for key, entry in ordered:
+            line = entry.render()
+            if len(lines) > 1 and size + len(line) + 1 > self.max_chars:
+                break
+            lines.append(line)
+            size += len(line) + 1
+            batch.append((key, entry, entry.count))
+        return "\n".join(lines), batch
+
+    def _ack(self, batch: List[Tuple[Hashable, _Pending, int]]):
+        """投稿できた分をキューから外す（投稿中に同じkeyへ集約された分は残す）"""
+        for key, entry, count in batch:
+            if self._pending.get(key) is not entry:
+                continue
+            if entry.count > count:
+                entry.count -= count
+                entry.first_at = entry.last_at
+            else:
+                del self._pending[key]
+
+    async def _flush(self):
+        while self._pending:
+            text, batch = self._take_batch()
+            session = self._session_getter()
+            try:
+                async with session.post(self.webhook_url, json={"text": text}, timeout=self.timeout) as resp:
+                    if resp.status >= 400:
+                        raise RuntimeError(f"HTTP {resp.status}: {(await resp.text())[:200]}")
+                self.stats["posted"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 失敗した分はキューに残して次の間隔で再送（送れない間もmax_pending件で頭打ち）
+                self.stats["failed"] += 1
+                self._trim()
+                raise
+            self._ack(batch)
+
+    def _trim(self):
+        """max_pendingを超えた分を優先度の低い・古いものから捨てる（送れない間はCRITICALも上限を守る）"""
+        while len(self._pending) > self.max_pending:
+            victim = max(self._pending, key=lambda key: self._pending[key].priority)
+            del self._pending[victim]
+            self.stats["dropped"] += 1
+
+
+class ScopedNotifier:
+    """SlackNotifierの共有ビュー（start/closeは元のnotifier側で行う）"""
+
+    __slots__ = ("_notifier", "prefix")
+
+    def __init__(self, notifier: SlackNotifier, prefix: str):
+        self._notifier = notifier
+        self.prefix = prefix
+
+    def notify(self, message: str, priority: int = INFO, key: Optional[Hashable] = None):
+        self._notifier.notify(f"{self.prefix}{message}", priority, None if key is None else (self.prefix, key))